@@ -1,5 +1,122 @@
-def main():
-    print("Hello from book!")
+"""
+book 命令行入口
+
+用法:
+    python main.py split [--by markdown|catalog]
+    python main.py catalog
+    python main.py prompt [--target book|article] [--no-link]
+    python main.py llm [--target book|article] [--pack-tokens N]
+    python main.py upload [--article] [--book 书名 ...] [--force]
+    python main.py subtitle
+    python main.py epub
+    python main.py clean [--dry-run] [--keep-last N] [--min-age 秒] [--manifest 清单.yaml] [--threads N]
+    python main.py serve [--debounce 秒] [--poll-interval 秒]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 各模块以 src 为根目录导入（common、llm_editor、hackmd）
+SRC_DIR = Path(__file__).resolve().parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    from llm_editor.article.clean import add_clean_arguments
+
+    parser = argparse.ArgumentParser(prog="book", description="Book / article / subtitle processing pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    split_parser = subparsers.add_parser("split", help="split books in data/book/book into chapter txt files")
+    split_parser.add_argument("--by", choices=["markdown", "catalog"], default="markdown",
+                              help="split by markdown headers or by catalog file")
+
+    subparsers.add_parser("catalog", help="build catalog.md for every book")
+
+    prompt_parser = subparsers.add_parser("prompt", help="append prompts to book chapters or articles")
+    prompt_parser.add_argument("--target", choices=["book", "article"], default="book")
+    prompt_parser.add_argument("--no-link", action="store_true", help="use the nolink prompt for articles")
+
+    llm_parser = subparsers.add_parser("llm", help="process book chapters or articles with the LLM")
+    llm_parser.add_argument("--target", choices=["book", "article"], default="book")
+    llm_parser.add_argument("--pack-tokens", type=int, default=None,
+                            help="pack short articles into one request up to this token budget "
+                                 "(default: ARTICLE_PACK_TOKENS, 0 disables)")
+
+    upload_parser = subparsers.add_parser("upload", help="upload md files to HackMD")
+    upload_parser.add_argument("--article", action="store_true", help="upload data/article/md")
+    upload_parser.add_argument("--book", nargs="*", default=[], help="book names under data/book/md")
+    upload_parser.add_argument("--force", action="store_true", help="upload even if content is unchanged")
+
+    subparsers.add_parser("subtitle", help="extract plain text from subtitle files")
+    subparsers.add_parser("epub", help="convert epub files to txt")
+
+    clean_parser = subparsers.add_parser("clean", help="clean article intermediate files")
+    add_clean_arguments(clean_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="keep one warm process and process new files in data/")
+    serve_parser.add_argument("--debounce", type=float, default=2.0,
+                              help="seconds without new events before processing a batch")
+    serve_parser.add_argument("--poll-interval", type=float, default=1.0,
+                              help="poll interval in seconds when inotify is unavailable")
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """主函数"""
+    args = build_parser().parse_args(argv)
+
+    if args.command == "clean":
+        from llm_editor.article.clean import clean_all
+
+        clean_all(dry_run=args.dry_run, keep_last=args.keep_last, min_age=args.min_age,
+                  manifest_path=args.manifest, num_threads=args.threads)
+        return
+
+    from llm_editor.pipeline import Pipeline, serve
+
+    pipeline = Pipeline()
+
+    # 单次命令直接调用步骤，异常向外抛出，进程以非零状态退出；
+    # 只有 serve 通过 run_stage 记录异常后继续运行
+    if args.command == "split":
+        if args.by == "markdown":
+            pipeline.split_by_markdown()
+        else:
+            pipeline.split_by_catalog()
+    elif args.command == "catalog":
+        pipeline.build_catalog()
+    elif args.command == "prompt":
+        if args.target == "book":
+            pipeline.book_prompt()
+        else:
+            pipeline.article_prompt(use_link=not args.no_link)
+    elif args.command == "llm":
+        if args.target == "book":
+            pipeline.book_llm()
+        else:
+            pipeline.article_llm(pack_token_budget=args.pack_tokens)
+    elif args.command == "upload":
+        from common import PathType, get_path_manager
+        from hackmd.upload_notes import get_book_directories
+
+        directories = get_book_directories(args.book)
+        if args.article:
+            directories.insert(0, get_path_manager().get_dir_path(PathType.ARTICLE_MD))
+        if not directories:
+            print("Nothing to upload: pass --article and/or --book NAME ...")
+            return
+        pipeline.upload(directories, force=args.force)
+    elif args.command == "subtitle":
+        pipeline.subtitle()
+    elif args.command == "epub":
+        pipeline.epub()
+    elif args.command == "serve":
+        serve(pipeline, debounce=args.debounce, poll_interval=args.poll_interval)
 
 
 if __name__ == "__main__":
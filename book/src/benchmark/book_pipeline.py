@@ -0,0 +1,250 @@
+"""
+书籍处理流水线基准测试
+
+用合成语料（benchmark.corpus）测量各处理步骤的耗时、吞吐量（MB/s）和峰值内存（RSS）。
+每个步骤在独立的子进程中运行，峰值 RSS 互不影响；LLM 步骤连接本地桩服务（benchmark.stub_server）。
+用法（在 src 目录下执行）:
+    python -m benchmark.book_pipeline
+    python -m benchmark.book_pipeline --size-mb 5 --depth 4 --output after.json --baseline before.json
+    python -m benchmark.book_pipeline --stages parse_markdown_sections_zh split_by_limit_zh
+"""
+
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from benchmark import corpus
+
+# 参与测试的步骤（按输出顺序）
+STAGES = [
+    "parse_markdown_sections_zh",
+    "parse_markdown_sections_en",
+    "split_by_limit_zh",
+    "split_by_limit_en",
+    "split_book_by_catalog_zh",
+    "extract_chapters_zh",
+    "extract_text_from_html_zh",
+    "epub_to_txt_zh",
+    "extract_text_from_srt_zh",
+    "book_llm_stub",
+]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值 RSS（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _setup_stage(name: str, args: argparse.Namespace, work_dir: Path) -> tuple[Callable[[], Any], int, dict]:
+    """
+    准备步骤的输入（不计入耗时）
+
+    Returns:
+        (执行一次步骤的函数, 输入字节数, 附加信息)
+    """
+    size_chars = int(args.size_mb * 1024 * 1024 / (3 if name.endswith("_zh") else 1))
+    lang = "zh" if name.endswith("_zh") else "en"
+
+    if name.startswith(("parse_markdown_sections", "split_by_limit")):
+        module = importlib.import_module("llm_editor.book.01_split_book.01_split_by_markdown")
+        content, _ = corpus.generate_markdown_book(lang, size_chars, args.depth, args.seed)
+        nbytes = len(content.encode("utf-8"))
+        if name.startswith("parse_markdown_sections"):
+            return lambda: module.parse_markdown_sections(content), nbytes, {}
+        sections = module.parse_markdown_sections(content)
+        return lambda: module.split_by_limit(sections, lang == "zh"), nbytes, {"sections": len(sections)}
+
+    if name.startswith("split_book_by_catalog"):
+        module = importlib.import_module("llm_editor.book.01_split_book.01_split_by_catalog")
+        content, titles = corpus.generate_markdown_book(lang, size_chars, args.depth, args.seed)
+        return lambda: module.split_book_by_catalog(content, titles), len(content.encode("utf-8")), \
+            {"chapters": len(titles)}
+
+    if name.startswith("extract_chapters"):
+        module = importlib.import_module("llm_editor.epub.chinese.split_chapters")
+        content = corpus.generate_chinese_novel(size_chars, args.seed)
+        return lambda: module.extract_chapters(content), len(content.encode("utf-8")), {}
+
+    if name.startswith("extract_text_from_html"):
+        module = importlib.import_module("llm_editor.epub.epub_to_txt")
+        count = max(1, size_chars // 200 // 50)
+        chapters = [corpus.generate_html_chapter(lang, 50, args.seed + i) for i in range(count)]
+        return lambda: [module.extract_text_from_html(c) for c in chapters], sum(map(len, chapters)), \
+            {"chapters": len(chapters)}
+
+    if name.startswith("epub_to_txt"):
+        module = importlib.import_module("llm_editor.epub.epub_to_txt")
+        chapters = max(1, size_chars // 200 // 50)
+        epub_path = corpus.generate_epub(work_dir / "bench.epub", lang, chapters, 50, args.seed)
+        return lambda: module.epub_to_txt(epub_path), epub_path.stat().st_size, {"chapters": chapters}
+
+    if name.startswith("extract_text_from_srt"):
+        module = importlib.import_module("llm_editor.subtitle.extract_txt")
+        srt_path = work_dir / "bench.srt"
+        srt_path.write_text(corpus.generate_srt(max(1, size_chars // 40), lang, args.seed), encoding="utf-8")
+        return lambda: module.extract_text_from_srt(srt_path), srt_path.stat().st_size, {}
+
+    if name == "book_llm_stub":
+        return _setup_llm_stage(args, work_dir)
+
+    raise ValueError(f"Unknown stage: {name}")
+
+
+def _setup_llm_stage(args: argparse.Namespace, work_dir: Path) -> tuple[Callable[[], Any], int, dict]:
+    """LLM 步骤：BookLLMProcessor 并发请求本地桩服务"""
+    from common.client import LLMClient
+    from benchmark.stub_server import StubServer
+
+    module = importlib.import_module("llm_editor.book.04_llm_process")
+    content, _ = corpus.generate_markdown_book("zh", args.llm_files * 3000, 2, args.seed)
+    input_dir = work_dir / "llm_txt"
+    input_dir.mkdir()
+    chunk = max(1, len(content) // args.llm_files)
+    for i in range(args.llm_files):
+        (input_dir / f"{i:04d}.txt").write_text(content[i * chunk:(i + 1) * chunk], encoding="utf-8")
+    nbytes = sum(p.stat().st_size for p in input_dir.iterdir())
+
+    server = StubServer(latency=args.llm_latency).start()
+    client = LLMClient(api_key="stub", model_name="stub", base_url=server.base_url)
+    processor = module.BookLLMProcessor(client, input_dir, work_dir / "llm_md", num_threads=args.llm_threads)
+
+    def run() -> None:
+        result = processor.run()
+        if not result.all_success:
+            raise RuntimeError(f"{result.fail_count} LLM requests failed")
+
+    return run, nbytes, {"files": args.llm_files, "latency": args.llm_latency, "threads": args.llm_threads}
+
+
+def run_stage_in_process(name: str, args: argparse.Namespace) -> dict:
+    """
+    在当前进程中执行步骤并测量（由子进程调用）
+
+    Returns:
+        测量结果字典
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        run, nbytes, info = _setup_stage(name, args, Path(tmp))
+        rss_before = _peak_rss_mb()
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        rss_after = _peak_rss_mb()
+
+    best = min(timings)
+    return {
+        "stage": name,
+        "input_mb": nbytes / 1024 / 1024,
+        "best_s": best,
+        "median_s": statistics.median(timings),
+        "mb_per_s": nbytes / 1024 / 1024 / best if best > 0 else None,
+        "peak_rss_mb": rss_after,
+        "stage_rss_mb": rss_after - rss_before if rss_after is not None else None,
+        **info,
+    }
+
+
+def measure_stage(name: str, args: argparse.Namespace, src_dir: Path) -> dict:
+    """
+    在子进程中执行单个步骤
+
+    Returns:
+        测量结果字典，失败时包含 error
+    """
+    cmd = [
+        sys.executable, "-m", "benchmark.book_pipeline", "--child", name,
+        "--size-mb", str(args.size_mb), "--depth", str(args.depth), "--repeat", str(args.repeat),
+        "--seed", str(args.seed), "--llm-files", str(args.llm_files),
+        "--llm-latency", str(args.llm_latency), "--llm-threads", str(args.llm_threads),
+    ]
+    proc = subprocess.run(cmd, cwd=src_dir, capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        return {"stage": name, "error": error}
+    # 步骤执行时可能有日志输出，取最后一行 JSON
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare_with_baseline(results: list[dict], baseline_path: Path) -> None:
+    """打印与基线结果的对比（耗时变化百分比，负数表示更快）"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["stage"]: r for r in json.load(f)["results"] if "error" not in r}
+
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get(result["stage"])
+        if "error" in result or before is None:
+            continue
+        change = (result["best_s"] - before["best_s"]) / before["best_s"] * 100
+        rss_change = ""
+        if result.get("stage_rss_mb") is not None and before.get("stage_rss_mb") is not None:
+            rss_change = f", stage RSS {before['stage_rss_mb']:.1f} -> {result['stage_rss_mb']:.1f} MB"
+        print(f"  {result['stage']:30s} {before['best_s'] * 1000:9.2f} -> {result['best_s'] * 1000:9.2f} ms "
+              f"({change:+.1f}%){rss_change}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="Benchmark book pipeline stages on synthetic corpora")
+    parser.add_argument("--stages", nargs="*", default=None, help=f"stages to run (default: all): {STAGES}")
+    parser.add_argument("--size-mb", type=float, default=2.0, help="approximate input size per stage in MB")
+    parser.add_argument("--depth", type=int, default=3, help="markdown heading depth")
+    parser.add_argument("--repeat", type=int, default=5, help="repeat count per stage (best and median reported)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the synthetic corpus")
+    parser.add_argument("--llm-files", type=int, default=50, help="number of chapter files for the LLM stage")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub server latency in seconds")
+    parser.add_argument("--llm-threads", type=int, default=8, help="BookLLMProcessor threads")
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON results to compare against")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    return parser
+
+
+def main() -> None:
+    """主函数"""
+    args = build_parser().parse_args()
+
+    if args.child:
+        print(json.dumps(run_stage_in_process(args.child, args), ensure_ascii=False))
+        return
+
+    src_dir = Path(__file__).resolve().parent.parent
+    results = []
+    for name in args.stages or STAGES:
+        result = measure_stage(name, args, src_dir)
+        results.append(result)
+        if "error" in result:
+            print(f"{name:30s} ERROR: {result['error']}")
+            continue
+        rss = f"{result['peak_rss_mb']:.1f} MB" if result["peak_rss_mb"] is not None else "-"
+        print(f"{name:30s} {result['input_mb']:7.2f} MB  best {result['best_s'] * 1000:9.2f} ms  "
+              f"median {result['median_s'] * 1000:9.2f} ms  {result['mb_per_s']:8.2f} MB/s  peak RSS {rss}")
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "child")}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "python": sys.version, "results": results}, f,
+                      ensure_ascii=False, indent=2, default=str)
+        print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        compare_with_baseline(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
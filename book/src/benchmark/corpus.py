@@ -0,0 +1,230 @@
+"""
+合成测试语料
+
+按指定大小和标题层级生成中文/英文 Markdown 书籍、目录、章节小说、HTML、EPUB 和 SRT 字幕。
+同一组参数和随机种子总是生成相同的内容，便于前后对比
+"""
+
+import random
+import zipfile
+from pathlib import Path
+
+# 常用汉字，用于生成中文段落
+_CN_CHARS = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而"
+    "方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好"
+    "应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向"
+)
+_CN_PUNCTUATION = "，，，，。。！？；"
+_EN_WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at which but have an they "
+    "you were her she there been one all we their has would when if so no will what up out more can about into "
+    "system design memory process thread cache request server client network data model time value state change"
+).split()
+_CN_NUMERALS = "一二三四五六七八九十"
+
+
+def _cn_number(n: int) -> str:
+    """1~99 转中文数字"""
+    if n <= 10:
+        return _CN_NUMERALS[n - 1]
+    tens, ones = divmod(n, 10)
+    prefix = "" if tens == 1 else _CN_NUMERALS[tens - 1]
+    return prefix + "十" + (_CN_NUMERALS[ones - 1] if ones else "")
+
+
+def _cn_paragraph(rng: random.Random, length: int) -> str:
+    chars = rng.choices(_CN_CHARS, k=length)
+    for i in range(rng.randint(8, 20), length, rng.randint(8, 20)):
+        chars[i] = rng.choice(_CN_PUNCTUATION)
+    return "".join(chars) + "。"
+
+
+def _en_paragraph(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choices(_EN_WORDS, k=words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraph(rng: random.Random, lang: str) -> str:
+    if lang == "zh":
+        return _cn_paragraph(rng, rng.randint(80, 300))
+    return _en_paragraph(rng, rng.randint(40, 150))
+
+
+def generate_markdown_book(lang: str = "zh", size_chars: int = 1_000_000, depth: int = 3,
+                           seed: int = 0) -> tuple[str, list[str]]:
+    """
+    生成带多级标题的 Markdown 书籍
+
+    Args:
+        lang: zh 或 en
+        size_chars: 目标字符数
+        depth: 标题层级深度（1~6）
+        seed: 随机种子
+
+    Returns:
+        (Markdown 内容, 一级标题列表（可作为目录）)
+    """
+    rng = random.Random(seed)
+    parts: list[str] = []
+    top_titles: list[str] = []
+    counters = [0] * depth
+    total = 0
+    level = 1
+    while total < size_chars:
+        counters[level - 1] += 1
+        for i in range(level, depth):
+            counters[i] = 0
+        number = ".".join(str(c) for c in counters[:level])
+        if lang == "zh":
+            title = f"第{number}节 {_cn_paragraph(rng, rng.randint(4, 10))[:-1]}" if level > 1 \
+                else f"第{counters[0]}章 {_cn_paragraph(rng, rng.randint(4, 10))[:-1]}"
+        else:
+            title = f"{'Chapter' if level == 1 else 'Section'} {number} {_en_paragraph(rng, rng.randint(2, 6))[:-1]}"
+        heading = f"{'#' * level} {title}"
+        if level == 1:
+            top_titles.append(heading)
+        parts.append(heading)
+        for _ in range(rng.randint(3, 12)):
+            paragraph = _paragraph(rng, lang)
+            parts.append(paragraph)
+            total += len(paragraph)
+        # 随机进入下一级、保持同级或返回上级
+        level = max(1, min(depth, level + rng.choice((-1, 0, 1, 1))))
+    return "\n\n".join(parts) + "\n", top_titles
+
+
+def generate_chinese_novel(size_chars: int = 1_000_000, seed: int = 0) -> str:
+    """
+    生成以“第X章 标题”分章的中文小说纯文本（用于 extract_chapters）
+
+    Args:
+        size_chars: 目标字符数
+        seed: 随机种子
+
+    Returns:
+        文本内容
+    """
+    rng = random.Random(seed)
+    lines = ["前言", _cn_paragraph(rng, 200)]
+    total = 0
+    chapter = 0
+    while total < size_chars:
+        chapter += 1
+        lines.append(f"第{_cn_number(chapter % 99 + 1)}章 {_cn_paragraph(rng, 6)[:-1]}")
+        for _ in range(rng.randint(20, 60)):
+            paragraph = _cn_paragraph(rng, rng.randint(80, 300))
+            lines.append(paragraph)
+            total += len(paragraph)
+    lines += ["后记", _cn_paragraph(rng, 200)]
+    return "\n".join(lines) + "\n"
+
+
+def generate_html_chapter(lang: str = "zh", paragraphs: int = 50, seed: int = 0) -> bytes:
+    """
+    生成一个 XHTML 章节（含脚本、样式和内联标签）
+
+    Args:
+        lang: zh 或 en
+        paragraphs: 段落数
+        seed: 随机种子
+
+    Returns:
+        UTF-8 编码的 XHTML 内容
+    """
+    rng = random.Random(seed)
+    body = [f"<h1>{_paragraph(rng, lang)[:20]}</h1>"]
+    for i in range(paragraphs):
+        text = _paragraph(rng, lang)
+        if i % 5 == 0:
+            cut = len(text) // 2
+            text = f"{text[:cut]}<em>{text[cut:cut + 6]}</em><a href=\"#n{i}\">{i}</a>{text[cut + 6:]}"
+        body.append(f"<p class=\"p{i % 3}\">{text}</p>")
+    html = (
+        "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n"
+        "<html xmlns=\"http://www.w3.org/1999/xhtml\"><head><title>chapter</title>"
+        "<style>p { text-indent: 2em; }</style><script>var x = 1;</script></head>"
+        f"<body>{''.join(body)}</body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def generate_epub(epub_path: Path, lang: str = "zh", chapters: int = 20, paragraphs: int = 50,
+                  seed: int = 0) -> Path:
+    """
+    生成最小的 EPUB 文件（直接写 zip，不依赖 ebooklib）
+
+    Args:
+        epub_path: 输出路径
+        lang: zh 或 en
+        chapters: 章节数
+        paragraphs: 每章段落数
+        seed: 随机种子
+
+    Returns:
+        EPUB 文件路径
+    """
+    manifest = "".join(
+        f'<item id="c{i}" href="c{i}.xhtml" media-type="application/xhtml+xml"/>' for i in range(chapters)
+    )
+    spine = "".join(f'<itemref idref="c{i}"/>' for i in range(chapters))
+    opf = (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">'
+        '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        f'<dc:identifier id="id">bench-{seed}</dc:identifier><dc:title>benchmark</dc:title>'
+        f'<dc:language>{lang}</dc:language></metadata>'
+        f'<manifest><item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>'
+        f'{manifest}</manifest><spine>{spine}</spine></package>'
+    )
+    nav = (
+        '<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml" '
+        'xmlns:epub="http://www.idpf.org/2007/ops"><head><title>nav</title></head><body>'
+        '<nav epub:type="toc"><ol>'
+        + "".join(f'<li><a href="c{i}.xhtml">{i}</a></li>' for i in range(chapters))
+        + "</ol></nav></body></html>"
+    )
+    container = (
+        '<?xml version="1.0"?><container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+        '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+        '</rootfiles></container>'
+    )
+    epub_path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(epub_path, "w") as zf:
+        zf.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("META-INF/container.xml", container, compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("OEBPS/content.opf", opf, compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("OEBPS/nav.xhtml", nav, compress_type=zipfile.ZIP_DEFLATED)
+        for i in range(chapters):
+            zf.writestr(f"OEBPS/c{i}.xhtml", generate_html_chapter(lang, paragraphs, seed + i),
+                        compress_type=zipfile.ZIP_DEFLATED)
+    return epub_path
+
+
+def generate_srt(cues: int = 5000, lang: str = "zh", seed: int = 0) -> str:
+    """
+    生成 SRT 字幕
+
+    Args:
+        cues: 字幕条数
+        lang: zh 或 en
+        seed: 随机种子
+
+    Returns:
+        SRT 内容
+    """
+    rng = random.Random(seed)
+    blocks = []
+    ms = 0
+    for i in range(1, cues + 1):
+        start = ms
+        ms += rng.randint(800, 4000)
+        blocks.append(f"{i}\n{_srt_time(start)} --> {_srt_time(ms)}\n{_paragraph(rng, lang)[:40]}\n")
+    return "\n".join(blocks)
+
+
+def _srt_time(ms: int) -> str:
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
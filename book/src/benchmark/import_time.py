@@ -0,0 +1,113 @@
+"""
+导入耗时基准测试
+
+在独立的子进程中冷启动导入各入口模块，统计导入耗时（中位数）和被加载的重型第三方依赖。
+用法（在 src 目录下执行）:
+    python -m benchmark.import_time
+    python -m benchmark.import_time --repeat 20 --output import_time.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# 需要测量的入口模块
+ENTRY_MODULES = [
+    "common",
+    "llm_editor.utils",
+    "llm_editor.base",
+    "llm_editor.article.clean",
+    "llm_editor.article.add_prompt",
+    "llm_editor.article.llm_process",
+    "llm_editor.book.02_build_catalog",
+    "llm_editor.book.03_add_prompt",
+    "llm_editor.book.04_llm_process",
+    "llm_editor.book.01_split_book.01_split_by_markdown",
+    "llm_editor.subtitle.extract_txt",
+    "llm_editor.epub.chinese.split_chapters",
+    "llm_editor.epub.epub_to_txt",
+    "hackmd.upload_notes",
+]
+
+# 需要关注的重型第三方依赖
+HEAVY_MODULES = ["openai", "requests", "yaml", "dotenv", "ebooklib", "bs4", "lxml"]
+
+# 子进程中执行的测量脚本
+_PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_module(module: str, repeat: int, src_dir: Path) -> dict:
+    """
+    在子进程中重复冷启动导入模块
+
+    Args:
+        module: 模块名
+        repeat: 重复次数
+        src_dir: src 目录（作为工作目录和导入路径）
+
+    Returns:
+        测量结果字典
+    """
+    timings: list[float] = []
+    heavy: list[str] = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=src_dir,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            return {"module": module, "error": error}
+        # 模块导入时可能有日志输出，取最后一行 JSON
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        timings.append(result["elapsed"])
+        heavy = result["heavy"]
+
+    return {
+        "module": module,
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "heavy_modules": heavy,
+    }
+
+
+def main() -> None:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Measure cold import time of entry modules")
+    parser.add_argument("--repeat", type=int, default=10, help="repeat count per module")
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON")
+    parser.add_argument("modules", nargs="*", help="modules to measure (default: all entry modules)")
+    args = parser.parse_args()
+
+    src_dir = Path(__file__).resolve().parent.parent
+    modules = args.modules or ENTRY_MODULES
+
+    results = []
+    for module in modules:
+        result = measure_module(module, args.repeat, src_dir)
+        results.append(result)
+        if "error" in result:
+            print(f"{module:55s} ERROR: {result['error']}")
+        else:
+            heavy = ", ".join(result["heavy_modules"]) or "-"
+            print(f"{module:55s} {result['median_ms']:8.2f} ms  (min {result['min_ms']:.2f} ms)  heavy: {heavy}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+LLM 并发压测
+
+启动本地桩服务（benchmark.stub_server）并通过 LLM_BASE_URL 指向它，用 LLMClient.from_settings() 创建客户端，
+以不同的线程数运行 BookLLMProcessor，统计吞吐量、请求延迟分位数、失败数和桩服务观察到的限流情况，
+用于离线确定各服务商合适的 NUM_THREADS 和 LLM_MAX_RETRIES。
+用法（在 src 目录下执行）:
+    python -m benchmark.llm_load --threads 1 2 4 8 16 --latency-dist lognormal --latency-mean 1.5 \\
+        --latency-std 0.8 --tokens-per-second 80 --rpm 60 --error-rate-5xx 0.02
+    python -m benchmark.llm_load --base-url http://127.0.0.1:8765/v1 --threads 4 8   # 使用已启动的桩服务
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from benchmark import corpus
+from benchmark.stub_server import StubServer, add_stub_arguments, config_from_args
+
+# 压测时只保留警告以上的日志，避免每个请求输出多行
+_NOISY_LOGGERS = ["llm_client", "book_llm_process", "batch_processor"]
+
+
+def _percentile(values: list[float], percent: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def prepare_inputs(input_dir: Path, files: int, file_chars: int, seed: int) -> None:
+    """生成压测用的章节文件"""
+    content, _ = corpus.generate_markdown_book("zh", files * file_chars, 2, seed)
+    input_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        (input_dir / f"{i:04d}.txt").write_text(content[i * file_chars:(i + 1) * file_chars], encoding="utf-8")
+
+
+def run_round(client, input_dir: Path, output_dir: Path, num_threads: int,
+              server: Optional[StubServer]) -> dict:
+    """
+    以指定线程数处理一遍所有文件
+
+    Returns:
+        本轮统计结果
+    """
+    module = importlib.import_module("llm_editor.book.04_llm_process")
+    if server is not None:
+        server.reset_stats()
+    processor = module.BookLLMProcessor(client, input_dir, output_dir, num_threads=num_threads)
+
+    start = time.perf_counter()
+    result = processor.run()
+    wall_time = time.perf_counter() - start
+
+    latencies = [r.elapsed_time for r in result.results if r.success]
+    stats = {
+        "threads": num_threads,
+        "files": result.total_files,
+        "success": result.success_count,
+        "failed": result.fail_count,
+        "wall_s": wall_time,
+        "files_per_s": result.success_count / wall_time if wall_time > 0 else None,
+        "tokens_per_s": result.total_tokens / wall_time if wall_time > 0 else None,
+        "latency_p50_s": _percentile(latencies, 50),
+        "latency_p95_s": _percentile(latencies, 95),
+        "latency_max_s": max(latencies) if latencies else None,
+    }
+    if server is not None:
+        stats["server"] = server.stats.to_dict()
+    return stats
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main() -> None:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Load-test LLMClient / BatchFileProcessor against a stub server")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="thread counts to try")
+    parser.add_argument("--files", type=int, default=40, help="number of files per round")
+    parser.add_argument("--file-chars", type=int, default=2000, help="characters per file")
+    parser.add_argument("--max-retries", type=int, default=None, help="override LLM_MAX_RETRIES")
+    parser.add_argument("--base-url", default=None, help="use an already running stub server instead of starting one")
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep per-request logs")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url is None:
+        server = StubServer(config=config_from_args(args)).start()
+    base_url = args.base_url or server.base_url
+
+    # 通过环境变量覆盖配置（优先于 .env），客户端按正常流程从配置创建
+    os.environ["LLM_BASE_URL"] = base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    if args.max_retries is not None:
+        os.environ["LLM_MAX_RETRIES"] = str(args.max_retries)
+
+    from common.client import LLMClient
+    client = LLMClient.from_settings()
+
+    if not args.verbose:
+        for name in _NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    print(f"Load testing {base_url} with {args.files} files x {args.file_chars} chars")
+    print(f"{'threads':>7} {'ok':>5} {'fail':>5} {'wall s':>8} {'files/s':>8} {'tok/s':>9} "
+          f"{'p50 s':>7} {'p95 s':>7} {'429':>5} {'5xx':>5} {'active':>6}")
+
+    rounds = []
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp) / "txt"
+        prepare_inputs(input_dir, args.files, args.file_chars, args.seed or 0)
+        for num_threads in args.threads:
+            stats = run_round(client, input_dir, Path(tmp) / f"md_{num_threads}", num_threads, server)
+            rounds.append(stats)
+            server_stats = stats.get("server", {})
+            rejected = sum(server_stats.get(k, 0) for k in ("injected_429", "rate_limited", "concurrency_limited"))
+            print(f"{num_threads:>7} {stats['success']:>5} {stats['failed']:>5} {stats['wall_s']:>8.2f} "
+                  f"{_fmt(stats['files_per_s'], '8.2f')} {_fmt(stats['tokens_per_s'], '9.0f')} "
+                  f"{_fmt(stats['latency_p50_s'], '7.2f')} {_fmt(stats['latency_p95_s'], '7.2f')} "
+                  f"{rejected if server else '-':>5} {server_stats.get('injected_5xx', '-'):>5} "
+                  f"{server_stats.get('max_active', '-'):>6}")
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    # 没有失败的轮次中吞吐量最高的线程数
+    clean_rounds = [r for r in rounds if r["failed"] == 0 and r["files_per_s"]]
+    if clean_rounds:
+        best = max(clean_rounds, key=lambda r: r["files_per_s"])
+        print(f"\nBest NUM_THREADS without failures: {best['threads']} ({best['files_per_s']:.2f} files/s)")
+    else:
+        print("\nEvery round had failures: lower NUM_THREADS or raise LLM_MAX_RETRIES")
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k != "output"}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "rounds": rounds}, f, ensure_ascii=False, indent=2, default=str)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
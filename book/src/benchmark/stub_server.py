@@ -0,0 +1,402 @@
+"""
+本地 OpenAI 兼容桩服务
+
+实现 POST {base}/chat/completions（含 stream=true 的 SSE 流式响应），用于在不消耗真实 token 的情况下
+压测 LLMClient / BatchFileProcessor 的并发设置：
+- 首 token 延迟服从可配置的分布（fixed / uniform / normal / lognormal / exponential）
+- 输出 token 数与输入成比例，按每秒 token 数计算生成耗时
+- 按比例注入 429 / 5xx 错误，模拟每分钟请求数（RPM）和并发数限制，429 带 Retry-After
+用法:
+    python -m benchmark.stub_server --port 8765 --latency-dist lognormal --latency-mean 0.8 --rpm 120
+    然后设置 LLM_BASE_URL=http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from llm_editor.utils import estimate_tokens
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+@dataclass
+class StubConfig:
+    """桩服务行为配置"""
+    latency_dist: str = "fixed"  # 首 token 延迟分布
+    latency_mean: float = 0.0  # 首 token 延迟均值（秒）
+    latency_std: float = 0.0  # 标准差（uniform 为半宽）
+    tokens_per_second: float = 0.0  # 输出速度，0 表示不计生成耗时
+    completion_ratio: float = 1.0  # 输出 token 数 = 输入 token 数 * ratio
+    max_completion_tokens: int = 4096  # 输出 token 数上限
+    error_rate_429: float = 0.0  # 随机返回 429 的比例
+    error_rate_5xx: float = 0.0  # 随机返回 500/502/503 的比例
+    retry_after: float = 1.0  # 429 / 503 响应的 Retry-After（秒）
+    rpm: int = 0  # 每分钟请求数限制，0 表示不限制
+    max_concurrency: int = 0  # 同时处理的请求数限制，0 表示不限制
+    seed: Optional[int] = None  # 随机种子
+
+    def __post_init__(self):
+        if self.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency_dist!r}, "
+                             f"expected one of {LATENCY_DISTRIBUTIONS}")
+
+
+@dataclass
+class StubStats:
+    """桩服务统计"""
+    requests: int = 0  # 收到的请求数
+    completed: int = 0  # 正常返回的请求数
+    streamed: int = 0  # 其中流式返回的请求数
+    injected_429: int = 0  # 随机注入的 429
+    injected_5xx: int = 0  # 随机注入的 5xx
+    rate_limited: int = 0  # 超过 RPM 返回的 429
+    concurrency_limited: int = 0  # 超过并发数返回的 429
+    max_active: int = 0  # 观察到的最大并发请求数
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """请求处理器，配置和统计由所属的 StubServer 持有"""
+
+    server: "StubServer"
+    # 非流式响应保持连接，减少与真实服务无关的建连开销
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        # 不输出每个请求的访问日志
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, retry_after: Optional[float] = None) -> None:
+        headers = {}
+        if retry_after is not None:
+            headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+            headers["retry-after-ms"] = str(int(retry_after * 1000))
+        error_type = "rate_limit_exceeded" if status == 429 else "server_error"
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": status}}, headers)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        request = json.loads(raw or b"{}")
+
+        rejection = self.server.admit()
+        if rejection is not None:
+            self._send_error(*rejection)
+            return
+        try:
+            self._complete(request)
+        finally:
+            self.server.release()
+
+    def _complete(self, request: dict) -> None:
+        server = self.server
+        config = server.config
+        prompt = "".join(m.get("content") or "" for m in request.get("messages", []) if isinstance(m, dict))
+        prompt_tokens = max(1, estimate_tokens(prompt))
+        completion_tokens = max(1, min(config.max_completion_tokens, int(prompt_tokens * config.completion_ratio)))
+        content = server.make_content(prompt, completion_tokens)
+
+        time.sleep(server.sample_latency())
+        server.record_tokens(prompt_tokens, completion_tokens)
+
+        created = int(time.time())
+        model = request.get("model", "stub")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        if request.get("stream"):
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+            self._stream(content, completion_tokens, model, created, usage if include_usage else None)
+            return
+
+        if config.tokens_per_second > 0:
+            time.sleep(completion_tokens / config.tokens_per_second)
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, content: str, completion_tokens: int, model: str, created: int,
+                usage: Optional[dict]) -> None:
+        """SSE 流式响应：按 tokens_per_second 分块发送，使用分块传输编码，连接在响应结束后可复用"""
+        config = self.server.config
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def send(delta: Optional[dict], finish_reason: Optional[str] = None,
+                 chunk_usage: Optional[dict] = None) -> None:
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if chunk_usage is not None:
+                chunk["usage"] = chunk_usage
+            write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        # 每块约 20ms 的 token，避免逐 token 发送的开销
+        pieces = max(1, min(len(content), completion_tokens))
+        interval = 0.0
+        if config.tokens_per_second > 0:
+            generation_time = completion_tokens / config.tokens_per_second
+            pieces = max(1, min(pieces, int(generation_time / 0.02)))
+            interval = generation_time / pieces
+        step = math.ceil(len(content) / pieces)
+
+        send({"role": "assistant", "content": ""})
+        for start in range(0, len(content), step):
+            if interval:
+                time.sleep(interval)
+            send({"content": content[start:start + step]})
+        send({}, finish_reason="stop")
+        if usage is not None:
+            send(None, chunk_usage=usage)
+        write_chunk(b"data: [DONE]\n\n")
+        # 结束块
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+        self.server.record_streamed()
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    桩服务，可作为上下文管理器在后台线程中运行
+
+    用法:
+        with StubServer(config=StubConfig(latency_mean=0.2)) as server:
+            client = LLMClient(api_key="stub", model_name="stub", base_url=server.base_url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 config: Optional[StubConfig] = None):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示随机端口
+            latency: 固定响应延迟（秒），指定 config 时忽略
+            config: 行为配置
+        """
+        super().__init__((host, port), _Handler)
+        self.config = config or StubConfig(latency_mean=latency)
+        self.stats = StubStats()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._active = 0
+        self._request_times: deque[float] = deque()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI 客户端使用的 base_url（即 LLM_BASE_URL）"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def request_count(self) -> int:
+        return self.stats.requests
+
+    def admit(self) -> Optional[tuple[int, str, Optional[float]]]:
+        """
+        判断请求是否被接受
+
+        Returns:
+            None 表示接受；否则为 (状态码, 错误信息, Retry-After 秒数) 元组
+        """
+        config = self.config
+        with self._lock:
+            self.stats.requests += 1
+            now = time.monotonic()
+
+            if config.rpm > 0:
+                while self._request_times and now - self._request_times[0] >= 60:
+                    self._request_times.popleft()
+                if len(self._request_times) >= config.rpm:
+                    self.stats.rate_limited += 1
+                    return (429, f"Rate limit of {config.rpm} requests per minute exceeded",
+                            60 - (now - self._request_times[0]))
+            if config.max_concurrency > 0 and self._active >= config.max_concurrency:
+                self.stats.concurrency_limited += 1
+                return 429, f"Too many concurrent requests (limit {config.max_concurrency})", config.retry_after
+
+            roll = self._rng.random()
+            if roll < config.error_rate_429:
+                self.stats.injected_429 += 1
+                return 429, "Injected rate limit error", config.retry_after
+            if roll < config.error_rate_429 + config.error_rate_5xx:
+                self.stats.injected_5xx += 1
+                status = self._rng.choice((500, 502, 503))
+                return status, f"Injected server error {status}", config.retry_after if status == 503 else None
+
+            if config.rpm > 0:
+                self._request_times.append(now)
+            self._active += 1
+            self.stats.max_active = max(self.stats.max_active, self._active)
+            return None
+
+    def release(self) -> None:
+        """请求处理结束"""
+        with self._lock:
+            self._active -= 1
+
+    def sample_latency(self) -> float:
+        """按配置的分布采样首 token 延迟"""
+        config = self.config
+        mean, std = config.latency_mean, config.latency_std
+        with self._lock:
+            if config.latency_dist == "fixed" or mean <= 0:
+                value = mean
+            elif config.latency_dist == "uniform":
+                value = self._rng.uniform(mean - std, mean + std)
+            elif config.latency_dist == "normal":
+                value = self._rng.gauss(mean, std)
+            elif config.latency_dist == "lognormal":
+                # 由均值和标准差换算对数正态分布的参数
+                sigma2 = math.log(1 + (std / mean) ** 2)
+                value = self._rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+            else:
+                value = self._rng.expovariate(1 / mean)
+        return max(0.0, value)
+
+    @staticmethod
+    def make_content(prompt: str, completion_tokens: int) -> str:
+        """生成约 completion_tokens 个 token 的 Markdown 响应（复用输入文本）"""
+        body = prompt or "stub"
+        text = (body * (completion_tokens // len(body) + 1))[:completion_tokens]
+        return f"# stub response\n\n{text}"
+
+    def record_tokens(self, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.stats.completed += 1
+            self.stats.prompt_tokens += prompt_tokens
+            self.stats.completion_tokens += completion_tokens
+
+    def record_streamed(self) -> None:
+        with self._lock:
+            self.stats.streamed += 1
+
+    def reset_stats(self) -> None:
+        """清空统计和 RPM 窗口（压测每一轮开始前调用）"""
+        with self._lock:
+            self.stats = StubStats()
+            self._request_times.clear()
+
+    def start(self) -> "StubServer":
+        """在后台线程中开始服务"""
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """添加桩服务行为参数（stub_server 和压测脚本共用）"""
+    group = parser.add_argument_group("stub server")
+    group.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed",
+                       help="time-to-first-token distribution")
+    group.add_argument("--latency-mean", type=float, default=0.5, help="mean time to first token in seconds")
+    group.add_argument("--latency-std", type=float, default=0.0,
+                       help="standard deviation (half width for uniform) in seconds")
+    group.add_argument("--tokens-per-second", type=float, default=0.0,
+                       help="completion speed, 0 means completions are instant")
+    group.add_argument("--completion-ratio", type=float, default=1.0, help="completion tokens / prompt tokens")
+    group.add_argument("--max-completion-tokens", type=int, default=4096)
+    group.add_argument("--error-rate-429", type=float, default=0.0, help="fraction of requests rejected with 429")
+    group.add_argument("--error-rate-5xx", type=float, default=0.0, help="fraction of requests failed with 5xx")
+    group.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429/503")
+    group.add_argument("--rpm", type=int, default=0, help="requests per minute limit, 0 = unlimited")
+    group.add_argument("--max-concurrency", type=int, default=0, help="concurrent request limit, 0 = unlimited")
+    group.add_argument("--seed", type=int, default=None, help="random seed")
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    """由命令行参数构造 StubConfig"""
+    return StubConfig(
+        latency_dist=args.latency_dist,
+        latency_mean=args.latency_mean,
+        latency_std=args.latency_std,
+        tokens_per_second=args.tokens_per_second,
+        completion_ratio=args.completion_ratio,
+        max_completion_tokens=args.max_completion_tokens,
+        error_rate_429=args.error_rate_429,
+        error_rate_5xx=args.error_rate_5xx,
+        retry_after=args.retry_after,
+        rpm=args.rpm,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, config=config_from_args(args))
+    print(f"Stub server listening on {server.base_url}")
+    print(f"Point the pipeline at it with: LLM_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Stats: {json.dumps(server.stats.to_dict())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,16 @@
 公共模块
 
 提供路径管理、日志管理、配置管理、客户端等公共功能
+
+路径和日志工具只依赖标准库，直接导入；
+配置（dotenv）和客户端（openai/requests）按需在首次访问时导入（PEP 562），
+不访问网络的脚本不再承担这些依赖的导入开销
 """
 
+from typing import TYPE_CHECKING
+
+from common.utils.lazy_import import make_lazy_getattr
+
 from common.utils import (
     PathType,
     PathManager,
@@ -12,16 +20,27 @@ from common.utils import (
     setup_logger,
     get_logger,
     logger,
+    stop_queue_listener,
 )
-from common.config import (
-    EnvVar,
-    Settings,
-    get_settings,
-)
-from common.client import (
-    LLMClient,
-    LLMResponse,
-)
+
+if TYPE_CHECKING:
+    from common.config import EnvVar, Settings, get_settings, ConfigSnapshot, get_config
+    from common.client import LLMClient, LLMResponse
+
+_LAZY_ATTRS = {
+    # 配置管理
+    "EnvVar": "common.config",
+    "Settings": "common.config",
+    "get_settings": "common.config",
+    "ConfigSnapshot": "common.config",
+    "get_config": "common.config",
+    # 客户端
+    "LLMClient": "common.client",
+    "LLMResponse": "common.client",
+}
+
+__getattr__, __dir__ = make_lazy_getattr(__name__, _LAZY_ATTRS)
+
 
 __all__ = [
     # 路径管理
@@ -32,10 +51,13 @@ __all__ = [
     "setup_logger",
     "get_logger",
     "logger",
+    "stop_queue_listener",
     # 配置管理
     "EnvVar",
     "Settings",
     "get_settings",
+    "ConfigSnapshot",
+    "get_config",
     # 客户端
     "LLMClient",
     "LLMResponse",
@@ -2,12 +2,29 @@
 """
 客户端模块
 
-提供 LLM 客户端等通用功能
+提供 LLM 客户端、HackMD 客户端等通用功能
+客户端依赖 openai/requests，按需在首次访问时导入（PEP 562）
 """
 
-from common.client.llm_client import LLMClient, LLMResponse
+from typing import TYPE_CHECKING
+
+from common.utils.lazy_import import make_lazy_getattr
+
+if TYPE_CHECKING:
+    from common.client.llm_client import LLMClient, LLMResponse
+    from common.client.hackmd_client import HackMDClient
+
+_LAZY_ATTRS = {
+    "LLMClient": "common.client.llm_client",
+    "LLMResponse": "common.client.llm_client",
+    "HackMDClient": "common.client.hackmd_client",
+}
+
+__getattr__, __dir__ = make_lazy_getattr(__name__, _LAZY_ATTRS)
+
 
 __all__ = [
     "LLMClient",
     "LLMResponse",
+    "HackMDClient",
 ]
@@ -6,9 +6,12 @@ HackMD API 客户端封装
 API文档参考: docs/hackmd/api.md
 """
 
-from typing import Optional
+import threading
+import time
+from typing import Iterator, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from common import get_logger
 from common.config import get_settings, EnvVar
@@ -31,20 +34,46 @@ class HackMDClient:
 
     BASE_URL = "https://api.hackmd.io/v1"
 
-    def __init__(self, api_token: str):
+    # 需要重试的状态码（限流和服务端错误）
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    # 非幂等请求（POST）只在 429 时重试：5xx 时服务端可能已经创建了笔记，重试会产生重复笔记
+    NON_IDEMPOTENT_RETRY_STATUS_CODES = (429,)
+    NON_IDEMPOTENT_METHODS = ("POST",)
+
+    def __init__(
+            self,
+            api_token: str,
+            pool_size: int = 10,
+            max_retries: int = 3,
+            backoff_factor: float = 1.0,
+    ):
         """
         初始化 HackMD 客户端
         
         Args:
             api_token: HackMD API Token
+            pool_size: 连接池大小（并发上传时应不小于线程数）
+            max_retries: 限流或服务端错误时的最大重试次数
+            backoff_factor: 指数退避基数（秒）
         """
         self.api_token = api_token
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json",
         })
 
+        # 多线程共享同一个 Session，连接池需要容纳所有并发连接
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # 限流状态：配额耗尽时所有线程等待到该时间点
+        self._rate_limit_lock = threading.Lock()
+        self._rate_limit_until = 0.0
+
     @classmethod
     def from_settings(cls) -> "HackMDClient":
         """
@@ -62,8 +91,55 @@ class HackMDClient:
         if not api_token:
             raise ValueError("HACKMD_API_TOKEN not found in config")
 
+        pool_size = settings.get(EnvVar.HACKMD_NUM_THREADS)
+
         logger.info("HackMD client initialized")
-        return cls(api_token=api_token)
+        return cls(api_token=api_token, pool_size=pool_size)
+
+    def _wait_for_rate_limit(self) -> None:
+        """如果当前处于限流窗口内，等待到窗口结束"""
+        with self._rate_limit_lock:
+            wait_seconds = self._rate_limit_until - time.time()
+        if wait_seconds > 0:
+            logger.debug("Rate limited, waiting %.2fs", wait_seconds)
+            time.sleep(wait_seconds)
+
+    def _update_rate_limit(self, response: requests.Response, attempt: int) -> float:
+        """
+        根据响应头更新限流状态
+        
+        优先使用 Retry-After，其次使用 X-RateLimit-UserRemaining / X-RateLimit-UserReset，
+        都没有时对 429/5xx 使用指数退避
+        
+        Args:
+            response: HTTP 响应
+            attempt: 当前重试次数（从 0 开始）
+        
+        Returns:
+            需要等待的秒数，0 表示无需等待
+        """
+        wait_seconds = 0.0
+        headers = response.headers
+
+        retry_after = headers.get("Retry-After")
+        remaining = headers.get("X-RateLimit-UserRemaining")
+        reset = headers.get("X-RateLimit-UserReset")
+
+        if retry_after is not None and retry_after.isdigit():
+            wait_seconds = float(retry_after)
+        elif remaining is not None and remaining.isdigit() and int(remaining) == 0 and reset:
+            # reset 为配额重置的时间戳（秒或毫秒）
+            reset_at = float(reset)
+            if reset_at > 1e12:
+                reset_at /= 1000
+            wait_seconds = max(reset_at - time.time(), 0.0)
+        elif response.status_code in self.RETRY_STATUS_CODES:
+            wait_seconds = self.backoff_factor * (2 ** attempt)
+
+        if wait_seconds > 0:
+            with self._rate_limit_lock:
+                self._rate_limit_until = max(self._rate_limit_until, time.time() + wait_seconds)
+        return wait_seconds
 
     def _request(
             self,
@@ -74,6 +150,8 @@ class HackMDClient:
         """
         发送 HTTP 请求
         
+        遇到 429 或 5xx 时按照限流响应头等待后重试，最多重试 max_retries 次；POST 只在 429 时重试
+        
         Args:
             method: HTTP 方法 (GET, POST, PATCH, DELETE)
             endpoint: API 端点
@@ -86,14 +164,29 @@ class HackMDClient:
             requests.HTTPError: 请求失败
         """
         url = f"{self.BASE_URL}{endpoint}"
-        logger.debug(f"Request: {method} {url}")
+        logger.debug("Request: %s %s", method, url)
+        if method.upper() in self.NON_IDEMPOTENT_METHODS:
+            retry_status_codes = self.NON_IDEMPOTENT_RETRY_STATUS_CODES
+        else:
+            retry_status_codes = self.RETRY_STATUS_CODES
 
         try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data,
-            )
+            attempt = 0
+            while True:
+                self._wait_for_rate_limit()
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    json=data,
+                )
+                wait_seconds = self._update_rate_limit(response, attempt)
+                if response.status_code not in retry_status_codes or attempt >= self.max_retries:
+                    break
+                attempt += 1
+                logger.warning(
+                    f"Request {method} {url} got {response.status_code}, "
+                    f"retry {attempt}/{self.max_retries} after {wait_seconds:.2f}s"
+                )
             response.raise_for_status()
 
             # DELETE 请求返回 204 无内容
@@ -137,6 +230,19 @@ class HackMDClient:
         data = self._request("GET", "/notes")
         return [Note.from_dict(note) for note in data]
 
+    def iter_notes(self) -> Iterator[Note]:
+        """
+        逐个迭代用户工作区的笔记（惰性构造 Note 视图对象）
+        
+        GET /notes
+        
+        Yields:
+            Note 笔记对象
+        """
+        logger.info("Getting notes list (iterator)")
+        data = self._request("GET", "/notes")
+        return map(Note.from_dict, data)
+
     def get_notes_raw(self) -> list[dict]:
         """
         获取用户工作区的笔记列表（原始 JSON 格式）
@@ -254,3 +360,16 @@ class HackMDClient:
         logger.info("Getting reading history")
         data = self._request("GET", "/history")
         return [Note.from_dict(note) for note in data]
+
+    def iter_history(self) -> Iterator[Note]:
+        """
+        逐个迭代阅读历史（惰性构造 Note 视图对象）
+        
+        GET /history
+        
+        Yields:
+            Note 笔记对象
+        """
+        logger.info("Getting reading history (iterator)")
+        data = self._request("GET", "/history")
+        return map(Note.from_dict, data)
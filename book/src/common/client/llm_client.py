@@ -6,10 +6,8 @@ LLM 客户端封装模块
 import time
 from dataclasses import dataclass
 
-from openai import OpenAI
-
 from common import get_logger
-from common.config import get_settings, EnvVar
+from common.config import get_settings, get_config, EnvVar
 
 logger = get_logger("llm_client")
 
@@ -39,7 +37,8 @@ class LLMClient:
         self,
         api_key: str,
         model_name: str,
-        base_url: str = "https://openrouter.ai/api/v1"
+        base_url: str = "https://openrouter.ai/api/v1",
+        max_retries: int = 2
     ):
         """
         初始化 LLM 客户端
@@ -48,8 +47,12 @@ class LLMClient:
             api_key: API 密钥
             model_name: 模型名称
             base_url: API 基础 URL
+            max_retries: 429 / 5xx / 连接错误的重试次数（由 openai 客户端按 Retry-After 退避）
         """
-        self.client = OpenAI(base_url=base_url, api_key=api_key)
+        # openai 导入较慢，延迟到创建客户端时
+        from openai import OpenAI
+
+        self.client = OpenAI(base_url=base_url, api_key=api_key, max_retries=max_retries)
         self.model_name = model_name
         self.base_url = base_url
     
@@ -76,7 +79,12 @@ class LLMClient:
             raise ValueError("MODEL_NAME or LLM_MODEL not found in config")
         
         logger.info(f"LLM client initialized with model: {model_name}")
-        return cls(api_key=api_key, model_name=model_name, base_url=base_url)
+        return cls(
+            api_key=api_key,
+            model_name=model_name,
+            base_url=base_url,
+            max_retries=settings.get(EnvVar.LLM_MAX_RETRIES)
+        )
     
     def call(
         self,
@@ -102,7 +110,7 @@ class LLMClient:
             # 打印请求的字符数
             prompt_chars = len(prompt)
             log_prefix = f"[{file_name}] " if file_name else ""
-            logger.info(f"{log_prefix}Request prompt chars: {prompt_chars}")
+            logger.info("%sRequest prompt chars: %d", log_prefix, prompt_chars)
             
             start_time = time.time()
             
@@ -129,8 +137,8 @@ class LLMClient:
             completion_tokens = response.usage.completion_tokens if response.usage else 0
             
             logger.info(
-                f"{log_prefix}LLM call completed in {elapsed_time:.2f}s, "
-                f"prompt_tokens: {prompt_tokens}, completion_tokens: {completion_tokens}"
+                "%sLLM call completed in %.2fs, prompt_tokens: %d, completion_tokens: %d",
+                log_prefix, elapsed_time, prompt_tokens, completion_tokens
             )
             
             return LLMResponse(
@@ -140,7 +148,7 @@ class LLMClient:
                 completion_tokens=completion_tokens
             )
         except Exception as e:
-            logger.error(f"{log_prefix}Error calling LLM: {e}")
+            logger.error("%sError calling LLM: %s", log_prefix, e)
             raise
     
     def get_num_threads(self, default: int = 2) -> int:
@@ -153,8 +161,7 @@ class LLMClient:
         Returns:
             线程数
         """
-        settings = get_settings()
-        num_threads = settings.get(EnvVar.NUM_THREADS)
+        num_threads = get_config().num_threads
         if num_threads is not None:
             return num_threads
         return default
@@ -10,9 +10,15 @@ from common.config.settings import (
     Settings,
     get_settings,
 )
+from common.config.snapshot import (
+    ConfigSnapshot,
+    get_config,
+)
 
 __all__ = [
     "EnvVar",
     "Settings",
     "get_settings",
+    "ConfigSnapshot",
+    "get_config",
 ]
@@ -5,13 +5,10 @@
 从 .env 文件加载环境变量配置
 """
 
-import os
 from enum import Enum
 from typing import Optional, Union
 
-from dotenv import load_dotenv
-
-from common.utils.path_manager import get_path_manager
+from common.config.snapshot import get_config
 
 
 class EnvVar(Enum):
@@ -25,12 +22,18 @@ class EnvVar(Enum):
     # LLM 配置
     LLM_MODEL = ("LLM_MODEL", "gemini-2.0-flash", str)
     LLM_BASE_URL = ("LLM_BASE_URL", "https://openrouter.ai/api/v1", str)
+    # 429 / 5xx / 连接错误的重试次数（按 Retry-After 或指数退避等待）
+    LLM_MAX_RETRIES = ("LLM_MAX_RETRIES", "2", int)
 
     # 并发配置
     NUM_THREADS = ("NUM_THREADS", "4", int)
 
+    # 文章打包请求的正文 token 预算，0 表示每篇文章单独请求
+    ARTICLE_PACK_TOKENS = ("ARTICLE_PACK_TOKENS", "0", int)
+
     # HackMD 配置
     HACKMD_API_TOKEN = ("HACKMD_API_TOKEN", None, str)
+    HACKMD_NUM_THREADS = ("HACKMD_NUM_THREADS", "4", int)
 
     @property
     def key(self) -> str:
@@ -46,36 +49,19 @@ class EnvVar(Enum):
 
 
 class Settings:
-    """应用配置管理器，从 .env 文件加载配置"""
+    """
+    应用配置管理器，从 .env 文件加载配置
+
+    值来自 ConfigSnapshot：只在加载时转换类型，文件修改后自动重新加载
+    """
 
     _instance: Optional["Settings"] = None
-    _initialized: bool = False
 
     def __new__(cls) -> "Settings":
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
-        if self._initialized:
-            return
-        self._load_env()
-        self._initialized = True
-
-    def _load_env(self) -> None:
-        """加载 .env 文件中的环境变量"""
-        path_manager = get_path_manager()
-        # .env 文件位于 src/ 目录下
-        env_path = path_manager.get_absolute_path("src/.env")
-
-        if os.path.exists(env_path):
-            load_dotenv(env_path)
-        else:
-            # 尝试 .env.example 作为备选
-            env_example_path = path_manager.get_absolute_path("src/.env.example")
-            if os.path.exists(env_example_path):
-                load_dotenv(env_example_path)
-
     def get(self, env_var: EnvVar) -> Union[str, int, None]:
         """
         获取环境变量值
@@ -86,10 +72,7 @@ class Settings:
         Returns:
             环境变量值，已转换为对应类型
         """
-        value = os.getenv(env_var.key, env_var.default)
-        if value is None:
-            return None
-        return env_var.var_type(value)
+        return get_config().env[env_var.key]
 
 
 # 全局单例
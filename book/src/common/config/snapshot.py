@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+配置快照模块
+
+将 src/.env 和 data/book/config.yaml 合并为一个类型化、不可变的配置快照：
+- 加载时一次性完成类型转换和校验，读取时直接返回内存中的值
+- 文件修改后自动重新加载，新快照校验通过后整体替换（读者不会看到半更新的状态）
+- 首次加载时 config.yaml 有误只记录错误并使用默认书籍配置，不影响 .env 中的配置
+- YAML 优先使用 libyaml 的 C 加速解析器
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from common.utils.logger import get_logger
+from common.utils.path_manager import get_path_manager, PathType
+
+logger = get_logger("config")
+
+# config.yaml 未设置 num_threads 时的书籍处理并发线程数
+DEFAULT_BOOK_NUM_THREADS = 2
+
+
+def get_yaml_loader() -> type:
+    """获取 YAML 解析器，优先使用 C 加速版本"""
+    import yaml
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def get_yaml_dumper() -> type:
+    """获取 YAML 序列化器，优先使用 C 加速版本"""
+    import yaml
+    return getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """不可变的配置快照"""
+    # .env 配置（键为 EnvVar.key，值已转换为对应类型）
+    env: Mapping[str, Any]
+    # config.yaml 中的书籍配置
+    books: Mapping[str, Mapping[str, bool]]
+    # config.yaml 中的书籍处理并发线程数
+    book_num_threads: int
+    # 生成快照时的文件修改时间，用于判断是否需要重新加载
+    source_mtimes: tuple[Optional[int], Optional[int]] = field(default=(None, None), compare=False)
+
+    @property
+    def num_threads(self) -> int:
+        """LLM 并发线程数（NUM_THREADS）"""
+        return self.env["NUM_THREADS"]
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _freeze_books(raw_books: Any) -> Mapping[str, Mapping[str, bool]]:
+    """校验书籍配置并转换为只读映射"""
+    if raw_books is None:
+        return MappingProxyType({})
+    if not isinstance(raw_books, dict):
+        raise ValueError("config.yaml: 'books' must be a mapping")
+    books = {}
+    for book_name, book_config in raw_books.items():
+        book_config = book_config or {}
+        if not isinstance(book_config, dict):
+            raise ValueError(f"config.yaml: books.{book_name} must be a mapping")
+        for key, value in book_config.items():
+            if not isinstance(value, bool):
+                raise ValueError(f"config.yaml: books.{book_name}.{key} must be true/false, got {value!r}")
+        books[str(book_name)] = MappingProxyType(dict(book_config))
+    return MappingProxyType(books)
+
+
+class ConfigStore:
+    """
+    配置快照存储
+
+    get() 最多每 check_interval 秒检查一次文件修改时间，变化时重新加载
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        """
+        Args:
+            check_interval: 检查文件变化的最小间隔（秒）
+        """
+        pm = get_path_manager()
+        env_path = pm.get_absolute_path("src/.env")
+        if not os.path.exists(env_path):
+            # 尝试 .env.example 作为备选
+            env_path = pm.get_absolute_path("src/.env.example")
+        self.env_path = env_path
+        self.yaml_path = os.path.join(pm.get_dir(PathType.BOOK_BASE), "config.yaml")
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+        # 最近一次加载失败时的文件修改时间，避免对同一份错误配置重复报错
+        self._failed_mtimes: Optional[tuple[Optional[int], Optional[int]]] = None
+        self._snapshot = self._build(yaml_fallback=True)
+
+    def _build(self, yaml_fallback: bool = False) -> ConfigSnapshot:
+        """
+        读取文件并生成新快照
+
+        Args:
+            yaml_fallback: config.yaml 解析或校验失败时记录错误并使用默认书籍配置（首次加载时没有旧快照可保留）
+
+        Raises:
+            ValueError: 配置值无法转换或校验失败
+        """
+        from common.config.settings import EnvVar
+
+        mtimes = (_mtime(self.env_path), _mtime(self.yaml_path))
+
+        # .env 文件中的值，进程环境变量优先
+        file_values: dict[str, Optional[str]] = {}
+        if mtimes[0] is not None:
+            from dotenv import dotenv_values
+            file_values = dotenv_values(self.env_path)
+
+        env: dict[str, Any] = {}
+        for env_var in EnvVar:
+            raw = os.environ.get(env_var.key, file_values.get(env_var.key, env_var.default))
+            if raw is None:
+                env[env_var.key] = None
+                continue
+            try:
+                env[env_var.key] = env_var.var_type(raw)
+            except ValueError:
+                raise ValueError(f"{env_var.key}={raw!r} is not a valid {env_var.var_type.__name__}") from None
+
+        for env_var in (EnvVar.NUM_THREADS, EnvVar.HACKMD_NUM_THREADS):
+            if env[env_var.key] < 1:
+                raise ValueError(f"{env_var.key} must be >= 1, got {env[env_var.key]}")
+        if env[EnvVar.LLM_MAX_RETRIES.key] < 0:
+            raise ValueError(f"LLM_MAX_RETRIES must be >= 0, got {env[EnvVar.LLM_MAX_RETRIES.key]}")
+        if env[EnvVar.ARTICLE_PACK_TOKENS.key] < 0:
+            raise ValueError(f"ARTICLE_PACK_TOKENS must be >= 0, got {env[EnvVar.ARTICLE_PACK_TOKENS.key]}")
+
+        try:
+            books, book_num_threads = self._load_book_config(mtimes[1] is not None)
+        except Exception as e:
+            if not yaml_fallback:
+                raise
+            logger.error("Invalid %s, using default book config: %s", self.yaml_path, e)
+            books, book_num_threads = MappingProxyType({}), DEFAULT_BOOK_NUM_THREADS
+
+        return ConfigSnapshot(
+            env=MappingProxyType(env),
+            books=books,
+            book_num_threads=book_num_threads,
+            source_mtimes=mtimes,
+        )
+
+    def _load_book_config(self, exists: bool) -> tuple[Mapping[str, Mapping[str, bool]], int]:
+        """
+        读取并校验 config.yaml
+
+        Args:
+            exists: config.yaml 是否存在
+
+        Returns:
+            (书籍配置, 书籍处理并发线程数)
+
+        Raises:
+            ValueError: 配置校验失败
+        """
+        raw_config: Any = {}
+        if exists:
+            import yaml
+            with open(self.yaml_path, "r", encoding="utf-8") as f:
+                raw_config = yaml.load(f, Loader=get_yaml_loader()) or {}
+        if not isinstance(raw_config, dict):
+            raise ValueError("config.yaml: top level must be a mapping")
+
+        book_num_threads = raw_config.get("num_threads", DEFAULT_BOOK_NUM_THREADS)
+        if not isinstance(book_num_threads, int) or book_num_threads < 1:
+            raise ValueError(f"config.yaml: num_threads must be a positive integer, got {book_num_threads!r}")
+        return _freeze_books(raw_config.get("books")), book_num_threads
+
+    def get(self) -> ConfigSnapshot:
+        """获取当前配置快照（必要时重新加载）"""
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self.reload_if_changed()
+        return self._snapshot
+
+    def reload_if_changed(self) -> bool:
+        """
+        文件有变化时重新加载
+
+        新配置校验失败时保留旧快照并记录错误
+
+        Returns:
+            是否替换了快照
+        """
+        with self._lock:
+            mtimes = (_mtime(self.env_path), _mtime(self.yaml_path))
+            if mtimes == self._snapshot.source_mtimes or mtimes == self._failed_mtimes:
+                return False
+            try:
+                # config.yaml 未变化时沿用首次加载的处理（有误时使用默认书籍配置），不影响 .env 的更新
+                snapshot = self._build(yaml_fallback=mtimes[1] == self._snapshot.source_mtimes[1])
+            except Exception as e:
+                self._failed_mtimes = mtimes
+                logger.error("Config reload failed, keeping previous config: %s", e)
+                return False
+            self._snapshot = snapshot
+            logger.info("Config reloaded")
+            return True
+
+
+# 全局单例
+_config_store: Optional[ConfigStore] = None
+_config_store_lock = threading.Lock()
+
+
+def get_config() -> ConfigSnapshot:
+    """获取当前配置快照"""
+    global _config_store
+    if _config_store is None:
+        with _config_store_lock:
+            if _config_store is None:
+                _config_store = ConfigStore()
+    return _config_store.get()
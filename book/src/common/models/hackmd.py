@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 """
 HackMD API 数据模型定义
+
+响应模型（Team/User/LastChangeUser/Note）是原始 JSON 字典上的轻量视图：
+使用 __slots__，字段在访问时才解码，to_dict() 零拷贝返回原始字典
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Any, Callable, Optional, Self
 
 
 class ReadPermission(str, Enum):
@@ -31,125 +34,148 @@ class CommentPermission(str, Enum):
     EVERYONE = "everyone"
 
 
-@dataclass
-class Team:
-    """团队信息"""
-    id: str
-    owner_id: str
-    path: str
-    name: str
-    logo: Optional[str] = None
-    description: Optional[str] = None
-    visibility: Optional[str] = None
-    created_at: Optional[int] = None
+class RawField:
+    """
+    惰性解码字段描述符
+
+    访问属性时才从原始 JSON 字典中取值（可选地经过转换函数），不在构造时复制任何字段
+    """
+
+    __slots__ = ("key", "default", "convert", "name")
+
+    def __init__(self, key: str, default: Any = None, convert: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            key: 原始 JSON 中的字段名
+            default: 字段缺失时的默认值
+            convert: 取值后的转换函数（仅对非 None 值调用）
+        """
+        self.key = key
+        self.default = default
+        self.convert = convert
+        self.name = key
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Optional["RawModel"], owner: type) -> Any:
+        if instance is None:
+            return self
+        value = instance._data.get(self.key, self.default)
+        if value is not None and self.convert is not None:
+            return self.convert(value)
+        return value
+
+    def __set__(self, instance: "RawModel", value: Any) -> None:
+        instance._data[self.key] = value
+
+
+class RawModel:
+    """
+    基于原始 JSON 字典的只读视图模型
+
+    只保存原始字典的引用，字段通过 RawField 惰性解码，
+    to_dict() 直接返回原始字典（零拷贝）
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict):
+        self._data = data
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Team":
-        """从字典创建Team对象"""
-        return cls(
-            id=data.get("id", ""),
-            owner_id=data.get("ownerId", ""),
-            path=data.get("path", ""),
-            name=data.get("name", ""),
-            logo=data.get("logo"),
-            description=data.get("description"),
-            visibility=data.get("visibility"),
-            created_at=data.get("createdAt"),
+    def from_dict(cls, data: dict) -> Self:
+        """从字典创建对象（不复制字典）"""
+        return cls(data)
+
+    def to_dict(self) -> dict:
+        """返回原始字典（零拷贝，修改会影响对象本身）"""
+        return self._data
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._data == other._data
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name, attr in vars(type(self)).items()
+            if isinstance(attr, RawField)
         )
+        return f"{type(self).__name__}({fields})"
 
 
-@dataclass
-class User:
+class Team(RawModel):
+    """团队信息"""
+
+    __slots__ = ()
+
+    id: str = RawField("id", "")
+    owner_id: str = RawField("ownerId", "")
+    path: str = RawField("path", "")
+    name: str = RawField("name", "")
+    logo: Optional[str] = RawField("logo")
+    description: Optional[str] = RawField("description")
+    visibility: Optional[str] = RawField("visibility")
+    created_at: Optional[int] = RawField("createdAt")
+
+
+def _to_teams(data: list[dict]) -> list[Team]:
+    return [Team(t) for t in data]
+
+
+class User(RawModel):
     """用户信息"""
-    id: str
-    name: str
-    email: Optional[str] = None
-    user_path: Optional[str] = None
-    photo: Optional[str] = None
-    teams: list[Team] = field(default_factory=list)
 
-    @classmethod
-    def from_dict(cls, data: dict) -> "User":
-        """从字典创建User对象"""
-        teams = [Team.from_dict(t) for t in data.get("teams", [])]
-        return cls(
-            id=data.get("id", ""),
-            name=data.get("name", ""),
-            email=data.get("email"),
-            user_path=data.get("userPath"),
-            photo=data.get("photo"),
-            teams=teams,
-        )
+    __slots__ = ()
 
+    id: str = RawField("id", "")
+    name: str = RawField("name", "")
+    email: Optional[str] = RawField("email")
+    user_path: Optional[str] = RawField("userPath")
+    photo: Optional[str] = RawField("photo")
+    teams: list[Team] = RawField("teams", [], _to_teams)
 
-@dataclass
-class LastChangeUser:
+
+class LastChangeUser(RawModel):
     """最后修改用户信息"""
-    name: str
-    photo: Optional[str] = None
-    biography: Optional[str] = None
-    user_path: Optional[str] = None
 
-    @classmethod
-    def from_dict(cls, data: dict) -> "LastChangeUser":
-        """从字典创建LastChangeUser对象"""
-        return cls(
-            name=data.get("name", ""),
-            photo=data.get("photo"),
-            biography=data.get("biography"),
-            user_path=data.get("userPath"),
-        )
+    __slots__ = ()
 
+    name: str = RawField("name", "")
+    photo: Optional[str] = RawField("photo")
+    biography: Optional[str] = RawField("biography")
+    user_path: Optional[str] = RawField("userPath")
 
-@dataclass
-class Note:
+
+def _to_last_change_user(data: dict) -> Optional[LastChangeUser]:
+    return LastChangeUser(data) if data else None
+
+
+class Note(RawModel):
     """笔记信息"""
-    id: str
-    title: str
-    tags: Optional[list[str]] = None
-    created_at: Optional[int] = None
-    title_updated_at: Optional[int] = None
-    tags_updated_at: Optional[int] = None
-    publish_type: Optional[str] = None
-    published_at: Optional[int] = None
-    permalink: Optional[str] = None
-    short_id: Optional[str] = None
-    content: Optional[str] = None
-    last_changed_at: Optional[int] = None
-    last_change_user: Optional[LastChangeUser] = None
-    user_path: Optional[str] = None
-    team_path: Optional[str] = None
-    read_permission: Optional[str] = None
-    write_permission: Optional[str] = None
-    publish_link: Optional[str] = None
 
-    @classmethod
-    def from_dict(cls, data: dict) -> "Note":
-        """从字典创建Note对象"""
-        last_change_user = None
-        if data.get("lastChangeUser"):
-            last_change_user = LastChangeUser.from_dict(data["lastChangeUser"])
-
-        return cls(
-            id=data.get("id", ""),
-            title=data.get("title", ""),
-            tags=data.get("tags"),
-            created_at=data.get("createdAt"),
-            title_updated_at=data.get("titleUpdatedAt"),
-            tags_updated_at=data.get("tagsUpdatedAt"),
-            publish_type=data.get("publishType"),
-            published_at=data.get("publishedAt"),
-            permalink=data.get("permalink"),
-            short_id=data.get("shortId"),
-            content=data.get("content"),
-            last_changed_at=data.get("lastChangedAt"),
-            last_change_user=last_change_user,
-            user_path=data.get("userPath"),
-            team_path=data.get("teamPath"),
-            read_permission=data.get("readPermission"),
-            write_permission=data.get("writePermission"),
-            publish_link=data.get("publishLink"),
-        )
+    __slots__ = ()
+
+    id: str = RawField("id", "")
+    title: str = RawField("title", "")
+    tags: Optional[list[str]] = RawField("tags")
+    created_at: Optional[int] = RawField("createdAt")
+    title_updated_at: Optional[int] = RawField("titleUpdatedAt")
+    tags_updated_at: Optional[int] = RawField("tagsUpdatedAt")
+    publish_type: Optional[str] = RawField("publishType")
+    published_at: Optional[int] = RawField("publishedAt")
+    permalink: Optional[str] = RawField("permalink")
+    short_id: Optional[str] = RawField("shortId")
+    content: Optional[str] = RawField("content")
+    last_changed_at: Optional[int] = RawField("lastChangedAt")
+    last_change_user: Optional[LastChangeUser] = RawField("lastChangeUser", None, _to_last_change_user)
+    user_path: Optional[str] = RawField("userPath")
+    team_path: Optional[str] = RawField("teamPath")
+    read_permission: Optional[str] = RawField("readPermission")
+    write_permission: Optional[str] = RawField("writePermission")
+    publish_link: Optional[str] = RawField("publishLink")
 
 
 @dataclass
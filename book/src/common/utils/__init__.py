@@ -2,7 +2,7 @@
 """
 工具模块
 
-提供路径管理、日志管理等工具
+提供路径管理、日志管理、延迟导入等工具
 """
 
 from common.utils.path_manager import (
@@ -14,7 +14,9 @@ from common.utils.logger import (
     setup_logger,
     get_logger,
     logger,
+    stop_queue_listener,
 )
+from common.utils.lazy_import import make_lazy_getattr
 
 __all__ = [
     # 路径管理
@@ -25,4 +27,7 @@ __all__ = [
     "setup_logger",
     "get_logger",
     "logger",
+    "stop_queue_listener",
+    # 延迟导入
+    "make_lazy_getattr",
 ]
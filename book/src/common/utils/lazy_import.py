@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+包属性延迟导入（PEP 562）
+
+包的 __init__ 中只声明 属性名 -> 所在模块 的映射，首次访问属性时才导入对应模块，
+避免导入包时加载 openai/requests/ebooklib 等较重的依赖
+"""
+
+import importlib
+import sys
+from typing import Any, Callable
+
+
+def make_lazy_getattr(
+        module_name: str,
+        lazy_attrs: dict[str, str],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    生成包的模块级 __getattr__ 和 __dir__
+
+    用法: __getattr__, __dir__ = make_lazy_getattr(__name__, {"LLMClient": "common.client.llm_client"})
+
+    Args:
+        module_name: 包名（__name__）
+        lazy_attrs: 延迟导入的属性名 -> 所在模块
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+
+    def __getattr__(name: str) -> Any:
+        source_name = lazy_attrs.get(name)
+        if source_name is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        source = importlib.import_module(source_name)
+        namespace = vars(sys.modules[module_name])
+        # 同一模块的属性一次性绑定，避免导入子模块时覆盖同名属性
+        for attr, attr_source in lazy_attrs.items():
+            if attr_source == source_name:
+                namespace[attr] = getattr(source, attr)
+        return namespace[name]
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[module_name])) | set(lazy_attrs))
+
+    return __getattr__, __dir__
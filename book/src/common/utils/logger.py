@@ -5,21 +5,108 @@
 提供统一的日志配置和管理
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+import threading
 from typing import Optional
 
 from common.utils.path_manager import get_path_manager, PathType
 
+# 单个日志文件的最大字节数，超过后轮转
+LOG_MAX_BYTES = 10 * 1024 * 1024
+# 保留的历史日志文件数量
+LOG_BACKUP_COUNT = 5
+
+
+class _TargetQueueHandler(logging.handlers.QueueHandler):
+    """
+    队列处理器
+
+    只把 (目标 logger 名称, 原始 record) 放入队列，不在调用线程中格式化消息，
+    %-style 参数的拼接延迟到后台线程中执行
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, target: str):
+        super().__init__(log_queue)
+        self.target = target
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait((self.target, record))
+
+
+class _DispatchQueueListener(logging.handlers.QueueListener):
+    """
+    队列监听器
+
+    所有 logger 共用一个后台写入线程，按目标 logger 名称分发到各自的实际 handler
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.targets: dict[str, list[logging.Handler]] = {}
+
+    def handle(self, item: tuple[str, logging.LogRecord]) -> None:
+        target, record = item
+        for handler in self.targets.get(target, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_listener: Optional[_DispatchQueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def _get_listener() -> _DispatchQueueListener:
+    """获取全局队列监听器，首次调用时启动后台线程"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = _DispatchQueueListener(queue.SimpleQueue())
+            _listener.start()
+            atexit.register(stop_queue_listener)
+        return _listener
+
+
+def stop_queue_listener() -> None:
+    """
+    停止后台写入线程，并写出队列中剩余的日志
+
+    已创建的 logger 改为直接挂载实际的 handler，停止后的日志仍会同步写出，不会留在无人消费的队列中；
+    handler 由 logging.shutdown 在退出时关闭
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        # 先切换 handler 再停止线程，队列中已有的日志由 stop() 写出
+        for name, handlers in _listener.targets.items():
+            target_logger = logging.getLogger(name)
+            for handler in list(target_logger.handlers):
+                if isinstance(handler, _TargetQueueHandler):
+                    target_logger.removeHandler(handler)
+            for handler in handlers:
+                target_logger.addHandler(handler)
+        _listener.stop()
+        for handlers in _listener.targets.values():
+            for handler in handlers:
+                handler.flush()
+        _listener = None
+
 
 def setup_logger(
         name: str = "app",
         level: int = logging.INFO,
         console_level: int = logging.INFO,
         file_level: int = logging.DEBUG,
-        enable_file: bool = True
+        enable_file: bool = True,
+        use_queue: bool = True,
 ) -> logging.Logger:
     """
     设置并返回 logger
@@ -30,6 +117,7 @@ def setup_logger(
         console_level: 控制台输出级别
         file_level: 文件输出级别
         enable_file: 是否启用文件输出
+        use_queue: 是否通过队列交给后台线程写出（调用线程不再竞争 handler 锁和磁盘 IO）
 
     Returns:
         配置好的 logger
@@ -47,13 +135,15 @@ def setup_logger(
         '%(asctime)s - %(name)s - %(levelname)s - "%(filename)s:%(lineno)d" - %(message)s'
     )
 
+    handlers: list[logging.Handler] = []
+
     # 控制台处理器
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(console_level)
     console_handler.setFormatter(formatter)
-    app_logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
-    # 文件处理器（可选）
+    # 文件处理器（可选，按大小轮转）
     if enable_file:
         path_manager = get_path_manager()
         logs_dir = path_manager.get_dir(PathType.LOGS)
@@ -61,17 +151,29 @@ def setup_logger(
 
         # 普通日志文件
         log_file_path = os.path.join(logs_dir, f'{name}.log')
-        file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
         file_handler.setLevel(file_level)
         file_handler.setFormatter(formatter)
-        app_logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
         # 错误日志文件
         error_file_path = os.path.join(logs_dir, f'{name}_error.log')
-        error_handler = logging.FileHandler(error_file_path, encoding='utf-8')
+        error_handler = logging.handlers.RotatingFileHandler(
+            error_file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
-        app_logger.addHandler(error_handler)
+        handlers.append(error_handler)
+
+    if use_queue:
+        listener = _get_listener()
+        listener.targets[name] = handlers
+        app_logger.addHandler(_TargetQueueHandler(listener.queue, name))
+    else:
+        for handler in handlers:
+            app_logger.addHandler(handler)
 
     return app_logger
 
@@ -36,6 +36,11 @@ class PathType(Enum):
     SUBTITLE_SRT = "data/subtitle/srt"
     SUBTITLE_TXT = "data/subtitle/txt"
 
+    # EPUB 模块相关目录
+    EPUB_BASE = "data/epub"
+    EPUB_BOOK = "data/epub/book"
+    EPUB_TXT = "data/epub/txt"
+
     # HackMD 模块相关目录
     HACKMD_BASE = "data/hackmd"
     HACKMD_NOTES = "data/hackmd/notes"
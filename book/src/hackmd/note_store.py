@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+HackMD 笔记本地存储
+
+使用单个 SQLite 文件（data/hackmd/notes.db）保存笔记详情，
+替代每个笔记一个缩进 JSON 文件的方式，并记录 lastChangedAt 作为缓存校验依据
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterator, Optional
+
+from common.utils.path_manager import get_path_manager, PathType
+
+
+class NoteStore:
+    """
+    笔记详情存储
+
+    表结构: notes(id, short_id, last_changed_at, data)，data 为紧凑 JSON。
+    连接只应在创建它的线程中使用（通常是收集结果的主线程）
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        初始化笔记存储
+
+        Args:
+            db_path: 数据库文件路径，默认使用 data/hackmd/notes.db
+        """
+        if db_path is None:
+            db_path = get_path_manager().get_path(PathType.HACKMD_BASE) / "notes.db"
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS notes ("
+            "id TEXT PRIMARY KEY, "
+            "short_id TEXT, "
+            "last_changed_at INTEGER, "
+            "data TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def __enter__(self) -> "NoteStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def get_changed_at_map(self) -> dict[str, Optional[int]]:
+        """
+        获取所有已缓存笔记的 lastChangedAt
+
+        Returns:
+            笔记 ID -> lastChangedAt
+        """
+        rows = self.conn.execute("SELECT id, last_changed_at FROM notes")
+        return dict(rows.fetchall())
+
+    def get(self, note_id: str) -> Optional[dict]:
+        """
+        获取单个笔记详情
+
+        Args:
+            note_id: 笔记 ID 或 shortId
+
+        Returns:
+            笔记原始 dict，不存在时返回 None
+        """
+        row = self.conn.execute(
+            "SELECT data FROM notes WHERE id = ? OR short_id = ?",
+            (note_id, note_id),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, notes: list[dict]) -> None:
+        """
+        批量写入笔记详情（单个事务）
+
+        Args:
+            notes: 笔记原始 dict 列表
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO notes (id, short_id, last_changed_at, data) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        note["id"],
+                        note.get("shortId"),
+                        note.get("lastChangedAt"),
+                        json.dumps(note, ensure_ascii=False, separators=(",", ":")),
+                    )
+                    for note in notes
+                ],
+            )
+
+    def iter_notes(self) -> Iterator[dict]:
+        """
+        遍历所有笔记详情
+
+        Yields:
+            笔记原始 dict
+        """
+        for (data,) in self.conn.execute("SELECT data FROM notes ORDER BY id"):
+            yield json.loads(data)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+HackMD 同步索引
+
+记录本地文件与 HackMD 笔记的对应关系和内容哈希，用于增量上传。
+（增量下载依据 NoteStore 中缓存的 lastChangedAt）
+索引保存在 data/hackmd/sync_index.json
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+from common.utils.path_manager import get_path_manager, PathType
+
+
+def hash_content(content: str) -> str:
+    """
+    计算文本内容的哈希值
+
+    Args:
+        content: 文本内容
+
+    Returns:
+        sha256 十六进制字符串
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SyncEntry:
+    """本地文件对应的笔记信息"""
+    note_id: str  # 笔记 ID
+    short_id: str  # 笔记短 ID
+    title: str  # 笔记标题
+    content_hash: str  # 上传时的内容哈希
+
+
+class SyncIndex:
+    """
+    同步索引
+
+    - files: 本地文件路径（相对项目根目录）-> SyncEntry
+
+    读写均加锁，可在上传线程池中共享
+    """
+
+    def __init__(self, index_path: Optional[Path] = None):
+        """
+        初始化同步索引
+
+        Args:
+            index_path: 索引文件路径，默认使用 data/hackmd/sync_index.json
+        """
+        if index_path is None:
+            index_path = get_path_manager().get_path(PathType.HACKMD_BASE) / "sync_index.json"
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._files: dict[str, SyncEntry] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """从文件加载索引，文件不存在时为空索引"""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._files = {
+            key: SyncEntry(**entry)
+            for key, entry in data.get("files", {}).items()
+        }
+
+    def save(self) -> None:
+        """保存索引（先写临时文件再原子替换）"""
+        with self._lock:
+            data = {
+                "files": {key: asdict(entry) for key, entry in self._files.items()},
+            }
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def file_key(file_path: Path) -> str:
+        """
+        获取本地文件在索引中的 key（相对项目根目录的路径）
+
+        Args:
+            file_path: 本地文件路径
+
+        Returns:
+            索引 key
+        """
+        project_root = Path(get_path_manager().project_root).resolve()
+        try:
+            return Path(file_path).resolve().relative_to(project_root).as_posix()
+        except ValueError:
+            return Path(file_path).resolve().as_posix()
+
+    def get_file(self, file_path: Path) -> Optional[SyncEntry]:
+        """获取本地文件对应的笔记信息"""
+        with self._lock:
+            return self._files.get(self.file_key(file_path))
+
+    def set_file(self, file_path: Path, entry: SyncEntry) -> None:
+        """记录本地文件对应的笔记信息"""
+        with self._lock:
+            self._files[self.file_key(file_path)] = entry
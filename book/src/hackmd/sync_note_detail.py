@@ -2,50 +2,105 @@
 """
 同步 HackMD 笔记详情
 
-根据指定的笔记 ID 列表，从 HackMD API 获取笔记详情并保存到本地 JSON 文件
+根据指定的笔记 ID 列表，并发从 HackMD API 获取笔记详情并保存到本地笔记存储（data/hackmd/notes.db）
+笔记列表中的 lastChangedAt 与本地缓存一致时直接复用缓存，不再重复拉取
 """
 
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 
 from common import get_logger
 from common.client.hackmd_client import HackMDClient
-from common.utils.path_manager import get_path_manager, PathType
+from common.config import get_settings, EnvVar
+from hackmd.note_store import NoteStore
 
 logger = get_logger("sync_note_detail")
 
 
-def sync_note_details(note_ids: list[str]) -> None:
+def filter_changed_notes(notes: list[dict], changed_at_map: dict[str, Optional[int]]) -> list[str]:
     """
-    同步指定笔记的详情到本地文件
+    根据笔记列表中的 lastChangedAt 筛选出需要拉取的笔记
     
     Args:
-        note_ids: 笔记 ID 列表
-    """
-    # 初始化路径管理器
-    pm = get_path_manager()
+        notes: get_notes_raw 返回的笔记列表
+        changed_at_map: 本地缓存的笔记 ID -> lastChangedAt
     
-    # 确保目录存在
-    pm.ensure_dir_exists(PathType.HACKMD_NOTES)
+    Returns:
+        从未拉取或远端已修改的笔记 ID 列表
+    """
+    changed_ids = []
+    for note in notes:
+        note_id = note["id"]
+        last_changed_at = note.get("lastChangedAt")
+        if note_id not in changed_at_map or last_changed_at is None or changed_at_map[note_id] != last_changed_at:
+            changed_ids.append(note_id)
+    return changed_ids
+
+
+def sync_note_details(
+        note_ids: list[str],
+        only_changed: bool = False,
+        client: Optional[HackMDClient] = None,
+        num_threads: Optional[int] = None,
+        batch_size: int = 50,
+) -> None:
+    """
+    并发同步指定笔记的详情到本地笔记存储
     
+    Args:
+        note_ids: 笔记 ID 列表
+        only_changed: 是否只拉取 lastChangedAt 有变化的笔记
+        client: HackMD 客户端，默认从配置创建
+        num_threads: 并发线程数，默认读取 HACKMD_NUM_THREADS 配置
+        batch_size: 每批写入存储的笔记数量
+    """
     # 初始化 HackMD 客户端
-    client = HackMDClient.from_settings()
-    
-    # 获取并保存每个笔记的详情
-    for note_id in note_ids:
-        try:
-            logger.info(f"Fetching note detail: {note_id}")
-            note = client.get_note_raw(note_id)
-            
-            # 使用 shortId 作为文件名
-            short_id = note.get("shortId", note_id)
-            output_path = pm.get_path(PathType.HACKMD_NOTES) / f"{short_id}.json"
-            
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(note, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"Note saved to {output_path}")
-        except Exception as e:
-            logger.error(f"Failed to fetch note {note_id}: {e}")
+    if client is None:
+        client = HackMDClient.from_settings()
+    if num_threads is None:
+        num_threads = get_settings().get(EnvVar.HACKMD_NUM_THREADS)
+
+    with NoteStore() as store:
+        # 根据笔记列表的 lastChangedAt 过滤未变化的笔记
+        if only_changed:
+            wanted = set(note_ids)
+            notes = [note for note in client.get_notes_raw() if note["id"] in wanted]
+            changed_ids = set(filter_changed_notes(notes, store.get_changed_at_map()))
+            logger.info(f"{len(changed_ids)}/{len(note_ids)} notes changed since last sync")
+            note_ids = [note_id for note_id in note_ids if note_id in changed_ids]
+
+        if not note_ids:
+            logger.info("No notes to fetch")
+            return
+
+        logger.info(f"Fetching {len(note_ids)} notes with {num_threads} threads")
+
+        # 工作线程只负责请求，结果由当前线程按批写入存储
+        saved_count = 0
+        pending: list[dict] = []
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            futures = {
+                executor.submit(client.get_note_raw, note_id): note_id
+                for note_id in note_ids
+            }
+            for future in as_completed(futures):
+                note_id = futures[future]
+                try:
+                    pending.append(future.result())
+                except Exception as e:
+                    logger.error(f"Failed to fetch note {note_id}: {e}")
+                    continue
+
+                if len(pending) >= batch_size:
+                    store.put_many(pending)
+                    saved_count += len(pending)
+                    pending = []
+
+        if pending:
+            store.put_many(pending)
+            saved_count += len(pending)
+
+        logger.info(f"Saved {saved_count}/{len(note_ids)} notes to {store.db_path}")
 
 
 if __name__ == "__main__":
@@ -55,4 +110,4 @@ if __name__ == "__main__":
         "By-GUA6BWe",
     ]
     
-    sync_note_details(NOTE_IDS)
+    sync_note_details(NOTE_IDS, only_changed=True)
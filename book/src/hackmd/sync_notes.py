@@ -3,6 +3,7 @@
 同步 HackMD 笔记列表
 
 从 HackMD API 获取笔记列表并保存到本地 JSON 文件
+可选地根据 lastChangedAt 增量拉取有变化的笔记详情
 """
 
 import json
@@ -10,15 +11,20 @@ import json
 from common import get_logger
 from common.client.hackmd_client import HackMDClient
 from common.utils.path_manager import get_path_manager, PathType
+from hackmd.note_store import NoteStore
+from hackmd.sync_note_detail import filter_changed_notes, sync_note_details
 
 logger = get_logger("sync_notes")
 
 
-def sync_notes() -> None:
+def sync_notes(pull_details: bool = False) -> None:
     """
     同步笔记列表到本地文件
     
     从 HackMD API 获取所有笔记列表，保存到 data/hackmd/notes.json
+    
+    Args:
+        pull_details: 是否同时拉取 lastChangedAt 有变化的笔记详情
     """
     # 初始化路径管理器
     pm = get_path_manager()
@@ -41,6 +47,16 @@ def sync_notes() -> None:
     
     logger.info(f"Notes saved to {output_path}")
 
+    if not pull_details:
+        return
+
+    # 只拉取从未同步过或远端已修改的笔记
+    with NoteStore() as store:
+        changed_ids = filter_changed_notes(notes, store.get_changed_at_map())
+    logger.info(f"{len(changed_ids)}/{len(notes)} notes changed since last sync")
+    if changed_ids:
+        sync_note_details(changed_ids, client=client)
+
 
 if __name__ == "__main__":
-    sync_notes()
+    sync_notes(pull_details=True)
@@ -2,18 +2,23 @@
 """
 上传笔记到 HackMD
 
-遍历本地 md 文件目录，获取文件内容并上传到 HackMD
+遍历本地 md 文件目录，获取文件内容并并发上传到 HackMD
+通过 data/hackmd/sync_index.json 增量上传，内容未变化的文件不会重复上传
+上传后的笔记详情写入本地笔记存储（data/hackmd/notes.db），与 sync_notes / sync_note_detail 共用
 """
 
-import json
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from common import get_logger
 from common.client.hackmd_client import HackMDClient
-from common.models.hackmd import CreateNoteRequest
+from common.config import get_settings, EnvVar
+from common.models.hackmd import CreateNoteRequest, UpdateNoteRequest, Note
 from common.utils.path_manager import get_path_manager, PathType
+from hackmd.note_store import NoteStore
+from hackmd.sync_index import SyncIndex, SyncEntry, hash_content
 
 logger = get_logger("upload_notes")
 
@@ -149,12 +154,66 @@ def generate_yaml_list(results: List[UploadResult]) -> str:
     return "\n".join(output_lines)
 
 
-def upload_notes(directories: List[Path]) -> None:
+def upload_md_file(
+        client: HackMDClient,
+        md_file: MdFile,
+        entry: Optional[SyncEntry],
+        content_hash: str,
+) -> tuple[SyncEntry, Note, bool]:
+    """
+    上传单个 md 文件（在工作线程中执行）
+    
+    已有对应笔记时通过 update_note 更新内容，并重新获取笔记以同步可能变化的标题（H1 或 YAML title）；
+    否则创建新笔记
+    
+    Args:
+        client: HackMD 客户端
+        md_file: md 文件信息
+        entry: 同步索引中的已有记录，None 表示尚未上传
+        content_hash: 当前文件内容哈希
+        
+    Returns:
+        (新的同步记录, 笔记对象, 是否新建)
+    """
+    if entry is not None:
+        logger.info(f"Updating: {md_file.path.name} -> {entry.note_id}")
+        client.update_note(entry.note_id, UpdateNoteRequest(content=md_file.content))
+        note = client.get_note(entry.note_id)
+        return replace(entry, title=note.title, content_hash=content_hash), note, False
+
+    logger.info(f"Uploading: {md_file.path.name}")
+    # 调用 create_note，只传 content
+    request = CreateNoteRequest(content=md_file.content)
+    note = client.create_note(request)
+    new_entry = SyncEntry(
+        note_id=note.id,
+        short_id=note.short_id,
+        title=note.title,
+        content_hash=content_hash,
+    )
+    return new_entry, note, True
+
+
+def upload_notes(
+        directories: List[Path],
+        num_threads: Optional[int] = None,
+        batch_size: int = 20,
+        force: bool = False,
+        client: Optional[HackMDClient] = None,
+) -> None:
     """
     上传笔记主函数
     
+    使用线程池并发上传，工作线程共享客户端的 Session 连接池，
+    笔记详情由主线程按批写入笔记存储。
+    通过同步索引增量上传：内容未变化的文件跳过，已上传过的文件更新原笔记
+    
     Args:
         directories: 要扫描的目录列表
+        num_threads: 并发线程数，默认读取 HACKMD_NUM_THREADS 配置
+        batch_size: 每批写入笔记存储的笔记数量
+        force: 是否忽略内容哈希，强制上传所有文件
+        client: HackMD 客户端，默认从配置创建（常驻进程中可复用同一个客户端）
     """
     logger.info(f"Directories to scan: {[str(d) for d in directories]}")
 
@@ -166,83 +225,86 @@ def upload_notes(directories: List[Path]) -> None:
         logger.info("No files to upload")
         return
 
-    # 初始化路径管理器和客户端
-    pm = get_path_manager()
-    pm.ensure_dir_exists(PathType.HACKMD_NOTES)
-    client = HackMDClient.from_settings()
+    if num_threads is None:
+        num_threads = get_settings().get(EnvVar.HACKMD_NUM_THREADS)
+
+    # 初始化同步索引和客户端
+    sync_index = SyncIndex()
+    if client is None:
+        client = HackMDClient.from_settings()
 
     # 收集上传结果
     upload_results: List[UploadResult] = []
+    pending_records: List[dict] = []
+    skipped_count = 0
+    created_count = 0
+    updated_count = 0
+
+    def add_result(md_file: MdFile, entry: SyncEntry) -> None:
+        upload_results.append(UploadResult(
+            filename=md_file.path.stem,  # 文件名不含扩展名
+            title=entry.title,
+            url=f"https://hackmd.io/{entry.note_id}",
+            directory=md_file.path.parent
+        ))
+
+    logger.info(f"Using {num_threads} threads")
+
+    with NoteStore() as store, ThreadPoolExecutor(max_workers=num_threads) as executor:
+        futures = {}
+        for md_file in md_files:
+            content_hash = hash_content(md_file.content)
+            entry = sync_index.get_file(md_file.path)
+
+            # 内容未变化，跳过上传
+            if entry is not None and entry.content_hash == content_hash and not force:
+                logger.debug(f"Unchanged, skipping: {md_file.path.name}")
+                add_result(md_file, entry)
+                skipped_count += 1
+                continue
 
-    # 上传每个文件
-    for md_file in md_files:
-        try:
-            logger.info(f"Uploading: {md_file.path.name}")
-
-            # 调用 create_note，只传 content
-            request = CreateNoteRequest(content=md_file.content)
-            note = client.create_note(request)
-
-            # 获取返回信息
-            short_id = note.short_id
-            title = note.title
-            note_id = note.id
-            url = f"https://hackmd.io/{note_id}"
-
-            # 打印结果
-            logger.info(f"  shortId: {short_id}")
-            logger.info(f"  title: {title}")
-            logger.info(f"  URL: {url}")
-            logger.info(f"  Link: [{title}]({url})")
-
-            # 保存到本地 JSON 文件
-            output_path = pm.get_path(PathType.HACKMD_NOTES) / f"{short_id}.json"
-
-            # 构建保存数据（使用 Note 对象的属性）
-            note_data = {
-                "id": note.id,
-                "title": note.title,
-                "tags": note.tags,
-                "createdAt": note.created_at,
-                "titleUpdatedAt": note.title_updated_at,
-                "tagsUpdatedAt": note.tags_updated_at,
-                "publishType": note.publish_type,
-                "publishedAt": note.published_at,
-                "permalink": note.permalink,
-                "publishLink": note.publish_link,
-                "shortId": note.short_id,
-                "content": note.content,
-                "lastChangedAt": note.last_changed_at,
-                "lastChangeUser": {
-                    "name": note.last_change_user.name,
-                    "userPath": note.last_change_user.user_path,
-                    "photo": note.last_change_user.photo,
-                    "biography": note.last_change_user.biography,
-                } if note.last_change_user else None,
-                "userPath": note.user_path,
-                "teamPath": note.team_path,
-                "readPermission": note.read_permission,
-                "writePermission": note.write_permission,
-            }
-
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(note_data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"  Saved to: {output_path}")
-
-            # 收集上传结果
-            upload_results.append(UploadResult(
-                filename=md_file.path.stem,  # 文件名不含扩展名
-                title=title,
-                url=url,
-                directory=md_file.path.parent
-            ))
+            future = executor.submit(upload_md_file, client, md_file, entry, content_hash)
+            futures[future] = md_file
 
-        except Exception as e:
-            logger.error(f"Failed to upload {md_file.path.name}: {e}")
+        for future in as_completed(futures):
+            md_file = futures[future]
+            try:
+                entry, note, created = future.result()
+            except Exception as e:
+                logger.error(f"Failed to upload {md_file.path.name}: {e}")
+                continue
 
-    # 输出 YAML 格式列表
+            sync_index.set_file(md_file.path, entry)
+            add_result(md_file, entry)
+            logger.info(
+                f"{'Uploaded' if created else 'Updated'}: {md_file.path.name} -> "
+                f"[{entry.title}](https://hackmd.io/{entry.note_id}), shortId: {entry.short_id}"
+            )
+            if created:
+                created_count += 1
+            else:
+                updated_count += 1
+
+            # 按批写入笔记存储（同时落盘同步索引，避免中断后重复创建）
+            pending_records.append(note.to_dict())
+            if len(pending_records) >= batch_size:
+                store.put_many(pending_records)
+                sync_index.save()
+                pending_records = []
+
+        if pending_records:
+            store.put_many(pending_records)
+    sync_index.save()
+
+    logger.info(
+        f"Upload complete: {created_count} created, {updated_count} updated, "
+        f"{skipped_count} unchanged, {len(md_files) - len(upload_results)} failed"
+    )
+
+    # 输出 YAML 格式列表（按输入目录顺序分组，组内按文件名排序）
     if upload_results:
+        directory_order = {directory: i for i, directory in enumerate(directories)}
+        upload_results.sort(key=lambda r: directory_order.get(r.directory, len(directory_order)))
         yaml_list = generate_yaml_list(upload_results)
         logger.info(f"\n{'=' * 50}\nYAML List:{yaml_list}\n{'=' * 50}")
 
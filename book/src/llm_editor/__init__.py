@@ -1,15 +1,33 @@
 """
 LLM Editor 模块
 提供书籍、文章、字幕等内容的 LLM 处理功能
+
+基础类按需在首次访问时导入（PEP 562），导入子模块不会加载 openai 等依赖
 """
 
-from llm_editor.base import (
-    LLMClient,
-    LLMResponse,
-    BatchFileProcessor,
-    ProcessResult,
-    BatchResult,
-)
+from typing import TYPE_CHECKING
+
+from common.utils.lazy_import import make_lazy_getattr
+
+if TYPE_CHECKING:
+    from llm_editor.base import (
+        LLMClient,
+        LLMResponse,
+        BatchFileProcessor,
+        ProcessResult,
+        BatchResult,
+    )
+
+_LAZY_ATTRS = {
+    "LLMClient": "llm_editor.base",
+    "LLMResponse": "llm_editor.base",
+    "BatchFileProcessor": "llm_editor.base",
+    "ProcessResult": "llm_editor.base",
+    "BatchResult": "llm_editor.base",
+}
+
+__getattr__, __dir__ = make_lazy_getattr(__name__, _LAZY_ATTRS)
+
 
 __all__ = [
     # 基础类
@@ -5,6 +5,9 @@
 在文件末尾添加提示词后保存到 data/article/prompt_txt 目录
 """
 
+from pathlib import Path
+from typing import Optional
+
 from common import get_logger, PathType, get_path_manager
 from llm_editor.utils import (
     read_file,
@@ -19,7 +22,7 @@ from llm_editor.utils import (
 logger = get_logger("article_add_prompt")
 
 
-def add_prompt_to_articles(use_link_prompt: bool = True) -> None:
+def add_prompt_to_articles(use_link_prompt: bool = True, files: Optional[list[Path]] = None) -> None:
     """
     为文章添加提示词
     
@@ -30,6 +33,7 @@ def add_prompt_to_articles(use_link_prompt: bool = True) -> None:
     Args:
         use_link_prompt: True 使用 link.txt 提示词（保留链接），
                         False 使用 nolink.txt 提示词（删除链接）
+        files: 指定要处理的 txt 文件，默认处理 txt 目录下所有文件
     """
     # 使用统一的路径管理
     pm = get_path_manager()
@@ -57,7 +61,7 @@ def add_prompt_to_articles(use_link_prompt: bool = True) -> None:
     logger.info("-" * 50)
 
     # 遍历输入目录下的所有 txt 文件
-    txt_files = list(input_dir.glob("*.txt"))
+    txt_files = files if files is not None else list(input_dir.glob("*.txt"))
 
     if not txt_files:
         logger.warning("No txt files found")
@@ -98,14 +102,15 @@ def add_prompt_to_articles(use_link_prompt: bool = True) -> None:
     logger.info(f"Processing complete, processed {processed_count} files")
 
 
-def main(use_link: bool = True) -> None:
+def main(use_link: bool = True, files: Optional[list[Path]] = None) -> None:
     """
     主函数
     
     Args:
         use_link: True 使用保留链接的提示词，False 使用删除链接的提示词
+        files: 指定要处理的 txt 文件，默认处理 txt 目录下所有文件
     """
-    add_prompt_to_articles(use_link_prompt=use_link)
+    add_prompt_to_articles(use_link_prompt=use_link, files=files)
 
 
 if __name__ == "__main__":
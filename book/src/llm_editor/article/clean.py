@@ -5,144 +5,108 @@
 1. 清空 data/article/txt 目录下所有 txt 文件的内容
 2. 删除 data/article/prompt_txt 目录下所有的 txt 文件
 3. 删除 data/article/md 目录下所有的 md 文件
+
+清理由 llm_editor.cleaner 批量并发执行，也可以通过 --manifest 指定其他清单
+
+用法:
+    python -m llm_editor.article.clean [--dry-run] [--keep-last N] [--min-age 秒] [--manifest 清单.yaml] [--threads N]
 """
 
+import argparse
+from pathlib import Path
+from typing import Optional
+
 from common import get_logger, PathType, get_path_manager
-from llm_editor.utils import (
-    write_file,
+from llm_editor.cleaner import (
+    ACTION_DELETE,
+    ACTION_TRUNCATE,
+    CleanSummary,
+    CleanTarget,
+    clean,
+    load_manifest,
 )
 
 # 初始化 logger
 logger = get_logger("article_clean")
 
 
-def clear_txt_contents() -> int:
+def get_article_manifest(keep_last: int = 0, min_age: float = 0.0) -> list[CleanTarget]:
     """
-    清空 data/article/txt 目录下所有 txt 文件的内容
-    
-    Returns:
-        处理的文件数量
-    """
-    txt_dir = get_path_manager().get_dir_path(PathType.ARTICLE_TXT)
-
-    if not txt_dir.exists():
-        logger.warning(f"Directory not found: {txt_dir}")
-        return 0
-
-    txt_files = list(txt_dir.glob("*.txt"))
+    文章目录的默认清理清单
 
-    if not txt_files:
-        logger.info("No txt files to clear in txt directory")
-        return 0
+    Args:
+        keep_last: 删除 prompt_txt / md 时保留最新的 N 个文件
+        min_age: 只处理至少 min_age 秒未修改的文件
 
-    cleared_count = 0
-    for txt_file in txt_files:
-        # 清空文件内容（写入空字符串）
-        write_file(txt_file, "")
-        logger.info(f"Cleared content: {txt_file.name}")
-        cleared_count += 1
-
-    return cleared_count
-
-
-def delete_prompt_txt_files() -> int:
-    """
-    删除 data/article/prompt_txt 目录下所有的 txt 文件
-    
     Returns:
-        删除的文件数量
+        清理目标列表
     """
-    prompt_txt_dir = get_path_manager().get_dir_path(PathType.ARTICLE_PROMPT_TXT)
-
-    if not prompt_txt_dir.exists():
-        logger.warning(f"Directory not found: {prompt_txt_dir}")
-        return 0
-
-    txt_files = list(prompt_txt_dir.glob("*.txt"))
-
-    if not txt_files:
-        logger.info("No txt files to delete in prompt_txt directory")
-        return 0
-
-    deleted_count = 0
-    for txt_file in txt_files:
-        txt_file.unlink()
-        logger.info(f"Deleted file: {txt_file.name}")
-        deleted_count += 1
-
-    return deleted_count
+    pm = get_path_manager()
+    return [
+        CleanTarget(pm.get_dir_path(PathType.ARTICLE_TXT), "*.txt", ACTION_TRUNCATE, min_age=min_age),
+        CleanTarget(pm.get_dir_path(PathType.ARTICLE_PROMPT_TXT), "*.txt", ACTION_DELETE, keep_last, min_age),
+        CleanTarget(pm.get_dir_path(PathType.ARTICLE_MD), "*.md", ACTION_DELETE, keep_last, min_age),
+    ]
+
+
+def clean_all(
+        dry_run: bool = False,
+        keep_last: int = 0,
+        min_age: float = 0.0,
+        manifest_path: Optional[Path] = None,
+        num_threads: int = 8
+) -> CleanSummary:
+    """
+    执行完整的清洗流程
 
+    Args:
+        dry_run: 只统计将要处理的文件，不做修改
+        keep_last: 删除时保留最新的 N 个文件（仅默认清单）
+        min_age: 只处理至少 min_age 秒未修改的文件（仅默认清单）
+        manifest_path: 清单文件，默认使用文章目录的清单
+        num_threads: 并发线程数
 
-def delete_md_files() -> int:
-    """
-    删除 data/article/md 目录下所有的 md 文件
-    
     Returns:
-        删除的文件数量
+        CleanSummary 清理结果
     """
-    md_dir = get_path_manager().get_dir_path(PathType.ARTICLE_MD)
+    if manifest_path is not None:
+        targets = load_manifest(manifest_path)
+    else:
+        targets = get_article_manifest(keep_last=keep_last, min_age=min_age)
 
-    if not md_dir.exists():
-        logger.warning(f"Directory not found: {md_dir}")
-        return 0
+    summary = clean(targets, dry_run=dry_run, num_threads=num_threads)
+    summary.log_summary()
+    return summary
 
-    md_files = list(md_dir.glob("*.md"))
 
-    if not md_files:
-        logger.info("No md files to delete in md directory")
-        return 0
-
-    deleted_count = 0
-    for md_file in md_files:
-        md_file.unlink()
-        logger.info(f"Deleted file: {md_file.name}")
-        deleted_count += 1
+def add_clean_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    添加清理命令的参数（本模块和 main.py clean 子命令共用）
 
-    return deleted_count
+    Args:
+        parser: 参数解析器
+    """
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be cleaned")
+    parser.add_argument("--keep-last", type=int, default=0, help="keep the newest N prompt_txt / md files")
+    parser.add_argument("--min-age", type=float, default=0.0,
+                        help="skip files modified within the last N seconds (safe for a live pipeline)")
+    parser.add_argument("--manifest", type=Path, default=None, help="YAML manifest of clean targets")
+    parser.add_argument("--threads", type=int, default=8, help="number of worker threads")
 
 
-def clean_all() -> None:
-    """
-    执行完整的清洗流程
-    
-    1. 清空 txt 目录下所有 txt 文件的内容
-    2. 删除 prompt_txt 目录下所有 txt 文件
-    3. 删除 md 目录下所有 md 文件
-    """
-    logger.info("=" * 50)
-    logger.info("Starting article data cleaning...")
-    logger.info("=" * 50)
-
-    # 1. 清空 txt 文件内容
-    logger.info("[Step 1] Clearing txt file contents...")
-    cleared_count = clear_txt_contents()
-    logger.info(f"Cleared {cleared_count} txt file(s) content")
-    logger.info("-" * 50)
-
-    # 2. 删除 prompt_txt 文件
-    logger.info("[Step 2] Deleting prompt_txt files...")
-    prompt_deleted_count = delete_prompt_txt_files()
-    logger.info(f"Deleted {prompt_deleted_count} prompt_txt file(s)")
-    logger.info("-" * 50)
-
-    # 3. 删除 md 文件
-    logger.info("[Step 3] Deleting md files...")
-    md_deleted_count = delete_md_files()
-    logger.info(f"Deleted {md_deleted_count} md file(s)")
-    logger.info("-" * 50)
-
-    # 汇总
-    logger.info("=" * 50)
-    logger.info("Cleaning complete!")
-    logger.info(f"  - Cleared txt content: {cleared_count} file(s)")
-    logger.info(f"  - Deleted prompt_txt: {prompt_deleted_count} file(s)")
-    logger.info(f"  - Deleted md: {md_deleted_count} file(s)")
-    logger.info("=" * 50)
-
-
-def main() -> None:
+def main(argv: Optional[list[str]] = None) -> None:
     """主函数"""
-    clean_all()
+    parser = argparse.ArgumentParser(description="Clean article intermediate files")
+    add_clean_arguments(parser)
+    args = parser.parse_args(argv)
+
+    clean_all(
+        dry_run=args.dry_run,
+        keep_last=args.keep_last,
+        min_age=args.min_age,
+        manifest_path=args.manifest,
+        num_threads=args.threads,
+    )
 
 
 if __name__ == "__main__":
@@ -2,20 +2,84 @@
 大模型处理模块（文章版）
 遍历 data/article/prompt_txt 目录下的 txt 文件，调用大模型进行处理
 输出 md 文件到 data/article/md 目录
+
+打包模式：短文章的提示词往往比正文还长，每篇单独请求既浪费 token 又要付出完整的往返延迟。
+开启后把使用相同提示词的多篇短文章（正文合计不超过 token 预算）放进同一个请求，
+每篇正文用编号标记包裹，响应按标记拆回各自的 md 文件；拆分失败时退回逐篇请求
 """
 
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Optional
 
-from common import get_logger, PathType, get_path_manager
-from llm_editor.base import LLMClient, BatchFileProcessor, ProcessResult
+from common import get_logger, PathType, get_path_manager, get_settings, EnvVar
+from llm_editor.base import LLMClient, BatchFileProcessor, BatchResult, ProcessResult
 from llm_editor.utils import (
     read_file,
     write_file,
+    ensure_dir,
+    estimate_tokens,
+    split_prompt,
 )
 
 # 初始化 logger
 logger = get_logger("article_llm_process")
 
+# 打包请求中每篇文章的起止标记
+ARTICLE_START = "<<<ARTICLE {index}>>>"
+ARTICLE_END = "<<<END ARTICLE {index}>>>"
+ARTICLE_BLOCK_PATTERN = re.compile(r"<<<ARTICLE (\d+)>>>\s*\n(.*?)\n?\s*<<<END ARTICLE \1>>>", re.DOTALL)
+# 单个打包请求最多包含的文章数，避免一次失败需要重试过多文章
+MAX_PACK_SIZE = 8
+
+PACK_INSTRUCTION = """
+以上共有 {count} 篇相互独立的文章，每篇位于 <<<ARTICLE 编号>>> 和 <<<END ARTICLE 编号>>> 标记之间。
+请按上述要求分别处理每一篇，不要合并、拆分、遗漏或增加文章。
+输出时用与输入完全相同的标记包裹每篇的处理结果（标记各占一行），按编号顺序输出，标记之外不要输出任何内容。
+"""
+
+
+def build_packed_prompt(bodies: list[str], prompt: str) -> str:
+    """
+    构建打包请求：按编号标记依次放入各篇正文，末尾附加共享的提示词和输出格式要求
+
+    Args:
+        bodies: 各篇文章正文
+        prompt: 共享的提示词
+
+    Returns:
+        完整的请求内容
+    """
+    parts = []
+    for index, body in enumerate(bodies, start=1):
+        parts.append(f"{ARTICLE_START.format(index=index)}\n{body}\n{ARTICLE_END.format(index=index)}")
+    return "\n\n".join(parts) + "\n\n" + prompt.strip() + "\n" + PACK_INSTRUCTION.format(count=len(bodies))
+
+
+def split_packed_response(content: str, count: int) -> list[str] | None:
+    """
+    按编号标记把打包请求的响应拆分为各篇文章的结果
+
+    只有每个编号恰好出现一次且内容非空时才认为拆分成功
+
+    Args:
+        content: 模型返回内容
+        count: 请求中的文章数
+
+    Returns:
+        按编号顺序排列的各篇结果，拆分失败时返回 None
+    """
+    sections: dict[int, str] = {}
+    for match in ARTICLE_BLOCK_PATTERN.finditer(content):
+        index = int(match.group(1))
+        if index in sections:
+            return None
+        sections[index] = match.group(2).strip()
+    if sorted(sections) != list(range(1, count + 1)) or not all(sections.values()):
+        return None
+    return [sections[index] for index in range(1, count + 1)]
+
 
 class ArticleLLMProcessor(BatchFileProcessor):
     """
@@ -29,7 +93,8 @@ class ArticleLLMProcessor(BatchFileProcessor):
             llm_client: LLMClient,
             input_dir: Path,
             output_dir: Path,
-            num_threads: int = 2
+            num_threads: int = 2,
+            pack_token_budget: int = 0
     ):
         """
         初始化文章处理器
@@ -39,9 +104,12 @@ class ArticleLLMProcessor(BatchFileProcessor):
             input_dir: 输入目录
             output_dir: 输出目录
             num_threads: 并发线程数
+            pack_token_budget: 打包请求中正文的 token 预算（估算值），0 表示不打包。
+                模型输出与正文长度相近，预算应小于模型的最大输出 token 数
         """
         super().__init__(input_dir, output_dir, num_threads, file_pattern="*.txt")
         self.llm_client = llm_client
+        self.pack_token_budget = pack_token_budget
 
     def process_file(self, input_file: Path) -> ProcessResult:
         """
@@ -58,7 +126,7 @@ class ArticleLLMProcessor(BatchFileProcessor):
             # 读取文件内容作为提示词
             prompt = read_file(input_file)
 
-            logger.info(f"Processing file: {file_name}")
+            logger.info("Processing file: %s", file_name)
 
             # 调用大模型
             response = self.llm_client.call(prompt, file_name)
@@ -67,7 +135,7 @@ class ArticleLLMProcessor(BatchFileProcessor):
             output_file = self.output_dir / f"{input_file.stem}.md"
             write_file(output_file, response.content)
 
-            logger.info(f"Completed: {file_name} -> {output_file.name} (took {response.elapsed_time:.2f}s)")
+            logger.info("Completed: %s -> %s (took %.2fs)", file_name, output_file.name, response.elapsed_time)
 
             return ProcessResult(
                 file_name=file_name,
@@ -77,39 +145,186 @@ class ArticleLLMProcessor(BatchFileProcessor):
                 completion_tokens=response.completion_tokens
             )
         except Exception as e:
-            logger.error(f"Failed to process {file_name}: {e}")
+            logger.error("Failed to process %s: %s", file_name, e)
             return ProcessResult(
                 file_name=file_name,
                 success=False,
                 error_message=str(e)
             )
 
+    def build_packs(self, input_files: list[Path]) -> tuple[list[list[tuple[Path, str]]], list[Path]]:
+        """
+        把短文章按提示词分组，并在 token 预算内依次打包
+
+        Args:
+            input_files: 输入文件列表
+
+        Returns:
+            (打包列表[[(文件, 正文), ...], ...], 需要单独请求的文件列表)
+        """
+        groups: dict[str, list[tuple[Path, str, int]]] = {}
+        singles: list[Path] = []
+        for input_file in input_files:
+            parts = split_prompt(read_file(input_file))
+            if parts is None:
+                singles.append(input_file)
+                continue
+            body, prompt = parts
+            tokens = estimate_tokens(body)
+            if tokens > self.pack_token_budget // 2:
+                # 篇幅较长的文章单独请求，打包收益不大
+                singles.append(input_file)
+                continue
+            groups.setdefault(prompt, []).append((input_file, body, tokens))
+
+        packs: list[list[tuple[Path, str]]] = []
+        for articles in groups.values():
+            current: list[tuple[Path, str]] = []
+            current_tokens = 0
+            for input_file, body, tokens in articles:
+                if current and (current_tokens + tokens > self.pack_token_budget or len(current) >= MAX_PACK_SIZE):
+                    packs.append(current)
+                    current, current_tokens = [], 0
+                current.append((input_file, body))
+                current_tokens += tokens
+            if len(current) > 1:
+                packs.append(current)
+            elif current:
+                singles.append(current[0][0])
+        return packs, singles
+
+    def process_pack(self, pack: list[tuple[Path, str]]) -> list[ProcessResult]:
+        """
+        用一个请求处理多篇文章，响应拆分失败时退回逐篇请求
+
+        Args:
+            pack: [(输入文件, 正文), ...]，同一打包内的文章使用相同的提示词
+
+        Returns:
+            每篇文章的处理结果
+        """
+        files = [input_file for input_file, _ in pack]
+        names = ", ".join(f.name for f in files)
+        prompt = split_prompt(read_file(files[0]))[1]
+        try:
+            logger.info("Processing %d packed files: %s", len(files), names)
+            response = self.llm_client.call(
+                build_packed_prompt([body for _, body in pack], prompt), f"pack({len(files)})"
+            )
+            sections = split_packed_response(response.content, len(files))
+        except Exception as e:
+            logger.error("Packed request failed (%s): %s, falling back to single requests", names, e)
+            return [self.process_file(input_file) for input_file in files]
+
+        if sections is None:
+            logger.warning("Failed to split packed response (%s), falling back to single requests", names)
+            return [self.process_file(input_file) for input_file in files]
+
+        # 按正文长度分摊本次请求的耗时和 token
+        total_length = sum(len(body) for _, body in pack)
+        results = []
+        for (input_file, body), section in zip(pack, sections):
+            output_file = self.output_dir / f"{input_file.stem}.md"
+            write_file(output_file, section)
+            share = len(body) / total_length
+            results.append(ProcessResult(
+                file_name=input_file.name,
+                success=True,
+                elapsed_time=response.elapsed_time * share,
+                prompt_tokens=round(response.prompt_tokens * share),
+                completion_tokens=round(response.completion_tokens * share)
+            ))
+        logger.info("Completed pack: %s (took %.2fs)", names, response.elapsed_time)
+        return results
 
-def main() -> None:
-    """主函数"""
+    def run(self, input_files: list[Path] | None = None) -> BatchResult:
+        """
+        执行批量处理，开启打包模式时短文章合并请求
+
+        Args:
+            input_files: 指定要处理的文件，默认处理输入目录下所有匹配的文件
+
+        Returns:
+            BatchResult 批量处理结果
+        """
+        if self.pack_token_budget <= 0:
+            return super().run(input_files)
+
+        if input_files is None:
+            input_files = self.get_input_files()
+        if not input_files:
+            logger.warning(f"No files matching '{self.file_pattern}' found in {self.input_dir}")
+            return BatchResult()
+
+        ensure_dir(self.output_dir)
+        packs, singles = self.build_packs(input_files)
+        logger.info(
+            "Found %d files: %d packed into %d requests, %d single requests",
+            len(input_files), sum(len(pack) for pack in packs), len(packs), len(singles)
+        )
+
+        batch_result = BatchResult(total_files=len(input_files))
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            futures = {executor.submit(self.process_pack, pack): [f for f, _ in pack] for pack in packs}
+            futures.update({executor.submit(self.process_file, f): [f] for f in singles})
+
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error("Exception processing %s: %s", [f.name for f in futures[future]], e)
+                    result = [
+                        ProcessResult(file_name=f.name, success=False, error_message=str(e))
+                        for f in futures[future]
+                    ]
+                for file_result in result if isinstance(result, list) else [result]:
+                    batch_result.add_result(file_result)
+
+        return batch_result
+
+
+def main(
+        llm_client: Optional[LLMClient] = None,
+        files: Optional[list[Path]] = None,
+        pack_token_budget: Optional[int] = None
+) -> None:
+    """
+    主函数
+    
+    Args:
+        llm_client: LLM 客户端，默认从配置创建（常驻进程中可复用同一个客户端）
+        files: 指定要处理的 prompt_txt 文件，默认处理目录下所有文件
+        pack_token_budget: 打包请求的正文 token 预算，默认读取 ARTICLE_PACK_TOKENS，0 表示不打包
+    """
     # 路径配置
     pm = get_path_manager()
     input_dir = pm.get_dir_path(PathType.ARTICLE_PROMPT_TXT)
     output_dir = pm.get_dir_path(PathType.ARTICLE_MD)
 
     # 创建 LLM 客户端
-    logger.info("Initializing LLM client...")
-    llm_client = LLMClient.from_settings()
+    if llm_client is None:
+        logger.info("Initializing LLM client...")
+        llm_client = LLMClient.from_settings()
     num_threads = llm_client.get_num_threads()
+    if pack_token_budget is None:
+        pack_token_budget = get_settings().get(EnvVar.ARTICLE_PACK_TOKENS)
 
     logger.info(f"Input directory: {input_dir}")
     logger.info(f"Output directory: {output_dir}")
     logger.info(f"Using {num_threads} threads")
+    if pack_token_budget > 0:
+        logger.info(f"Packing short articles, token budget: {pack_token_budget}")
 
     # 创建处理器并执行
     processor = ArticleLLMProcessor(
         llm_client=llm_client,
         input_dir=input_dir,
         output_dir=output_dir,
-        num_threads=num_threads
+        num_threads=num_threads,
+        pack_token_budget=pack_token_budget
     )
 
-    result = processor.run()
+    result = processor.run(input_files=files)
     result.log_summary("Articles")
 
     if result.all_success:
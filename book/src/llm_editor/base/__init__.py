@@ -1,11 +1,27 @@
 """
 公共基类模块
 提供批量处理器等通用功能
+
+LLMClient 依赖 openai，按需在首次访问时导入（PEP 562）
 """
 
-from common.client import LLMClient, LLMResponse
+from typing import TYPE_CHECKING
+
+from common.utils.lazy_import import make_lazy_getattr
+
 from llm_editor.base.batch_processor import BatchFileProcessor, ProcessResult, BatchResult
 
+if TYPE_CHECKING:
+    from common.client import LLMClient, LLMResponse
+
+_LAZY_ATTRS = {
+    "LLMClient": "common.client.llm_client",
+    "LLMResponse": "common.client.llm_client",
+}
+
+__getattr__, __dir__ = make_lazy_getattr(__name__, _LAZY_ATTRS)
+
+
 __all__ = [
     "LLMClient",
     "LLMResponse",
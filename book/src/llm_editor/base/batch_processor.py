@@ -131,17 +131,21 @@ class BatchFileProcessor(ABC):
         files = list(self.input_dir.glob(self.file_pattern))
         return sorted(files)
     
-    def run(self) -> BatchResult:
+    def run(self, input_files: list[Path] | None = None) -> BatchResult:
         """
         执行批量处理
         
         使用线程池并发处理所有文件
         
+        Args:
+            input_files: 指定要处理的文件，默认处理输入目录下所有匹配的文件
+        
         Returns:
             BatchResult 批量处理结果
         """
         # 获取输入文件
-        input_files = self.get_input_files()
+        if input_files is None:
+            input_files = self.get_input_files()
         
         if not input_files:
             logger.warning(f"No files matching '{self.file_pattern}' found in {self.input_dir}")
@@ -171,7 +175,7 @@ class BatchFileProcessor(ABC):
                     result = future.result()
                     batch_result.add_result(result)
                 except Exception as e:
-                    logger.error(f"Exception processing {input_file.name}: {e}")
+                    logger.error("Exception processing %s: %s", input_file.name, e)
                     batch_result.add_result(ProcessResult(
                         file_name=input_file.name,
                         success=False,
@@ -8,7 +8,7 @@ from pathlib import Path
 from common import get_logger, PathType, get_path_manager
 from llm_editor.utils import (
     load_config,
-    save_config,
+    update_book_state,
     read_file,
     append_file,
     AppConfig,
@@ -141,16 +141,10 @@ def main() -> None:
             for filename, (_, word_count) in file_stats.items():
                 logger.info(f"  {filename}: {word_count} words")
 
-        # 记录已处理的书籍
-        books_processed.append(book_name)
+        # 处理完一本立即标记（文件锁内只更新这本书的字段，不覆盖其他进程的修改）
+        if update_book_state(book_name, add_prompt=True):
+            books_processed.append(book_name)
 
-    # 更新配置，标记已完成的书籍
-    for book_name in books_processed:
-        if book_name in config["books"]:
-            config["books"][book_name]["add_prompt"] = True
-
-    # 保存配置
-    save_config(config)
     logger.info(f"Config updated. Marked {len(books_processed)} books as add_prompt.")
 
 
@@ -1,15 +1,18 @@
 """
 大模型处理模块（书籍版）
 读取配置文件，遍历书籍的txt文件，调用大模型进行处理
+处理前先检测重复章节（llm_editor.book.dedup），重复章节直接复用已处理章节的输出
 """
 
 from pathlib import Path
+from typing import Optional
 
-from common import get_logger, PathType, get_path_manager
+from common import get_logger, PathType, get_path_manager, get_config
 from llm_editor.base import LLMClient, BatchFileProcessor, ProcessResult
+from llm_editor.book.dedup import DedupIndex, plan_book, apply_links, record_processed
 from llm_editor.utils import (
     load_config,
-    save_config,
+    update_book_state,
     read_file,
     write_file,
     AppConfig,
@@ -83,7 +86,7 @@ class BookLLMProcessor(BatchFileProcessor):
             # 读取文件内容作为提示词
             prompt = read_file(input_file)
 
-            logger.info(f"Processing file: {file_name}")
+            logger.info("Processing file: %s", file_name)
 
             # 调用大模型
             response = self.llm_client.call(prompt, file_name)
@@ -92,7 +95,7 @@ class BookLLMProcessor(BatchFileProcessor):
             output_file = self.output_dir / f"{input_file.stem}.md"
             write_file(output_file, response.content)
 
-            logger.info(f"Completed: {file_name} -> {output_file.name} (took {response.elapsed_time:.2f}s)")
+            logger.info("Completed: %s -> %s (took %.2fs)", file_name, output_file.name, response.elapsed_time)
 
             return ProcessResult(
                 file_name=file_name,
@@ -102,7 +105,7 @@ class BookLLMProcessor(BatchFileProcessor):
                 completion_tokens=response.completion_tokens
             )
         except Exception as e:
-            logger.error(f"Failed to process {file_name}: {e}")
+            logger.error("Failed to process %s: %s", file_name, e)
             return ProcessResult(
                 file_name=file_name,
                 success=False,
@@ -115,7 +118,8 @@ def process_book(
         book_name: str,
         txt_dir: Path,
         output_base_dir: Path,
-        num_threads: int
+        num_threads: int,
+        dedup_index: Optional[DedupIndex] = None
 ) -> bool:
     """
     处理单本书籍的所有章节
@@ -126,6 +130,7 @@ def process_book(
         txt_dir: txt 文件基础目录
         output_base_dir: 输出基础目录
         num_threads: 并发线程数
+        dedup_index: 已处理章节的签名记录，None 时不做去重
     
     Returns:
         是否全部处理成功
@@ -147,27 +152,47 @@ def process_book(
         num_threads=num_threads
     )
 
-    result = processor.run()
-    result.log_summary(f"Book '{book_name}'")
+    if dedup_index is None:
+        result = processor.run()
+        result.log_summary(f"Book '{book_name}'")
+        return result.all_success
 
-    return result.all_success
+    # 重复章节不调用大模型
+    plan = plan_book(book_name, book_txt_dir, output_dir, dedup_index)
+    plan.log_report()
 
+    result = processor.run(input_files=plan.unique_files) if plan.unique_files else None
+    if result is not None:
+        result.log_summary(f"Book '{book_name}'")
+    link_failed = apply_links(plan, output_dir)
+    record_processed(plan, output_dir, dedup_index)
 
-def main() -> None:
-    """主函数"""
+    return (result is None or result.all_success) and not link_failed
+
+
+def main(llm_client: Optional[LLMClient] = None, use_dedup: bool = True) -> None:
+    """
+    主函数
+    
+    Args:
+        llm_client: LLM 客户端，默认从配置创建（常驻进程中可复用同一个客户端）
+        use_dedup: 是否跳过重复章节
+    """
     # 路径配置
     pm = get_path_manager()
     txt_dir = pm.get_dir_path(PathType.BOOK_TXT)
     output_dir = pm.get_dir_path(PathType.BOOK_MD)
 
     # 创建 LLM 客户端
-    logger.info("Initializing LLM client...")
-    llm_client = LLMClient.from_settings()
+    if llm_client is None:
+        logger.info("Initializing LLM client...")
+        llm_client = LLMClient.from_settings()
 
     # 加载配置
     logger.info("Loading config...")
     config: AppConfig = load_config()
-    num_threads = config.get("num_threads", 2)
+    # 并发数从配置快照读取，常驻进程中修改 config.yaml 后下次运行即生效
+    num_threads = get_config().book_num_threads
     books_config = config.get("books", {})
 
     # 获取需要处理的书籍
@@ -180,6 +205,7 @@ def main() -> None:
     logger.info(f"Found {len(books_to_process)} books to process: {books_to_process}")
 
     # 处理每本书
+    dedup_index = DedupIndex() if use_dedup else None
     processed_books: list[str] = []
     for book_name in books_to_process:
         success = process_book(
@@ -187,19 +213,14 @@ def main() -> None:
             book_name=book_name,
             txt_dir=txt_dir,
             output_base_dir=output_dir,
-            num_threads=num_threads
+            num_threads=num_threads,
+            dedup_index=dedup_index
         )
 
-        if success:
+        # 处理完一本立即标记（文件锁内只更新这本书的字段，不覆盖其他进程的修改）
+        if success and update_book_state(book_name, llm_process=True):
             processed_books.append(book_name)
 
-    # 更新配置，标记已处理的书籍
-    for book_name in processed_books:
-        if book_name in config["books"]:
-            config["books"][book_name]["llm_process"] = True
-
-    # 保存配置
-    save_config(config)
     logger.info(f"Config updated. Marked {len(processed_books)} books as llm_process=true")
 
 
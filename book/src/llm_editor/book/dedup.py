@@ -0,0 +1,354 @@
+"""
+章节去重模块
+
+不同版本、不同来源的书籍经常包含重复章节（序言、附录、版权页等）。
+在 04_llm_process 之前检测 data/book/txt/<书名> 下的近似重复章节：
+- 正文（去掉 add_prompt 追加的提示词）归一化后取字符 shingle，计算 bottom-k MinHash 签名
+- 与同一本书中排在前面的章节、以及其他书中已处理章节（data/book/dedup_index.json）比较，
+  只有追加的提示词也相同（如同为 link.txt 或 nolink.txt）时才视为重复
+- 相似度达到阈值的章节不再调用大模型，直接复用已处理章节的 md 输出
+
+用法（只输出报告，不做修改）:
+    python -m llm_editor.book.dedup [书名 ...]
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from common import get_logger, PathType, get_path_manager
+from llm_editor.utils import estimate_tokens, read_file, split_prompt
+
+logger = get_logger("book_dedup")
+
+# shingle 长度（字符）
+SHINGLE_SIZE = 5
+# MinHash 签名长度
+SKETCH_SIZE = 128
+# 默认相似度阈值（Jaccard）
+DEFAULT_THRESHOLD = 0.9
+
+# 归一化时去掉空白和标点，只保留文字
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+
+@dataclass
+class ChapterSketch:
+    """章节签名"""
+    digest: str  # 归一化正文的 sha1，用于快速判断完全重复
+    size: int  # shingle 集合大小
+    sketch: list[int]  # bottom-k MinHash 签名（升序）
+    prompt_digest: Optional[str] = None  # 追加提示词的 sha1，None 表示未知（旧记录），不与任何章节匹配
+
+
+@dataclass
+class DuplicateLink:
+    """重复章节及其复用的输出"""
+    input_file: Path  # 重复章节的 txt 文件
+    canonical: str  # 被复用章节的标识（书名/文件名）
+    canonical_output: Path  # 被复用章节的 md 输出
+    similarity: float  # 估算的 Jaccard 相似度
+    skipped_tokens: int  # 省下的请求 token 数（估算）
+
+
+@dataclass
+class DedupPlan:
+    """单本书的去重结果"""
+    book_name: str
+    unique_files: list[Path] = field(default_factory=list)  # 需要调用大模型的章节
+    links: list[DuplicateLink] = field(default_factory=list)  # 复用输出的章节
+    sketches: dict[Path, ChapterSketch] = field(default_factory=dict)
+    elapsed_time: float = 0.0
+
+    @property
+    def skipped_tokens(self) -> int:
+        return sum(link.skipped_tokens for link in self.links)
+
+    def log_report(self) -> None:
+        """输出去重报告"""
+        total = len(self.unique_files) + len(self.links)
+        logger.info(
+            "Book '%s': %d/%d chapters are duplicates, skipped ~%d prompt tokens (dedup took %.0f ms)",
+            self.book_name, len(self.links), total, self.skipped_tokens, self.elapsed_time * 1000
+        )
+        for link in self.links:
+            logger.info(
+                "  %s -> %s (similarity %.2f, ~%d tokens)",
+                link.input_file.name, link.canonical, link.similarity, link.skipped_tokens
+            )
+
+
+def compute_sketch(text: str, prompt: str = "") -> ChapterSketch:
+    """
+    计算正文的 MinHash 签名
+
+    Args:
+        text: 章节正文
+        prompt: add_prompt 追加的提示词，没有时为空字符串
+
+    Returns:
+        ChapterSketch 签名
+    """
+    prompt_digest = hashlib.sha1(prompt.strip().encode("utf-8")).hexdigest()
+    normalized = _NON_WORD_PATTERN.sub("", text.lower())
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    # 每个字符固定 4 字节，shingle 对应固定长度的字节窗口
+    data = memoryview(normalized.encode("utf-32-le"))
+    width = SHINGLE_SIZE * 4
+    crc32 = zlib.crc32
+    if len(data) <= width:
+        hashes = {crc32(data)} if len(data) else set()
+    else:
+        hashes = {crc32(data[i:i + width]) for i in range(0, len(data) - width + 4, 4)}
+    return ChapterSketch(digest=digest, size=len(hashes), sketch=_smallest(hashes, SKETCH_SIZE),
+                         prompt_digest=prompt_digest)
+
+
+def _smallest(hashes: set[int], k: int) -> list[int]:
+    """
+    取最小的 k 个哈希值（升序）
+
+    crc32 近似均匀分布，先按期望值的 4 倍划定上限过滤，只对少量候选排序
+    """
+    if len(hashes) > k * 8:
+        cutoff = (k * 4 << 32) // len(hashes)
+        candidates = sorted(filter(cutoff.__gt__, hashes))
+        if len(candidates) >= k:
+            return candidates[:k]
+    return sorted(hashes)[:k]
+
+
+def estimate_similarity(a: ChapterSketch, b: ChapterSketch) -> float:
+    """
+    用 bottom-k 签名估算两个章节 shingle 集合的 Jaccard 相似度
+
+    Args:
+        a: 章节签名
+        b: 章节签名
+
+    Returns:
+        相似度 0~1
+    """
+    if a.digest == b.digest:
+        return 1.0
+    if not a.size or not b.size:
+        return 0.0
+    set_a, set_b = set(a.sketch), set(b.sketch)
+    union = sorted(set_a | set_b)[:SKETCH_SIZE]
+    both = set_a & set_b
+    return sum(1 for h in union if h in both) / len(union)
+
+
+def _could_match(a: ChapterSketch, b: ChapterSketch, threshold: float) -> bool:
+    """
+    是否可能是重复章节
+
+    提示词不同时输出不能复用；集合大小相差过大时 Jaccard 不可能达到阈值
+    """
+    if a.prompt_digest is None or a.prompt_digest != b.prompt_digest:
+        return False
+    return min(a.size, b.size) >= threshold * max(a.size, b.size)
+
+
+class DedupIndex:
+    """
+    已处理章节的签名记录
+
+    保存在 data/book/dedup_index.json：书名/文件名 -> {签名, 提示词哈希, md 输出路径}
+    """
+
+    def __init__(self, index_path: Optional[Path] = None):
+        """
+        Args:
+            index_path: 记录文件路径，默认使用 data/book/dedup_index.json
+        """
+        pm = get_path_manager()
+        if index_path is None:
+            index_path = pm.get_dir_path(PathType.BOOK_BASE) / "dedup_index.json"
+        self.index_path = index_path
+        self._project_root = Path(pm.project_root)
+        self._entries: dict[str, tuple[ChapterSketch, str]] = {}
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                for key, item in json.load(f).items():
+                    self._entries[key] = (
+                        ChapterSketch(digest=item["digest"], size=item["size"], sketch=item["sketch"],
+                                      prompt_digest=item.get("prompt_digest")),
+                        item["output"],
+                    )
+
+    def find(self, sketch: ChapterSketch, threshold: float, exclude_book: str) -> Optional[tuple[str, Path, float]]:
+        """
+        查找与签名相似且提示词相同的已处理章节（输出文件必须仍然存在）
+
+        Args:
+            sketch: 章节签名
+            threshold: 相似度阈值
+            exclude_book: 排除该书自身的记录（重新处理时以本次结果为准）
+
+        Returns:
+            (章节标识, md 输出路径, 相似度)，没有时返回 None
+        """
+        best: Optional[tuple[str, Path, float]] = None
+        for key, (other, output) in self._entries.items():
+            if key.split("/", 1)[0] == exclude_book or not _could_match(sketch, other, threshold):
+                continue
+            similarity = estimate_similarity(sketch, other)
+            if similarity >= threshold and (best is None or similarity > best[2]):
+                output_path = self._project_root / output
+                if output_path.exists():
+                    best = (key, output_path, similarity)
+        return best
+
+    def add(self, key: str, sketch: ChapterSketch, output_path: Path) -> None:
+        """记录已处理章节"""
+        try:
+            output = output_path.resolve().relative_to(self._project_root.resolve()).as_posix()
+        except ValueError:
+            output = output_path.resolve().as_posix()
+        self._entries[key] = (sketch, output)
+
+    def save(self) -> None:
+        """保存记录（先写临时文件再原子替换）"""
+        data = {
+            key: {"digest": sketch.digest, "size": sketch.size, "sketch": sketch.sketch,
+                  "prompt_digest": sketch.prompt_digest, "output": output}
+            for key, (sketch, output) in self._entries.items()
+        }
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+
+def plan_book(
+        book_name: str,
+        book_txt_dir: Path,
+        output_dir: Path,
+        index: Optional[DedupIndex] = None,
+        threshold: float = DEFAULT_THRESHOLD
+) -> DedupPlan:
+    """
+    检测一本书中的重复章节
+
+    章节按文件名顺序处理，与前面章节重复时复用前面章节的输出；
+    否则与其他书中已处理的章节比较。正文相似但追加的提示词不同的章节不视为重复
+
+    Args:
+        book_name: 书籍名称
+        book_txt_dir: 书籍 txt 目录
+        output_dir: 书籍 md 输出目录
+        index: 已处理章节的签名记录，None 时只做书内去重
+        threshold: 相似度阈值
+
+    Returns:
+        DedupPlan 去重结果
+    """
+    start_time = time.perf_counter()
+    plan = DedupPlan(book_name=book_name)
+
+    for txt_file in sorted(book_txt_dir.glob("*.txt")):
+        content = read_file(txt_file)
+        parts = split_prompt(content)
+        sketch = compute_sketch(*parts) if parts else compute_sketch(content)
+        plan.sketches[txt_file] = sketch
+
+        match: Optional[tuple[str, Path, float]] = None
+        if sketch.size:
+            for unique_file in plan.unique_files:
+                other = plan.sketches[unique_file]
+                if _could_match(sketch, other, threshold):
+                    similarity = estimate_similarity(sketch, other)
+                    if similarity >= threshold and (match is None or similarity > match[2]):
+                        match = (f"{book_name}/{unique_file.name}", output_dir / f"{unique_file.stem}.md", similarity)
+            if match is None and index is not None:
+                match = index.find(sketch, threshold, exclude_book=book_name)
+
+        if match is None:
+            plan.unique_files.append(txt_file)
+        else:
+            canonical, canonical_output, similarity = match
+            plan.links.append(DuplicateLink(
+                input_file=txt_file,
+                canonical=canonical,
+                canonical_output=canonical_output,
+                similarity=similarity,
+                skipped_tokens=estimate_tokens(content),
+            ))
+
+    plan.elapsed_time = time.perf_counter() - start_time
+    return plan
+
+
+def apply_links(plan: DedupPlan, output_dir: Path) -> list[Path]:
+    """
+    为重复章节复制被复用章节的输出
+
+    需要在书内的唯一章节处理完成后调用
+
+    Args:
+        plan: 去重结果
+        output_dir: 书籍 md 输出目录
+
+    Returns:
+        未能生成输出的重复章节（被复用章节处理失败）
+    """
+    failed: list[Path] = []
+    for link in plan.links:
+        if not link.canonical_output.exists():
+            logger.error("Canonical output missing for %s: %s", link.input_file.name, link.canonical_output)
+            failed.append(link.input_file)
+            continue
+        shutil.copyfile(link.canonical_output, output_dir / f"{link.input_file.stem}.md")
+    return failed
+
+
+def record_processed(plan: DedupPlan, output_dir: Path, index: DedupIndex) -> None:
+    """
+    把已成功输出的唯一章节加入签名记录并保存
+
+    Args:
+        plan: 去重结果
+        output_dir: 书籍 md 输出目录
+        index: 签名记录
+    """
+    for txt_file in plan.unique_files:
+        output_path = output_dir / f"{txt_file.stem}.md"
+        if output_path.exists():
+            index.add(f"{plan.book_name}/{txt_file.name}", plan.sketches[txt_file], output_path)
+    index.save()
+
+
+def main(book_names: Optional[list[str]] = None) -> None:
+    """
+    输出去重报告（不修改任何文件）
+
+    Args:
+        book_names: 书籍名称列表，默认检查 data/book/txt 下的所有书籍
+    """
+    pm = get_path_manager()
+    txt_dir = pm.get_dir_path(PathType.BOOK_TXT)
+    md_dir = pm.get_dir_path(PathType.BOOK_MD)
+    if not book_names:
+        book_names = sorted(p.name for p in txt_dir.iterdir() if p.is_dir()) if txt_dir.exists() else []
+
+    index = DedupIndex()
+    total_tokens = 0
+    for book_name in book_names:
+        plan = plan_book(book_name, txt_dir / book_name, md_dir / book_name, index)
+        plan.log_report()
+        total_tokens += plan.skipped_tokens
+    logger.info("Total skippable prompt tokens: ~%d", total_tokens)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
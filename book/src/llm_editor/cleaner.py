@@ -0,0 +1,253 @@
+"""
+批量清理模块
+
+按清单（manifest）批量清空或删除中间文件：
+- 使用 os.scandir 扫描目录，一次系统调用拿到文件名和 stat，不逐个构造 Path
+- 删除/清空操作分块后交给线程池并发执行
+- 支持 dry-run、保留最新 N 个文件、跳过最近修改的文件（避免动到流水线正在写入的文件）
+- 只输出一条汇总日志
+"""
+
+import fnmatch
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from common import get_logger, PathType, get_path_manager
+
+logger = get_logger("cleaner")
+
+# 清理动作
+ACTION_TRUNCATE = "truncate"  # 清空文件内容，保留文件
+ACTION_DELETE = "delete"  # 删除文件
+ACTIONS = (ACTION_TRUNCATE, ACTION_DELETE)
+
+# 每个线程任务处理的文件数
+CHUNK_SIZE = 2000
+
+
+@dataclass
+class CleanTarget:
+    """清理目标"""
+    directory: Path  # 目录（不递归）
+    pattern: str  # 文件名匹配模式，如 "*.txt"
+    action: str  # truncate 或 delete
+    keep_last: int = 0  # 按修改时间保留最新的 N 个文件
+    min_age: float = 0.0  # 只处理至少 min_age 秒未修改的文件
+
+    def __post_init__(self):
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unknown clean action: {self.action!r}, expected one of {ACTIONS}")
+        if self.keep_last < 0:
+            raise ValueError(f"keep_last must be >= 0, got {self.keep_last}")
+
+
+@dataclass
+class TargetSummary:
+    """单个清理目标的结果"""
+    target: CleanTarget
+    matched: int = 0  # 匹配的文件数
+    kept: int = 0  # 因保留规则或修改时间跳过的文件数
+    processed: int = 0  # 清空或删除的文件数（dry-run 时为将要处理的文件数）
+    freed_bytes: int = 0  # 释放的字节数
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class CleanSummary:
+    """批量清理结果"""
+    dry_run: bool = False
+    elapsed_time: float = 0.0
+    targets: list[TargetSummary] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return sum(t.processed for t in self.targets)
+
+    @property
+    def freed_bytes(self) -> int:
+        return sum(t.freed_bytes for t in self.targets)
+
+    @property
+    def error_count(self) -> int:
+        return sum(len(t.errors) for t in self.targets)
+
+    def log_summary(self) -> None:
+        """输出一条汇总日志（错误只列出前几条）"""
+        mode = "[dry-run] " if self.dry_run else ""
+        details = "; ".join(
+            f"{t.target.action} {t.target.directory.name}/{t.target.pattern}: "
+            f"{t.processed}/{t.matched} (kept {t.kept})"
+            for t in self.targets
+        )
+        logger.info(
+            "%sCleaned %d file(s), freed %.1f MB in %.2fs, %d error(s) - %s",
+            mode, self.processed, self.freed_bytes / 1024 / 1024, self.elapsed_time, self.error_count, details
+        )
+        errors = [error for t in self.targets for error in t.errors]
+        if errors:
+            logger.warning("First errors: %s", errors[:5])
+
+
+def load_manifest(manifest_path: Path) -> list[CleanTarget]:
+    """
+    从 YAML 文件加载清理清单
+
+    格式:
+        targets:
+          - dir: ARTICLE_MD        # PathType 名称，或相对项目根目录的路径
+            pattern: "*.md"
+            action: delete         # truncate / delete
+            keep_last: 100         # 可选
+            min_age: 60            # 可选，秒
+
+    Args:
+        manifest_path: 清单文件路径
+
+    Returns:
+        清理目标列表
+
+    Raises:
+        ValueError: 清单格式错误
+    """
+    import yaml
+    from common.config.snapshot import get_yaml_loader
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=get_yaml_loader()) or {}
+
+    pm = get_path_manager()
+    targets = []
+    for item in data.get("targets") or []:
+        try:
+            directory_name = item["dir"]
+            if directory_name in PathType.__members__:
+                directory = pm.get_dir_path(PathType[directory_name])
+            else:
+                directory = Path(pm.get_absolute_path(directory_name))
+            targets.append(CleanTarget(
+                directory=directory,
+                pattern=item.get("pattern", "*"),
+                action=item["action"],
+                keep_last=int(item.get("keep_last", 0)),
+                min_age=float(item.get("min_age", 0)),
+            ))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid manifest entry {item!r}: {e}") from None
+    return targets
+
+
+def scan_target(target: CleanTarget, now: Optional[float] = None) -> tuple[list[tuple[str, int]], int, int]:
+    """
+    扫描清理目标，应用保留规则
+
+    Args:
+        target: 清理目标
+        now: 当前时间戳，默认 time.time()
+
+    Returns:
+        ([(文件路径, 文件大小), ...], 匹配的文件数, 跳过的文件数)
+    """
+    if not target.directory.exists():
+        return [], 0, 0
+    if now is None:
+        now = time.time()
+
+    # (修改时间, 路径, 大小)
+    entries: list[tuple[float, str, int]] = []
+    with os.scandir(target.directory) as it:
+        for entry in it:
+            if not fnmatch.fnmatchcase(entry.name, target.pattern):
+                continue
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                # 扫描期间被其他进程删除
+                continue
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+
+    matched = len(entries)
+    if target.keep_last:
+        entries.sort(reverse=True)
+        entries = entries[target.keep_last:]
+    if target.min_age:
+        entries = [e for e in entries if now - e[0] >= target.min_age]
+    if target.action == ACTION_TRUNCATE:
+        # 已经是空文件的无需处理
+        entries = [e for e in entries if e[2] > 0]
+
+    files = [(path, size) for _, path, size in entries]
+    return files, matched, matched - len(files)
+
+
+def _apply_chunk(action: str, files: list[tuple[str, int]]) -> tuple[int, int, list[str]]:
+    """
+    对一组文件执行清理动作
+
+    Returns:
+        (处理的文件数, 释放的字节数, 错误信息列表)
+    """
+    processed = 0
+    freed = 0
+    errors: list[str] = []
+    for path, size in files:
+        try:
+            if action == ACTION_DELETE:
+                os.unlink(path)
+            else:
+                os.truncate(path, 0)
+        except FileNotFoundError:
+            # 已被其他进程删除，视为无需处理
+            continue
+        except OSError as e:
+            errors.append(f"{path}: {e}")
+            continue
+        processed += 1
+        freed += size
+    return processed, freed, errors
+
+
+def clean(targets: list[CleanTarget], dry_run: bool = False, num_threads: int = 8) -> CleanSummary:
+    """
+    按清单执行批量清理
+
+    Args:
+        targets: 清理目标列表
+        dry_run: 只统计将要处理的文件，不做修改
+        num_threads: 并发线程数
+
+    Returns:
+        CleanSummary 清理结果
+    """
+    start_time = time.perf_counter()
+    summary = CleanSummary(dry_run=dry_run)
+    now = time.time()
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for target in targets:
+            files, matched, kept = scan_target(target, now)
+            target_summary = TargetSummary(target=target, matched=matched, kept=kept)
+            summary.targets.append(target_summary)
+
+            if dry_run:
+                target_summary.processed = len(files)
+                target_summary.freed_bytes = sum(size for _, size in files)
+                continue
+
+            futures = [
+                executor.submit(_apply_chunk, target.action, files[i:i + CHUNK_SIZE])
+                for i in range(0, len(files), CHUNK_SIZE)
+            ]
+            for future in futures:
+                processed, freed, errors = future.result()
+                target_summary.processed += processed
+                target_summary.freed_bytes += freed
+                target_summary.errors.extend(errors)
+
+    summary.elapsed_time = time.perf_counter() - start_time
+    return summary
@@ -1,14 +1,33 @@
 """
 EPUB 处理模块
+
+epub_to_txt 依赖 ebooklib/bs4，按需在首次访问时导入（PEP 562），
+导入 llm_editor.epub.chinese 等子模块时不会加载这些依赖
 """
 
-from llm_editor.epub.epub_to_txt import (
-    process_all_epub_files,
-    epub_to_txt,
-    convert_epub_to_txt,
-    get_epub_book_dir,
-    get_epub_txt_dir,
-)
+from typing import TYPE_CHECKING
+
+from common.utils.lazy_import import make_lazy_getattr
+
+if TYPE_CHECKING:
+    from llm_editor.epub.epub_to_txt import (
+        process_all_epub_files,
+        epub_to_txt,
+        convert_epub_to_txt,
+        get_epub_book_dir,
+        get_epub_txt_dir,
+    )
+
+_LAZY_ATTRS = {
+    "process_all_epub_files": "llm_editor.epub.epub_to_txt",
+    "epub_to_txt": "llm_editor.epub.epub_to_txt",
+    "convert_epub_to_txt": "llm_editor.epub.epub_to_txt",
+    "get_epub_book_dir": "llm_editor.epub.epub_to_txt",
+    "get_epub_txt_dir": "llm_editor.epub.epub_to_txt",
+}
+
+__getattr__, __dir__ = make_lazy_getattr(__name__, _LAZY_ATTRS)
+
 
 __all__ = [
     "process_all_epub_files",
@@ -20,12 +20,12 @@ logger = get_logger(__name__)
 
 def get_epub_book_dir() -> Path:
     """获取 epub 书籍目录"""
-    return get_path_manager().get_dir_path(PathType.DATA) / "epub" / "book"
+    return get_path_manager().get_dir_path(PathType.EPUB_BOOK)
 
 
 def get_epub_txt_dir() -> Path:
     """获取 epub 转换后的 txt 输出目录"""
-    return get_path_manager().get_dir_path(PathType.DATA) / "epub" / "txt"
+    return get_path_manager().get_dir_path(PathType.EPUB_TXT)
 
 
 def extract_text_from_html(html_content: bytes) -> str:
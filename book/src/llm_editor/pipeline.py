@@ -0,0 +1,238 @@
+"""
+流水线调度模块
+
+统一管理各处理步骤（切分、目录、提示词、LLM、上传、字幕、EPUB）的调用，
+在同一进程内复用 LLM / HackMD 客户端，并提供常驻的 serve 模式：
+监听 data 下的输入目录，新增或内容变化的文件落地后立即执行对应的处理步骤
+"""
+
+import importlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+from common import get_logger, PathType, get_path_manager
+from llm_editor.watcher import ProcessedIndex, create_watcher, is_ignored_file
+
+if TYPE_CHECKING:
+    from common.client import LLMClient, HackMDClient
+
+logger = get_logger("pipeline")
+
+
+@dataclass
+class WatchRule:
+    """目录监听规则"""
+    path_type: PathType  # 监听的输入目录
+    stages: list[str]  # 目录变化时依次执行的步骤
+    incremental: bool = False  # 步骤是否只处理变化的文件（否则处理整个目录）
+
+
+# 各输入目录对应的处理步骤
+WATCH_RULES = [
+    WatchRule(PathType.BOOK_BOOK, ["split", "catalog", "book-prompt", "book-llm"]),
+    WatchRule(PathType.ARTICLE_TXT, ["article-prompt", "article-llm"], incremental=True),
+    WatchRule(PathType.SUBTITLE_SRT, ["subtitle"]),
+    WatchRule(PathType.EPUB_BOOK, ["epub"]),
+]
+
+
+def _load(module_name: str) -> object:
+    """导入步骤模块（模块名含数字前缀，需要通过 importlib 导入）"""
+    return importlib.import_module(module_name)
+
+
+class Pipeline:
+    """
+    流水线
+
+    持有进程内共享的客户端，客户端在第一次使用时创建
+    """
+
+    def __init__(self):
+        self._llm_client: Optional["LLMClient"] = None
+        self._hackmd_client: Optional["HackMDClient"] = None
+        self.stages: dict[str, Callable[..., None]] = {
+            "split": self.split_by_markdown,
+            "split-catalog": self.split_by_catalog,
+            "catalog": self.build_catalog,
+            "book-prompt": self.book_prompt,
+            "book-llm": self.book_llm,
+            "article-prompt": self.article_prompt,
+            "article-llm": self.article_llm,
+            "subtitle": self.subtitle,
+            "epub": self.epub,
+        }
+
+    @property
+    def llm_client(self) -> "LLMClient":
+        """共享的 LLM 客户端"""
+        if self._llm_client is None:
+            from common.client import LLMClient
+            self._llm_client = LLMClient.from_settings()
+        return self._llm_client
+
+    @property
+    def hackmd_client(self) -> "HackMDClient":
+        """共享的 HackMD 客户端"""
+        if self._hackmd_client is None:
+            from common.client import HackMDClient
+            self._hackmd_client = HackMDClient.from_settings()
+        return self._hackmd_client
+
+    # ============ 处理步骤 ============
+
+    def split_by_markdown(self) -> None:
+        """按 Markdown 标题切分书籍"""
+        _load("llm_editor.book.01_split_book.01_split_by_markdown").main()
+
+    def split_by_catalog(self) -> None:
+        """按目录文件切分书籍"""
+        _load("llm_editor.book.01_split_book.01_split_by_catalog").main()
+
+    def build_catalog(self) -> None:
+        """生成书籍目录 catalog.md"""
+        _load("llm_editor.book.02_build_catalog").build_all_catalogs()
+
+    def book_prompt(self) -> None:
+        """为书籍章节添加提示词"""
+        _load("llm_editor.book.03_add_prompt").main()
+
+    def book_llm(self) -> None:
+        """调用大模型处理书籍章节"""
+        _load("llm_editor.book.04_llm_process").main(llm_client=self.llm_client)
+
+    def article_prompt(self, use_link: bool = True, files: Optional[list[Path]] = None) -> None:
+        """为文章添加提示词（files 为 data/article/txt 下的文件）"""
+        _load("llm_editor.article.add_prompt").main(use_link=use_link, files=files)
+
+    def article_llm(self, files: Optional[list[Path]] = None, pack_token_budget: Optional[int] = None) -> None:
+        """
+        调用大模型处理文章（files 为 data/article/txt 下的文件，映射到 prompt_txt 下的同名文件）
+
+        pack_token_budget 为短文章打包请求的 token 预算，默认读取 ARTICLE_PACK_TOKENS
+        """
+        if files is not None:
+            prompt_dir = get_path_manager().get_dir_path(PathType.ARTICLE_PROMPT_TXT)
+            files = [prompt_dir / f.name for f in files if (prompt_dir / f.name).exists()]
+        _load("llm_editor.article.llm_process").main(
+            llm_client=self.llm_client, files=files, pack_token_budget=pack_token_budget
+        )
+
+    def subtitle(self) -> None:
+        """从字幕文件提取纯文本"""
+        _load("llm_editor.subtitle.extract_txt").main()
+
+    def epub(self) -> None:
+        """EPUB 转 TXT"""
+        _load("llm_editor.epub.epub_to_txt").process_all_epub_files()
+
+    def upload(self, directories: list[Path], force: bool = False) -> None:
+        """上传 md 文件到 HackMD"""
+        _load("hackmd.upload_notes").upload_notes(directories, force=force, client=self.hackmd_client)
+
+    def run_stage(self, name: str, files: Optional[list[Path]] = None) -> bool:
+        """
+        执行单个步骤，异常只记录日志不向外抛出（常驻进程不能因单个步骤失败退出）
+
+        Args:
+            name: 步骤名称
+            files: 只处理这些文件（仅支持增量处理的步骤）
+
+        Returns:
+            是否执行成功
+        """
+        logger.info("Running stage: %s", name)
+        try:
+            if files is None:
+                self.stages[name]()
+            else:
+                self.stages[name](files=files)
+            return True
+        except Exception as e:
+            logger.exception("Stage %s failed: %s", name, e)
+            return False
+
+    def run_stages(self, names: list[str], files: Optional[list[Path]] = None) -> bool:
+        """
+        依次执行多个步骤，某一步失败时不再执行后续步骤
+
+        Returns:
+            是否全部执行成功
+        """
+        for name in names:
+            if not self.run_stage(name, files):
+                return False
+        return True
+
+
+def process_changes(
+        pipeline: Pipeline,
+        processed: ProcessedIndex,
+        rule: WatchRule,
+        files: set[Path] | list[Path],
+) -> None:
+    """
+    处理某个输入目录中变化的文件
+
+    内容与上次处理时相同的文件会被跳过，全部步骤成功后才记录内容哈希
+
+    Args:
+        pipeline: 流水线
+        processed: 已处理文件的哈希记录
+        rule: 目录监听规则
+        files: 变化的文件
+    """
+    changed = processed.filter_changed(files)
+    if not changed:
+        return
+
+    logger.info("%d changed file(s) in %s: %s", len(changed), rule.path_type.value,
+                sorted(f.name for f in changed))
+    target_files = sorted(changed) if rule.incremental else None
+    if pipeline.run_stages(rule.stages, target_files):
+        processed.mark_processed(changed)
+
+
+def serve(
+        pipeline: Optional[Pipeline] = None,
+        debounce: float = 2.0,
+        poll_interval: float = 1.0,
+) -> None:
+    """
+    常驻模式：监听输入目录，文件写入完成（防抖后）立即执行对应的处理步骤
+
+    进程内只初始化一次路径、配置、日志和客户端。
+    启动时先处理停机期间新增或修改的文件
+
+    Args:
+        pipeline: 流水线实例，默认新建
+        debounce: 防抖时间（秒）
+        poll_interval: inotify 不可用时的轮询间隔（秒）
+    """
+    if pipeline is None:
+        pipeline = Pipeline()
+    pm = get_path_manager()
+    processed = ProcessedIndex()
+    rules_by_dir = {pm.get_dir_path(rule.path_type): rule for rule in WATCH_RULES}
+
+    # 补处理停机期间的文件
+    for directory, rule in rules_by_dir.items():
+        if directory.exists():
+            process_changes(pipeline, processed, rule, [p for p in directory.iterdir() if p.is_file() and not is_ignored_file(p.name)])
+
+    watcher = create_watcher(list(rules_by_dir), poll_interval=poll_interval)
+    logger.info("Watching %s with %s", [rule.path_type.value for rule in WATCH_RULES], type(watcher).__name__)
+    try:
+        for changed_files in watcher.watch(debounce):
+            by_dir: dict[Path, list[Path]] = {}
+            for file_path in changed_files:
+                by_dir.setdefault(file_path.parent, []).append(file_path)
+            for directory, files in by_dir.items():
+                rule = rules_by_dir.get(directory)
+                if rule is not None:
+                    process_changes(pipeline, processed, rule, files)
+    except KeyboardInterrupt:
+        logger.info("Serve stopped")
+    finally:
+        watcher.close()
@@ -6,13 +6,14 @@ LLM Editor 工具模块
 路径管理、日志管理等通用功能已迁移至 common 模块
 """
 
+import os
 import re
+from contextlib import contextmanager
 from pathlib import Path
-from typing import TypedDict
-
-import yaml
+from typing import Iterator, TypedDict
 
 from common import PathType, get_path_manager
+from common.config.snapshot import get_yaml_loader, get_yaml_dumper
 
 
 # ============ 类型定义 ============
@@ -31,10 +32,57 @@ class AppConfig(TypedDict, total=False):
 
 
 # ============ 配置管理 ============
+#
+# config.yaml 同时记录用户配置（need_link、num_threads）和各书籍的处理状态（add_prompt、llm_process），
+# 可能被多个流水线进程同时读写：
+# - 写入先写临时文件再原子替换，读者只会看到完整的旧文件或新文件
+# - 修改状态时持有 config.yaml.lock 的排他文件锁，在锁内重新读取最新内容后只修改目标字段，
+#   避免并发运行时互相覆盖
+
+
+def _get_config_path(config_path: Path | None) -> Path:
+    """默认配置文件路径 data/book/config.yaml"""
+    if config_path is None:
+        return get_path_manager().get_dir_path(PathType.BOOK_BASE) / "config.yaml"
+    return config_path
+
+
+@contextmanager
+def _file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    跨进程排他文件锁（POSIX 使用 flock，Windows 使用 msvcrt.locking）
+
+    锁加在独立的 .lock 文件上：config.yaml 每次写入都会被原子替换为新文件，
+    直接锁 config.yaml 无法覆盖替换后的文件
+    """
+    with open(lock_path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            # LK_LOCK 最多重试 10 秒，继续重试直到拿到锁
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
 
 def load_config(config_path: Path | None = None) -> AppConfig:
     """
-    加载配置文件
+    加载配置文件（只读访问请使用 common.get_config()，修改书籍状态请使用 update_book_state()）
 
     Args:
         config_path: 配置文件路径，默认使用 data/book/config.yaml
@@ -42,26 +90,83 @@ def load_config(config_path: Path | None = None) -> AppConfig:
     Returns:
         配置字典
     """
-    if config_path is None:
-        config_path = get_path_manager().get_dir_path(PathType.BOOK_BASE) / "config.yaml"
+    import yaml
 
-    with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    with open(_get_config_path(config_path), "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=get_yaml_loader()) or {}
 
 
 def save_config(config: AppConfig, config_path: Path | None = None) -> None:
     """
-    保存配置文件
+    保存配置文件（先写临时文件再原子替换）
+
+    注意：整体覆盖写入，并发场景下请使用 update_config() / update_book_state()
 
     Args:
         config: 配置字典
         config_path: 配置文件路径，默认使用 data/book/config.yaml
     """
-    if config_path is None:
-        config_path = get_path_manager().get_dir_path(PathType.BOOK_BASE) / "config.yaml"
+    import yaml
+
+    config_path = _get_config_path(config_path)
+    tmp_path = config_path.with_name(f"{config_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            yaml.dump(config, f, Dumper=get_yaml_dumper(), allow_unicode=True, default_flow_style=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, config_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+@contextmanager
+def update_config(config_path: Path | None = None) -> Iterator[AppConfig]:
+    """
+    在文件锁内读取-修改-写回配置
+
+    用法:
+        with update_config() as config:
+            config["books"]["书名"]["llm_process"] = True
+
+    with 块正常结束时保存，抛出异常时不写回
+
+    Args:
+        config_path: 配置文件路径，默认使用 data/book/config.yaml
+
+    Yields:
+        锁内读取的最新配置字典
+    """
+    config_path = _get_config_path(config_path)
+    with _file_lock(config_path.with_name(f"{config_path.name}.lock")):
+        config = load_config(config_path)
+        yield config
+        save_config(config, config_path)
+
+
+def update_book_state(book_name: str, config_path: Path | None = None, **flags: bool) -> bool:
+    """
+    更新单本书籍的状态字段（如 add_prompt=True、llm_process=True）
+
+    只修改该书籍的指定字段，其他书籍和字段保持文件中的最新值
 
-    with open(config_path, "w", encoding="utf-8") as f:
-        yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
+    Args:
+        book_name: 书籍名称
+        config_path: 配置文件路径，默认使用 data/book/config.yaml
+        **flags: 需要更新的状态字段
+
+    Returns:
+        书籍是否存在于配置中（不存在时不做修改）
+    """
+    with update_config(config_path) as config:
+        books = config.get("books") or {}
+        if book_name not in books:
+            return False
+        if books[book_name] is None:
+            books[book_name] = {}
+        books[book_name].update(flags)
+        return True
 
 
 # ============ 文件 IO ============
@@ -131,6 +236,30 @@ def ensure_dir(dir_path: Path) -> None:
 
 # ============ 文本处理 ============
 
+# add_prompt 追加的提示词以一行等号开头
+PROMPT_SEPARATOR_PATTERN = re.compile(r"^={10,}[ \t]*$", re.MULTILINE)
+
+
+def split_prompt(content: str) -> tuple[str, str] | None:
+    """
+    把添加过提示词的文件内容拆分为正文和 add_prompt 追加的提示词
+
+    Args:
+        content: 文件内容
+
+    Returns:
+        (正文, 提示词) 元组，找不到提示词分隔线时返回 None
+    """
+    matches = list(PROMPT_SEPARATOR_PATTERN.finditer(content))
+    if not matches:
+        return None
+    start = matches[-1].start()
+    body = content[:start].strip()
+    if not body:
+        return None
+    return body, content[start:]
+
+
 def is_chinese_document(text: str, threshold: float = 0.3) -> bool:
     """
     判断文档是否为中文文档
@@ -187,3 +316,18 @@ def count_chars(text: str) -> int:
     """
     # 移除空白字符后计算长度
     return len(text.replace(' ', '').replace('\n', '').replace('\t', ''))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数（中文按每字 1 个，英文按每词约 1.3 个）
+
+    Args:
+        text: 文本内容
+
+    Returns:
+        估算的 token 数
+    """
+    cjk_count = len(re.findall(r'[\u4e00-\u9fff]', text))
+    word_count = len(re.findall(r'[a-zA-Z0-9]+', text))
+    return cjk_count + int(word_count * 1.3)
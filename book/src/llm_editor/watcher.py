@@ -0,0 +1,251 @@
+"""
+文件监听模块
+
+监听输入目录的新增/修改文件：Linux 下通过 inotify（ctypes 调用 libc）实现，
+其他平台退化为轮询。事件经过防抖后批量返回，
+并通过持久化的内容哈希记录（data/watch_state.json）过滤掉内容未变化的文件
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Optional
+
+from common import get_logger, PathType, get_path_manager
+
+logger = get_logger("watcher")
+
+# inotify 事件掩码：文件写入完成、文件移入目录
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+# inotify_event 结构头: wd, mask, cookie, len
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def is_ignored_file(name: str) -> bool:
+    """隐藏文件、编辑器临时文件等不触发处理"""
+    return name.startswith(".") or name.endswith(("~", ".tmp", ".part", ".swp"))
+
+
+class BaseWatcher(ABC):
+    """监听器基类，子类必须实现 read_changes"""
+
+    @abstractmethod
+    def read_changes(self, timeout: Optional[float]) -> set[Path]:
+        """
+        等待并读取变化的文件
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+
+        Returns:
+            变化的文件路径集合，超时返回空集合
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放资源"""
+
+    def watch(self, debounce: float = 2.0) -> Iterator[set[Path]]:
+        """
+        持续监听，防抖后批量返回变化的文件
+
+        连续 debounce 秒没有新事件时才返回已累积的文件，避免文件分多次写入时重复处理
+
+        Args:
+            debounce: 防抖时间（秒）
+
+        Yields:
+            一批变化的文件路径
+        """
+        pending: set[Path] = set()
+        while True:
+            changed = self.read_changes(debounce if pending else None)
+            if changed:
+                pending |= changed
+                continue
+            if pending:
+                yield pending
+                pending = set()
+
+
+class InotifyWatcher(BaseWatcher):
+    """基于 Linux inotify 的目录监听器（只监听目录本身，不递归）"""
+
+    def __init__(self, directories: list[Path]):
+        """
+        Args:
+            directories: 需要监听的目录列表（不存在时自动创建）
+
+        Raises:
+            OSError: inotify 初始化失败
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+        self._watches: dict[int, Path] = {}
+        for directory in directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(errno, f"inotify_add_watch failed for {directory}: {os.strerror(errno)}")
+            self._watches[wd] = directory
+
+    def read_changes(self, timeout: Optional[float]) -> set[Path]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, _mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if name and wd in self._watches and not is_ignored_file(name):
+                changed.add(self._watches[wd] / name)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher(BaseWatcher):
+    """轮询目录快照的监听器（inotify 不可用时使用）"""
+
+    def __init__(self, directories: list[Path], interval: float = 1.0):
+        """
+        Args:
+            directories: 需要监听的目录列表
+            interval: 轮询间隔（秒）
+        """
+        self.directories = directories
+        self.interval = interval
+        self._snapshots = {directory: self._snapshot(directory) for directory in directories}
+
+    @staticmethod
+    def _snapshot(directory: Path) -> dict[str, tuple[int, int]]:
+        """目录快照：文件名 -> (大小, 修改时间 ns)"""
+        if not directory.exists():
+            return {}
+        snapshot = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and not is_ignored_file(entry.name):
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def read_changes(self, timeout: Optional[float]) -> set[Path]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        changed: set[Path] = set()
+        for directory in self.directories:
+            current = self._snapshot(directory)
+            previous = self._snapshots[directory]
+            for name, stat in current.items():
+                if previous.get(name) != stat:
+                    changed.add(directory / name)
+            self._snapshots[directory] = current
+        return changed
+
+
+def create_watcher(directories: list[Path], poll_interval: float = 1.0) -> BaseWatcher:
+    """
+    创建监听器：Linux 下优先使用 inotify，失败时退化为轮询
+
+    Args:
+        directories: 需要监听的目录列表
+        poll_interval: 轮询模式下的间隔（秒）
+
+    Returns:
+        监听器实例
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify unavailable (%s), falling back to polling", e)
+    return PollingWatcher(directories, interval=poll_interval)
+
+
+def hash_file(file_path: Path) -> str:
+    """计算文件内容的 sha256"""
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class ProcessedIndex:
+    """
+    已处理文件的内容哈希记录
+
+    保存在 data/watch_state.json，进程重启后仍能识别哪些文件已经处理过
+    """
+
+    def __init__(self, index_path: Optional[Path] = None):
+        """
+        Args:
+            index_path: 记录文件路径，默认使用 data/watch_state.json
+        """
+        pm = get_path_manager()
+        if index_path is None:
+            index_path = pm.get_dir_path(PathType.DATA) / "watch_state.json"
+        self.index_path = index_path
+        self._project_root = Path(pm.project_root).resolve()
+        self._hashes: dict[str, str] = {}
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                self._hashes = json.load(f)
+
+    def _key(self, file_path: Path) -> str:
+        try:
+            return file_path.resolve().relative_to(self._project_root).as_posix()
+        except ValueError:
+            return file_path.resolve().as_posix()
+
+    def filter_changed(self, files: set[Path] | list[Path]) -> dict[Path, str]:
+        """
+        筛选出内容与上次处理时不同的文件
+
+        Args:
+            files: 候选文件
+
+        Returns:
+            文件路径 -> 当前内容哈希（已删除的文件会被忽略）
+        """
+        changed: dict[Path, str] = {}
+        for file_path in files:
+            if not file_path.is_file():
+                continue
+            content_hash = hash_file(file_path)
+            if self._hashes.get(self._key(file_path)) != content_hash:
+                changed[file_path] = content_hash
+        return changed
+
+    def mark_processed(self, hashes: dict[Path, str]) -> None:
+        """记录已处理文件的内容哈希并保存（先写临时文件再原子替换）"""
+        for file_path, content_hash in hashes.items():
+            self._hashes[self._key(file_path)] = content_hash
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._hashes, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
@@ -1,5 +1,12 @@
+from typing import Optional
+
 from elasticsearch import Elasticsearch
+
+from bulk import bulk_index_documents
+from emb.cache import encode_query, get_query_cache
 from emb.embedding import MockEmbeddingModel
+from emb.quantization import es_vector_mapping, to_es_query_vector
+from hybrid import hybrid_search_es
 
 
 def init_elasticsearch_client(host: str = "http://localhost:9017") -> Elasticsearch:
@@ -9,8 +16,8 @@ def init_elasticsearch_client(host: str = "http://localhost:9017") -> Elasticsea
     return es
 
 
-def create_vector_index(es: Elasticsearch, index_name: str, dims: int = 768):
-    """创建向量索引"""
+def create_vector_index(es: Elasticsearch, index_name: str, dims: int = 768, quantization: Optional[str] = None):
+    """创建向量索引（quantization 为 int8 时向量字段使用 element_type=byte）"""
     # 检查索引是否已存在
     if es.indices.exists(index=index_name):
         print(f"索引 '{index_name}' 已存在，正在删除...")
@@ -21,17 +28,12 @@ def create_vector_index(es: Elasticsearch, index_name: str, dims: int = 768):
             "properties": {
                 "text": {"type": "text"},
                 "category": {"type": "keyword"},
-                "embedding": {
-                    "type": "dense_vector",
-                    "dims": dims,
-                    "index": True,
-                    "similarity": "cosine"
-                }
+                "embedding": es_vector_mapping(dims, quantization)
             }
         }
     }
     es.indices.create(index=index_name, body=index_mapping)
-    print(f"成功创建索引 '{index_name}' (维度: {dims})")
+    print(f"成功创建索引 '{index_name}' (维度: {dims}, 量化: {quantization or 'float32'})")
 
 
 def insert_documents(es: Elasticsearch, index_name: str, embedding_model: MockEmbeddingModel):
@@ -50,27 +52,22 @@ def insert_documents(es: Elasticsearch, index_name: str, embedding_model: MockEm
     ]
 
     print(f"\n正在插入 {len(documents)} 个文档...")
+    # 批量编码 + _bulk 写入，结束后刷新索引以确保文档可搜索
+    stats = bulk_index_documents(es, index_name, documents, embedding_model, workers=1)
     for doc_data in documents:
-        doc = {
-            "text": doc_data["text"],
-            "category": doc_data["category"],
-            "embedding": embedding_model.encode(doc_data["text"], normalize=True).tolist()
-        }
-        es.index(index=index_name, id=doc_data["id"], document=doc)
         print(f"  已插入 [ID: {doc_data['id']}] {doc_data['text']}")
-
-    # 刷新索引以确保文档可搜索
-    es.indices.refresh(index=index_name)
-    print(f"成功插入 {len(documents)} 个文档")
+    if stats.failed:
+        stats.report()
+    print(f"成功插入 {stats.success} 个文档")
 
 
 def vector_search(es: Elasticsearch, index_name: str, embedding_model: MockEmbeddingModel,
-                  query_text: str, k: int = 5):
-    """执行向量搜索"""
+                  query_text: str, k: int = 5, quantization: Optional[str] = None):
+    """执行向量搜索（quantization 与创建索引时一致，int8 索引发送整数查询向量）"""
     print(f"\n查询: '{query_text}'")
     print("-" * 60)
 
-    query_vector = embedding_model.encode(query_text, normalize=True).tolist()
+    query_vector = to_es_query_vector(encode_query(embedding_model, query_text), quantization)
     response = es.search(
         index=index_name,
         knn={
@@ -96,23 +93,35 @@ def vector_search(es: Elasticsearch, index_name: str, embedding_model: MockEmbed
 
 
 def hybrid_search(es: Elasticsearch, index_name: str, embedding_model: MockEmbeddingModel,
-                  query_text: str, category_filter: str = None, k: int = 5):
-    """混合搜索：向量搜索 + 关键词过滤"""
+                  query_text: str, category_filter: str = None, k: int = 5,
+                  fusion: str = None, num_candidates: int = 100, quantization: Optional[str] = None):
+    """
+    混合搜索：向量搜索 + 关键词过滤
+
+    fusion 为 rrf 或 weighted 时同时执行 BM25 查询，与向量搜索结果融合（见 hybrid.py）；
+    quantization 与创建索引时一致，int8 索引发送整数查询向量
+    """
     print(f"\n混合查询: '{query_text}'", end="")
     if category_filter:
-        print(f" (分类: {category_filter})")
-    else:
-        print()
+        print(f" (分类: {category_filter})", end="")
+    print(f" [融合: {fusion}]" if fusion else "")
     print("-" * 60)
 
-    query_vector = embedding_model.encode(query_text, normalize=True).tolist()
+    if fusion:
+        results = hybrid_search_es(es, index_name, embedding_model, query_text, category_filter, k,
+                                   num_candidates=num_candidates, fusion=fusion, quantization=quantization)
+        for result in results:
+            print(f"  {result['rank']}. [分数: {result['score']:.4f}] [{result['category']}] {result['text']}")
+        return results
+
+    query_vector = to_es_query_vector(encode_query(embedding_model, query_text), quantization)
 
     search_body = {
         "knn": {
             "field": "embedding",
             "query_vector": query_vector,
             "k": k,
-            "num_candidates": 100
+            "num_candidates": num_candidates
         }
     }
 
@@ -188,6 +197,11 @@ def main():
     hybrid_search(es, INDEX_NAME, embedding_model, "编程", category_filter="编程", k=5)
     hybrid_search(es, INDEX_NAME, embedding_model, "智能算法", category_filter="AI", k=5)
 
+    # BM25 + 向量检索融合，较小的 num_candidates 即可得到精确词匹配的结果
+    hybrid_search(es, INDEX_NAME, embedding_model, "Python编程", k=3, fusion="rrf", num_candidates=20)
+    hybrid_search(es, INDEX_NAME, embedding_model, "神经网络", category_filter="AI", k=3,
+                  fusion="weighted", num_candidates=20)
+
     # 7. 相似度对比
     print("\n" + "=" * 60)
     print("7. 文本相似度对比")
@@ -204,6 +218,10 @@ def main():
                 similarity = embedding_model.similarity(text1, text2)
                 print(f"  '{text1}' <-> '{text2}': {similarity:.4f}")
 
+    # 重复的查询直接使用缓存的查询向量
+    stats = get_query_cache().stats
+    print(f"\n查询向量缓存: {stats.requests} 次请求, 命中率 {stats.hit_rate:.1%}")
+
     print("\n" + "=" * 60)
     print("演示完成！")
     print("=" * 60)
@@ -0,0 +1,464 @@
+import argparse
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .embedding import top_k_search
+from .quantization import ProductQuantizer, assign, kmeans
+
+# 过滤条件：字段 -> 值 或 值列表
+FilterType = Dict[str, Union[Any, Sequence[Any]]]
+# 可过滤字段的编码：字段缺失（None）
+MISSING_CODE = -1
+# 过滤条件中从未插入过的值，不匹配任何记录
+UNKNOWN_CODE = -2
+# 训练前暂存记录的列表编号
+STAGING_LIST = -1
+
+
+@dataclass
+class SearchHit:
+    """检索结果"""
+    id: int
+    score: float
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+class _InvertedList:
+    """单个倒排列表：向量（或 PQ 编码）、id 和可过滤字段的编码，容量按倍数增长"""
+
+    def __init__(self, width: int, dtype, filter_fields: Sequence[str]):
+        self.size = 0
+        self.data = np.empty((0, width), dtype=dtype)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.attrs = {name: np.empty(0, dtype=np.int32) for name in filter_fields}
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= len(self.ids):
+            return
+        capacity = max(capacity, 2 * len(self.ids), 16)
+        data = np.empty((capacity, self.data.shape[1]), dtype=self.data.dtype)
+        data[:self.size] = self.data[:self.size]
+        ids = np.empty(capacity, dtype=np.int64)
+        ids[:self.size] = self.ids[:self.size]
+        for name, values in self.attrs.items():
+            grown = np.empty(capacity, dtype=np.int32)
+            grown[:self.size] = values[:self.size]
+            self.attrs[name] = grown
+        self.data, self.ids = data, ids
+
+    def extend(self, data: np.ndarray, ids: np.ndarray, attrs: Dict[str, np.ndarray]) -> int:
+        """追加一批记录，返回起始位置"""
+        start, end = self.size, self.size + len(ids)
+        self._reserve(end)
+        self.data[start:end] = data
+        self.ids[start:end] = ids
+        for name, values in attrs.items():
+            self.attrs[name][start:end] = values
+        self.size = end
+        return start
+
+    def remove(self, pos: int) -> Optional[int]:
+        """删除指定位置的记录（用最后一条填补），返回被移动记录的 id"""
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.data[pos] = self.data[last]
+            self.ids[pos] = self.ids[last]
+            for values in self.attrs.values():
+                values[pos] = values[last]
+            moved = int(self.ids[pos])
+        self.size = last
+        return moved
+
+
+class IVFIndex:
+    """
+    倒排文件（IVF）近似最近邻索引，可选 PQ 压缩
+
+    向量按 k-means 中心分到 nlist 个倒排列表，检索时只扫描离查询最近的 nprobe 个列表；
+    启用 PQ 时列表中只保存残差的 PQ 编码（每个向量 pq_m 字节）；度量为内积（向量归一化后即余弦相似度）。
+    未显式训练时，插入的记录先暂存并暴力检索，累计到 min_train_size 条后自动训练。
+    支持与 Elasticsearch / Milvus 示例相同的操作：单条/批量插入、按 category/subject 过滤检索、删除，
+    用作无需外部服务的本地替代
+    """
+
+    def __init__(self, dim: int, nlist: int = 1024, nprobe: int = 16, pq_m: Optional[int] = None,
+                 filter_fields: Sequence[str] = ("category", "subject"), seed: int = 0):
+        """
+        初始化索引
+
+        Args:
+            dim: 向量维度
+            nlist: 倒排列表数
+            nprobe: 默认扫描的列表数
+            pq_m: PQ 分段数，None 时保存原始 float32 向量（IVF-Flat）
+            filter_fields: 可过滤的字段
+            seed: 随机种子
+        """
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.filter_fields = tuple(filter_fields)
+        self.seed = seed
+        self.pq = ProductQuantizer(dim, pq_m, seed) if pq_m else None
+        # 自动训练所需的样本数：每个列表至少一个样本，PQ 码本需要 256 个
+        self.min_train_size = max(nlist, self.pq.ksub) if self.pq is not None else nlist
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[_InvertedList] = []
+        self._staging = _InvertedList(dim, np.float32, self.filter_fields)
+        self._where: Dict[int, tuple] = {}  # id -> (列表下标, 位置)
+        self._fields: Dict[int, Dict[str, Any]] = {}
+        self._vocab: Dict[str, Dict[Any, int]] = {name: {} for name in self.filter_fields}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray, iterations: int = 10, max_samples: Optional[int] = None) -> None:
+        """
+        训练聚类中心（和 PQ 码本），并把暂存的记录写入倒排列表
+
+        已有记录时重新训练：IVF-Flat 按新的中心重新分配已有记录，PQ 只保存了编码，无法重新训练
+
+        Args:
+            vectors: 训练向量，shape 为 (n, dim)；样本少于 nlist 时列表数减为样本数
+            iterations: k-means 迭代次数
+            max_samples: 最多使用的训练样本数，默认 nlist 的 64 倍
+
+        Raises:
+            ValueError: 启用 PQ 的索引中已有记录
+        """
+        stored = [inv_list for inv_list in self._lists if inv_list.size]
+        if stored and self.pq is not None:
+            raise ValueError("PQ 索引中已有记录，无法重新训练，请新建索引后重新插入")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        nlist = min(self.nlist, len(vectors))
+        if max_samples is None:
+            max_samples = nlist * 64
+        self.centroids = kmeans(vectors, nlist, iterations, self.seed, max_samples)
+        if self.pq is not None:
+            # PQ 编码相对于所属中心的残差，精度远高于直接编码向量
+            self.pq.train(vectors - self.centroids[assign(vectors, self.centroids)], iterations)
+        width, dtype = (self.pq.m, np.uint8) if self.pq is not None else (self.dim, np.float32)
+        self._lists = [_InvertedList(width, dtype, self.filter_fields) for _ in range(nlist)]
+
+        staging = self._staging
+        if staging.size:
+            self._staging = _InvertedList(self.dim, np.float32, self.filter_fields)
+            stored.append(staging)
+        for inv_list in stored:
+            self._add(inv_list.ids[:inv_list.size], inv_list.data[:inv_list.size],
+                      {name: values[:inv_list.size] for name, values in inv_list.attrs.items()})
+
+    def _inv_list(self, list_no: int) -> _InvertedList:
+        return self._staging if list_no == STAGING_LIST else self._lists[list_no]
+
+    def _encode_attr(self, name: str, value: Any, add: bool) -> int:
+        vocab = self._vocab[name]
+        if value is None:
+            return MISSING_CODE
+        code = vocab.get(value)
+        if code is None:
+            if not add:
+                return UNKNOWN_CODE
+            code = vocab[value] = len(vocab)
+        return code
+
+    def batch_insert(self, ids: Sequence[int], vectors: np.ndarray,
+                     fields: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        """
+        批量插入（已存在的 id 会被替换）
+
+        未训练时先暂存，暂存的记录达到 min_train_size 条时用它们训练；
+        样本不足以训练时仍可检索（暴力检索），也可以先调用 train 用代表性样本训练
+
+        Args:
+            ids: 记录 id
+            vectors: 向量，shape 为 (n, dim)
+            fields: 每条记录的字段（如 text、category），可过滤字段见 filter_fields
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        if len(ids) == 0:
+            return
+        existing = [int(i) for i in ids if int(i) in self._where]
+        if existing:
+            self.delete(existing)
+
+        attrs = {
+            name: np.fromiter(
+                (self._encode_attr(name, f.get(name), add=True) for f in fields) if fields is not None
+                else (MISSING_CODE for _ in range(len(ids))),
+                dtype=np.int32, count=len(ids))
+            for name in self.filter_fields
+        }
+        if fields is not None:
+            for doc_id, doc_fields in zip(ids.tolist(), fields):
+                self._fields[doc_id] = dict(doc_fields)
+
+        if self.is_trained:
+            self._add(ids, vectors, attrs)
+            return
+        start = self._staging.extend(vectors, ids, attrs)
+        for offset, doc_id in enumerate(ids.tolist()):
+            self._where[doc_id] = (STAGING_LIST, start + offset)
+        if self._staging.size >= self.min_train_size:
+            self.train(self._staging.data[:self._staging.size])
+
+    def _add(self, ids: np.ndarray, vectors: np.ndarray, attrs: Dict[str, np.ndarray]) -> None:
+        """把记录分配到最近的倒排列表"""
+        labels = assign(vectors, self.centroids)
+        data = self.pq.encode(vectors - self.centroids[labels]) if self.pq is not None else vectors
+        order = np.argsort(labels, kind='stable')
+        bounds = np.flatnonzero(np.diff(labels[order])) + 1
+        for group in np.split(order, bounds):
+            list_no = int(labels[group[0]])
+            group_ids = ids[group]
+            start = self._lists[list_no].extend(
+                data[group], group_ids, {name: values[group] for name, values in attrs.items()}
+            )
+            for offset, doc_id in enumerate(group_ids.tolist()):
+                self._where[doc_id] = (list_no, start + offset)
+
+    def insert(self, doc_id: int, vector: np.ndarray, **fields: Any) -> None:
+        """
+        插入单条记录
+
+        Args:
+            doc_id: 记录 id
+            vector: 向量，shape 为 (dim,)
+            **fields: 记录的字段
+        """
+        self.batch_insert([doc_id], np.asarray(vector).reshape(1, -1), [fields])
+
+    def get(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        """返回记录的字段，不存在时返回 None"""
+        if doc_id not in self._where:
+            return None
+        return self._fields.get(doc_id, {})
+
+    def _filter_codes(self, filter: Optional[FilterType]) -> Dict[str, np.ndarray]:
+        codes = {}
+        for name, value in (filter or {}).items():
+            if name not in self._vocab:
+                raise ValueError(f"字段 '{name}' 不可过滤，可过滤字段: {self.filter_fields}")
+            values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            codes[name] = np.array([self._encode_attr(name, v, add=False) for v in values], dtype=np.int32)
+        return codes
+
+    @staticmethod
+    def _mask(inv_list: _InvertedList, codes: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        mask = None
+        for name, wanted in codes.items():
+            values = inv_list.attrs[name][:inv_list.size]
+            current = values == wanted[0] if len(wanted) == 1 else np.isin(values, wanted)
+            mask = current if mask is None else mask & current
+        return mask
+
+    def delete(self, ids: Optional[Sequence[int]] = None, filter: Optional[FilterType] = None) -> int:
+        """
+        按 id 或过滤条件删除记录
+
+        Args:
+            ids: 要删除的 id
+            filter: 过滤条件，如 {"subject": "history"}
+
+        Returns:
+            删除的记录数
+        """
+        targets = [int(i) for i in ids] if ids is not None else []
+        if filter:
+            codes = self._filter_codes(filter)
+            for inv_list in self._lists + [self._staging]:
+                mask = self._mask(inv_list, codes)
+                if mask is not None:
+                    targets.extend(inv_list.ids[:inv_list.size][mask].tolist())
+
+        deleted = 0
+        for doc_id in targets:
+            location = self._where.pop(doc_id, None)
+            if location is None:
+                continue
+            list_no, pos = location
+            moved = self._inv_list(list_no).remove(pos)
+            if moved is not None:
+                self._where[moved] = (list_no, pos)
+            self._fields.pop(doc_id, None)
+            deleted += 1
+        return deleted
+
+    def search(self, queries: np.ndarray, top_k: int = 10, filter: Optional[FilterType] = None,
+               nprobe: Optional[int] = None) -> List[List[SearchHit]]:
+        """
+        检索
+
+        Args:
+            queries: 查询向量，shape 为 (n_queries, dim) 或 (dim,)
+            top_k: 每个查询返回的结果数
+            filter: 过滤条件，如 {"category": "AI"} 或 {"subject": ["history", "biology"]}
+            nprobe: 扫描的列表数，默认使用 self.nprobe
+
+        Returns:
+            每个查询一个按分数降序的 SearchHit 列表
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if not len(self):
+            return [[] for _ in range(len(queries))]
+        codes = self._filter_codes(filter)
+        if not self.is_trained:
+            return self._search_staging(queries, top_k, codes)
+        nprobe = min(nprobe or self.nprobe, len(self._lists))
+
+        # 离查询最近（L2）的 nprobe 个中心
+        centroid_dist = np.einsum('ij,ij->i', self.centroids, self.centroids) - 2 * (queries @ self.centroids.T)
+        if nprobe < len(self._lists):
+            probes = np.argpartition(centroid_dist, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(len(self._lists)), centroid_dist.shape)
+        tables = self.pq.lookup_table(queries) if self.pq is not None else None
+
+        results = []
+        for qi, query in enumerate(queries):
+            all_scores, all_ids = [], []
+            for list_no in probes[qi]:
+                inv_list = self._lists[list_no]
+                if not inv_list.size:
+                    continue
+                data = inv_list.data[:inv_list.size]
+                list_ids = inv_list.ids[:inv_list.size]
+                mask = self._mask(inv_list, codes)
+                if mask is not None:
+                    data, list_ids = data[mask], list_ids[mask]
+                    if not len(list_ids):
+                        continue
+                if tables is not None:
+                    # q·x = q·c + q·(x - c)
+                    scores = self.pq.adc_scores(tables[qi], data) + float(query @ self.centroids[list_no])
+                else:
+                    scores = data @ query
+                all_scores.append(scores)
+                all_ids.append(list_ids)
+            results.append(self._top_hits(all_scores, all_ids, top_k))
+        return results
+
+    def _search_staging(self, queries: np.ndarray, top_k: int,
+                        codes: Dict[str, np.ndarray]) -> List[List[SearchHit]]:
+        """未训练时暴力检索暂存的记录"""
+        staging = self._staging
+        data, list_ids = staging.data[:staging.size], staging.ids[:staging.size]
+        mask = self._mask(staging, codes)
+        if mask is not None:
+            data, list_ids = data[mask], list_ids[mask]
+        return [self._top_hits([scores], [list_ids], top_k) for scores in queries @ data.T]
+
+    def _top_hits(self, all_scores: List[np.ndarray], all_ids: List[np.ndarray], top_k: int) -> List[SearchHit]:
+        if not all_scores:
+            return []
+        scores = np.concatenate(all_scores)
+        ids = np.concatenate(all_ids)
+        if len(scores) > top_k:
+            keep = np.argpartition(scores, -top_k)[-top_k:]
+            scores, ids = scores[keep], ids[keep]
+        order = np.argsort(-scores, kind='stable')
+        return [
+            SearchHit(id=doc_id, score=score, fields=self._fields.get(doc_id, {}))
+            for doc_id, score in zip(ids[order].tolist(), scores[order].tolist())
+        ]
+
+
+def generate_clustered_vectors(n: int, dim: int, n_clusters: int = 1000, noise: float = 0.5,
+                               seed: int = 0) -> np.ndarray:
+    """
+    生成带簇结构的归一化向量（模拟真实 embedding 的分布）
+
+    Args:
+        n: 向量数
+        dim: 维度
+        n_clusters: 簇数
+        noise: 簇内噪声的标准差（相对于簇中心的模长 1）
+        seed: 随机种子
+
+    Returns:
+        float32 矩阵，shape 为 (n, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    step = 65536
+    for start in range(0, n, step):
+        block = vectors[start:start + step]
+        block[:] = centers[rng.integers(0, n_clusters, len(block))]
+        block += rng.standard_normal(block.shape, dtype=np.float32) * (noise / np.sqrt(dim))
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+    return vectors
+
+
+def _recall(hits: List[List[SearchHit]], truth: np.ndarray) -> float:
+    found = sum(len({hit.id for hit in row} & set(expected.tolist())) for row, expected in zip(hits, truth))
+    return found / truth.size
+
+
+def main():
+    """召回率-延迟基准：IVF 索引与暴力检索对比"""
+    parser = argparse.ArgumentParser(description="IVF ANN index recall/latency benchmark against brute force")
+    parser.add_argument("--n", type=int, default=200_000, help="number of vectors")
+    parser.add_argument("--dim", type=int, default=128, help="vector dimension")
+    parser.add_argument("--nlist", type=int, default=1024, help="number of inverted lists")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64], help="nprobe values")
+    parser.add_argument("--pq-m", type=int, default=None, help="PQ sub-quantizers (default: IVF-Flat)")
+    parser.add_argument("--queries", type=int, default=200, help="number of queries")
+    parser.add_argument("--k", type=int, default=10, help="top-k")
+    parser.add_argument("--noise", type=float, default=1.0, help="within-cluster noise of the synthetic data")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"IVF 索引基准: n={args.n}, dim={args.dim}, nlist={args.nlist}, pq_m={args.pq_m}, k={args.k}")
+    print("=" * 60)
+
+    # 查询与数据来自同一分布
+    vectors = generate_clustered_vectors(args.n + args.queries, args.dim, noise=args.noise, seed=args.seed)
+    vectors, queries = vectors[:args.n], vectors[args.n:]
+    categories = np.random.default_rng(args.seed).integers(0, 10, args.n)
+
+    start = time.perf_counter()
+    index = IVFIndex(args.dim, nlist=args.nlist, pq_m=args.pq_m, seed=args.seed)
+    index.train(vectors)
+    train_time = time.perf_counter() - start
+    start = time.perf_counter()
+    index.batch_insert(np.arange(args.n), vectors, [{"category": f"c{c}"} for c in categories.tolist()])
+    print(f"训练: {train_time:.2f}s, 插入: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    truth, _ = top_k_search(vectors, queries, args.k)
+    brute_ms = (time.perf_counter() - start) / args.queries * 1000
+    print(f"暴力检索（批量）: {brute_ms:.3f} ms/query")
+
+    # 过滤检索的真值：只在 category 为 c0 的向量中检索
+    subset = np.flatnonzero(categories == 0)
+    filtered_truth = subset[top_k_search(vectors[subset], queries, args.k)[0]]
+
+    print(f"\n{'nprobe':>6} {'recall':>8} {'ms/query':>9} {'filtered recall':>16} {'filtered ms':>12}")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        hits = [index.search(q, args.k, nprobe=nprobe)[0] for q in queries]
+        latency = (time.perf_counter() - start) / args.queries * 1000
+        start = time.perf_counter()
+        filtered = [index.search(q, args.k, filter={"category": "c0"}, nprobe=nprobe)[0] for q in queries]
+        filtered_latency = (time.perf_counter() - start) / args.queries * 1000
+        print(f"{nprobe:>6} {_recall(hits, truth):>8.3f} {latency:>9.3f} "
+              f"{_recall(filtered, filtered_truth):>16.3f} {filtered_latency:>12.3f}")
+
+    deleted = index.delete(filter={"category": "c0"})
+    print(f"\n删除 category=c0: {deleted} 条，剩余 {len(index)} 条")
+
+
+if __name__ == '__main__':
+    main()
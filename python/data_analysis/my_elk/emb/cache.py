@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+
+@dataclass
+class CacheStats:
+    """缓存统计"""
+    hits: int = 0  # 直接命中
+    coalesced: int = 0  # 等待同一个正在计算的请求（single-flight）
+    misses: int = 0  # 实际调用了编码
+    evictions: int = 0  # 超过容量被淘汰
+    expirations: int = 0  # 超过 TTL 被丢弃
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.coalesced + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率（含合并的请求，即没有调用编码的比例）"""
+        return (self.hits + self.coalesced) / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "requests": self.requests, "hit_rate": self.hit_rate}
+
+
+class _Flight:
+    """正在计算的请求"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class EmbeddingCache:
+    """
+    查询向量缓存：LRU + TTL，并发的相同请求只计算一次（single-flight）
+
+    键为 (模型标识, 文本)；缓存的 numpy 数组设为只读，避免调用方修改共享的结果
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最多缓存的条目数
+            ttl: 过期时间（秒），None 表示不过期
+            clock: 时钟函数
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def stats(self) -> CacheStats:
+        """统计快照"""
+        with self._lock:
+            return CacheStats(**asdict(self._stats))
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._data.clear()
+            self._stats = CacheStats()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        读取缓存，未命中时计算并写入；同一个键同时只有一个线程在计算，其余线程等待其结果
+
+        Args:
+            key: 缓存键
+            compute: 计算函数
+
+        Returns:
+            缓存或计算得到的值
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= self._clock():
+                    self._data.move_to_end(key)
+                    self._stats.hits += 1
+                    return value
+                del self._data[key]
+                self._stats.expirations += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._stats.misses += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = compute()
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            flight.value = value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._put(key, flight.value)
+                del self._inflight[key]
+            flight.event.set()
+        return value
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        expires_at = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats.evictions += 1
+
+
+_query_cache: Optional[EmbeddingCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> EmbeddingCache:
+    """获取全局查询向量缓存"""
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = EmbeddingCache()
+    return _query_cache
+
+
+def model_key(model) -> str:
+    """模型标识：优先使用 name 属性，否则由类名、维度和种子组成"""
+    name = getattr(model, "name", None)
+    if name:
+        return name
+    return f"{type(model).__name__}:{model.embedding_dim}:{getattr(model, 'seed', '')}"
+
+
+def encode_query(model, text: str, normalize: bool = True, cache: Optional[EmbeddingCache] = None) -> np.ndarray:
+    """
+    编码查询文本（带缓存）
+
+    Args:
+        model: Embedding 模型（提供 encode 方法）
+        text: 查询文本
+        normalize: 是否归一化
+        cache: 缓存，默认使用全局查询缓存
+
+    Returns:
+        只读的查询向量
+    """
+    cache = cache if cache is not None else get_query_cache()
+    return cache.get_or_compute((model_key(model), normalize, text), lambda: model.encode(text, normalize=normalize))
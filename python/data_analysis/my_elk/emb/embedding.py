@@ -1,8 +1,129 @@
 import hashlib
-from typing import List, Union
+from typing import Callable, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+# 常见词（简单模拟文本特征）
+_COMMON_WORDS = ['的', '是', '在', 'the', 'is', 'in', 'a', 'an']
+# 批量编码时每块的元素数（限制临时数组的内存）
+_CHUNK_ELEMENTS = 1 << 20
+# 计数器步长（黄金比例常数）
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+# 分块矩阵乘法时每块的向量数
+DEFAULT_CHUNK_ROWS = 65536
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 混合函数（原地修改 uint64 数组）"""
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+
+def _gaussian_block(keys: np.ndarray, out: np.ndarray) -> None:
+    """
+    由行密钥生成标准正态分布矩阵，写入 out
+
+    第 i 行只取决于 keys[i]：密钥加上列计数器经 SplitMix64 混合得到 64 位随机数，
+    拆成两个 32 位均匀数做 Box-Muller 变换，每个随机数产生 cos/sin 两个正态值（float32 计算）
+
+    Args:
+        keys: 行密钥，uint64，shape 为 (n,)
+        out: 输出矩阵，shape 为 (n, dim)
+    """
+    dim = out.shape[1]
+    half = (dim + 1) // 2
+    counters = np.arange(1, half + 1, dtype=np.uint64) * _GOLDEN_GAMMA
+    bits = _mix64(keys[:, None] + counters[None, :])
+
+    radius = (bits >> np.uint64(32)).astype(np.float32)
+    radius += np.float32(0.5)
+    radius *= np.float32(2.0 ** -32)
+    np.log(radius, out=radius)
+    radius *= np.float32(-2.0)
+    np.sqrt(radius, out=radius)
+
+    theta = (bits & np.uint64(0xFFFFFFFF)).astype(np.float32)
+    theta *= np.float32(2.0 * np.pi * 2.0 ** -32)
+    rest = dim - half
+    np.multiply(radius, np.cos(theta), out=out[:, :half])
+    np.multiply(radius[:, :rest], np.sin(theta[:, :rest]), out=out[:, half:])
+
+
+def chunked_top_k(n: int, score_chunk: Callable[[int, int], np.ndarray], n_queries: int, top_k: int = 5,
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    分块取前 k 个：逐块计算分数，用 argpartition 取每个查询的前 k 个，再与已有结果合并
+
+    Args:
+        n: 候选数
+        score_chunk: 计算 [start, end) 候选分数的函数，返回 shape 为 (n_queries, end - start)
+        n_queries: 查询数
+        top_k: 每个查询返回的结果数
+        chunk_rows: 每块的候选数
+
+    Returns:
+        (索引, 分数)，shape 均为 (n_queries, k)，按分数降序；k = min(top_k, n)
+    """
+    k = min(top_k, n)
+    best_scores = np.full((n_queries, 0), -np.inf, dtype=np.float32)
+    best_indices = np.empty((n_queries, 0), dtype=np.int64)
+    if k <= 0:
+        return best_indices, best_scores
+
+    for start in range(0, n, chunk_rows):
+        scores = score_chunk(start, min(start + chunk_rows, n))
+        if scores.shape[1] > k:
+            part = np.argpartition(scores, -k, axis=1)[:, -k:]
+            scores = np.take_along_axis(scores, part, axis=1)
+        else:
+            part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        # 与已有结果合并后再取前 k 个
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_indices = np.concatenate([best_indices, part + start], axis=1)
+        if merged_scores.shape[1] > k:
+            keep = np.argpartition(merged_scores, -k, axis=1)[:, -k:]
+            merged_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            merged_indices = np.take_along_axis(merged_indices, keep, axis=1)
+        best_scores, best_indices = merged_scores, merged_indices
+
+    # 只对最终的 k 个结果排序
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_indices, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def top_k_search(matrix: np.ndarray, queries: np.ndarray, top_k: int = 5,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 scales: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    分块内积检索：每块做一次矩阵乘法后取前 k 个
+
+    内存占用只与 chunk_rows 和查询数有关，matrix 可以是磁盘上的 memmap
+
+    Args:
+        matrix: 候选向量矩阵，shape 为 (n, dim)，float32/float16/int8
+        queries: 查询向量，shape 为 (n_queries, dim) 或 (dim,)
+        top_k: 每个查询返回的结果数
+        chunk_rows: 每块的向量数
+        scales: 每行的缩放系数（int8 量化），shape 为 (n,)
+
+    Returns:
+        (索引, 分数)，shape 均为 (n_queries, k)，按分数降序；k = min(top_k, n)
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    query_t = np.ascontiguousarray(queries.T)
+
+    def score_chunk(start: int, end: int) -> np.ndarray:
+        scores = np.asarray(matrix[start:end], dtype=np.float32) @ query_t
+        if scales is not None:
+            scores *= np.asarray(scales[start:end], dtype=np.float32)[:, None]
+        return scores.T
+
+    return chunked_top_k(matrix.shape[0], score_chunk, queries.shape[0], top_k, chunk_rows)
+
 
 class MockEmbeddingModel:
     """
@@ -40,17 +161,7 @@ class MockEmbeddingModel:
         else:
             single_input = False
 
-        embeddings = []
-        for text in texts:
-            # 使用hash保证相同文本得到相同向量
-            embedding = self._text_to_vector(text)
-            embeddings.append(embedding)
-
-        embeddings = np.array(embeddings)
-
-        # 归一化
-        if normalize:
-            embeddings = self._normalize(embeddings)
+        embeddings = self.encode_batch(texts, normalize=normalize, dtype=np.float64)
 
         # 如果输入是单个文本，返回一维数组
         if single_input:
@@ -58,34 +169,68 @@ class MockEmbeddingModel:
 
         return embeddings
 
-    def _text_to_vector(self, text: str) -> np.ndarray:
-        """
-        将文本转换为向量（基于hash的确定性方法）
+    def encode_batch(self, texts: Sequence[str], normalize: bool = True, dtype=np.float32,
+                     batch_size: Optional[int] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        # 使用MD5 hash生成种子
-        hash_obj = hashlib.md5(text.encode('utf-8'))
-        hash_int = int(hash_obj.hexdigest(), 16)
+        批量将文本编码为向量（向量化实现，适合百万级文档的索引压测）
 
-        # 使用hash作为种子生成向量
-        rng = np.random.RandomState(hash_int % (2 ** 32))
-        vector = rng.randn(self.embedding_dim)
+        每个文本的 MD5 作为行密钥，由基于计数器的随机数生成器按块生成整块矩阵，
+        不为每个文本创建 RandomState；相同文本总是得到相同向量
 
-        # 添加一些基于文本特征的调整，使相似文本更接近
-        # 基于文本长度
-        length_factor = len(text) / 100.0
-        vector[0] += length_factor
+        Args:
+            texts: 文本列表
+            normalize: 是否归一化向量
+            dtype: 输出类型，默认 float32
+            batch_size: 每块处理的文本数，默认按约 100 万个元素分块，限制临时内存
+            out: 预分配的输出矩阵，shape 为 (n_texts, embedding_dim)
 
+        Returns:
+            numpy数组，shape为 (n_texts, embedding_dim)
+        """
+        n = len(texts)
+        if out is None:
+            out = np.empty((n, self.embedding_dim), dtype=dtype)
+        elif out.shape != (n, self.embedding_dim):
+            raise ValueError(f"out 的形状应为 {(n, self.embedding_dim)}，实际为 {out.shape}")
+        if batch_size is None:
+            batch_size = max(1, _CHUNK_ELEMENTS // self.embedding_dim)
+
+        for start in range(0, n, batch_size):
+            chunk = texts[start:start + batch_size]
+            block = out[start:start + len(chunk)]
+            _gaussian_block(self._row_keys(chunk), block)
+            self._apply_features(block, chunk)
+            if normalize:
+                norms = np.linalg.norm(block, axis=1, keepdims=True)
+                norms[norms == 0] = 1  # 避免除零
+                block /= norms
+        return out
+
+    def _row_keys(self, texts: Sequence[str]) -> np.ndarray:
+        """每个文本的行密钥：MD5 前 8 字节与模型种子混合"""
+        digests = b"".join(hashlib.md5(text.encode('utf-8')).digest()[:8] for text in texts)
+        keys = np.frombuffer(digests, dtype="<u8").astype(np.uint64)
+        keys ^= _mix64(np.array([self.seed], dtype=np.uint64))
+        return keys
+
+    @staticmethod
+    def _apply_features(block: np.ndarray, texts: Sequence[str]) -> None:
+        """添加基于文本特征的调整，使相似文本更接近"""
+        n = len(texts)
+        # 基于文本长度
+        block[:, 0] += np.fromiter(map(len, texts), dtype=np.float64, count=n) / 100.0
         # 基于字符集
-        unique_chars = len(set(text))
-        vector[1] += unique_chars / 50.0
-
+        block[:, 1] += np.fromiter((len(set(text)) for text in texts), dtype=np.float64, count=n) / 50.0
         # 基于常见词（简单模拟）
-        common_words = ['的', '是', '在', 'the', 'is', 'in', 'a', 'an']
-        for i, word in enumerate(common_words[:min(8, len(common_words))]):
-            if word in text.lower():
-                vector[i + 2] += 0.5
+        lowered = [text.lower() for text in texts]
+        for i, word in enumerate(_COMMON_WORDS):
+            block[:, i + 2] += np.fromiter((word in text for text in lowered), dtype=bool, count=n) * 0.5
 
-        return vector
+    def _text_to_vector(self, text: str) -> np.ndarray:
+        """
+        将文本转换为向量（基于hash的确定性方法）
+        """
+        return self.encode_batch([text], normalize=False, dtype=np.float64)[0]
 
     def _normalize(self, vectors: np.ndarray) -> np.ndarray:
         """L2归一化"""
@@ -126,7 +271,8 @@ class MockEmbeddingModel:
         similarities = np.dot(candidate_embs, query_emb)
         return similarities.tolist()
 
-    def find_most_similar(self, query: str, candidates: List[str], top_k: int = 5) -> List[tuple]:
+    def find_most_similar(self, query: str, candidates: Sequence[str], top_k: int = 5,
+                          store=None) -> List[tuple]:
         """
         找出最相似的文本
 
@@ -134,20 +280,38 @@ class MockEmbeddingModel:
             query: 查询文本
             candidates: 候选文本列表
             top_k: 返回前k个最相似的
+            store: 可选的 EmbeddingStore，候选向量从磁盘缓存读取，不重复编码
 
         Returns:
             [(index, text, similarity_score), ...] 列表
         """
-        similarities = self.batch_similarity(query, candidates)
+        return self.find_most_similar_batch([query], candidates, top_k, store)[0]
 
-        # 获取top_k个最相似的索引
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+    def find_most_similar_batch(self, queries: Sequence[str], candidates: Sequence[str], top_k: int = 5,
+                                store=None) -> List[List[tuple]]:
+        """
+        批量找出每个查询最相似的文本（分块矩阵乘法 + argpartition）
 
-        results = []
-        for idx in top_indices:
-            results.append((int(idx), candidates[idx], similarities[idx]))
+        Args:
+            queries: 查询文本列表
+            candidates: 候选文本列表
+            top_k: 每个查询返回前k个最相似的
+            store: 可选的 EmbeddingStore，候选向量从磁盘缓存读取，不重复编码
 
-        return results
+        Returns:
+            每个查询一个 [(index, text, similarity_score), ...] 列表
+        """
+        if store is not None:
+            candidate_embs = store.get(candidates)
+        else:
+            candidate_embs = self.encode_batch(candidates, normalize=True)
+        query_embs = self.encode_batch(queries, normalize=True)
+        indices, scores = top_k_search(candidate_embs, query_embs, top_k)
+
+        return [
+            [(idx, candidates[idx], score) for idx, score in zip(row_indices.tolist(), row_scores.tolist())]
+            for row_indices, row_scores in zip(indices, scores)
+        ]
 
 
 def demo_single_text_encoding(emb: MockEmbeddingModel):
@@ -0,0 +1,477 @@
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+from .embedding import DEFAULT_CHUNK_ROWS, chunked_top_k, top_k_search
+
+# 分块计算距离时每块的元素数（限制 (rows, k) 距离矩阵的内存）
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def assign(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    把向量分配到最近（L2）的中心
+
+    Args:
+        x: 向量，shape 为 (n, dim)
+        centroids: 中心，shape 为 (k, dim)
+
+    Returns:
+        中心下标，shape 为 (n,)
+    """
+    centroids = np.asarray(centroids, dtype=np.float32)
+    centroid_sq = np.einsum('ij,ij->i', centroids, centroids)
+    labels = np.empty(len(x), dtype=np.int64)
+    rows = max(1, _CHUNK_ELEMENTS // len(centroids))
+    for start in range(0, len(x), rows):
+        chunk = np.asarray(x[start:start + rows], dtype=np.float32)
+        # ||x - c||^2 = ||x||^2 - 2 x·c + ||c||^2，||x||^2 对 argmin 无影响
+        distances = centroid_sq - 2 * (chunk @ centroids.T)
+        labels[start:start + rows] = np.argmin(distances, axis=1)
+    return labels
+
+
+def kmeans(x: np.ndarray, k: int, iterations: int = 10, seed: int = 0,
+           max_samples: Optional[int] = None) -> np.ndarray:
+    """
+    Lloyd k-means（L2）
+
+    Args:
+        x: 训练向量，shape 为 (n, dim)
+        k: 中心数
+        iterations: 迭代次数
+        seed: 随机种子
+        max_samples: 最多使用的训练样本数，None 时使用全部
+
+    Returns:
+        中心，float32，shape 为 (k, dim)
+    """
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float32)
+    if max_samples is not None and len(x) > max_samples:
+        x = x[np.sort(rng.choice(len(x), max_samples, replace=False))]
+    if len(x) < k:
+        raise ValueError(f"训练样本数 {len(x)} 少于中心数 {k}")
+
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(x, centroids)
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=k)
+        nonempty = counts > 0
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty]
+        centroids[nonempty] = np.add.reduceat(x[order], starts, axis=0) / counts[nonempty, None]
+        # 空簇用随机样本重新初始化
+        empty = np.flatnonzero(~nonempty)
+        if len(empty):
+            centroids[empty] = x[rng.choice(len(x), len(empty), replace=False)]
+    return centroids
+
+
+@dataclass
+class QuantizedVectors:
+    """
+    量化后的向量
+
+    kind 为 float16（codes 为 float16）、int8（codes 为 int8，scales 为每个向量的缩放系数）
+    或 pq（codes 为 uint8 编码，码本保存在 ProductQuantizer 中）
+    """
+    kind: str
+    codes: np.ndarray
+    scales: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def save(self, prefix: Union[str, Path]) -> None:
+        """保存为 <prefix>.codes.npy（和 <prefix>.scales.npy）及 <prefix>.json"""
+        prefix = Path(prefix)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        np.save(f"{prefix}.codes.npy", self.codes)
+        if self.scales is not None:
+            np.save(f"{prefix}.scales.npy", self.scales)
+        with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+            json.dump({"kind": self.kind, "count": len(self), "dim": self.codes.shape[1]}, f)
+
+    @classmethod
+    def load(cls, prefix: Union[str, Path], mmap: bool = True) -> "QuantizedVectors":
+        """加载 save 保存的向量，mmap 为 True 时以只读 memmap 方式打开"""
+        mode = 'r' if mmap else None
+        with open(f"{prefix}.json", "r", encoding="utf-8") as f:
+            kind = json.load(f)["kind"]
+        scales_path = Path(f"{prefix}.scales.npy")
+        return cls(
+            kind=kind,
+            codes=np.load(f"{prefix}.codes.npy", mmap_mode=mode),
+            scales=np.load(scales_path, mmap_mode=mode) if scales_path.exists() else None,
+        )
+
+
+class Float16Quantizer:
+    """半精度存储：每维 2 字节，检索时按块转回 float32 计算"""
+
+    kind = "float16"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def bytes_per_vector(self) -> int:
+        return 2 * self.dim
+
+    def train(self, x: np.ndarray) -> None:
+        """无需训练"""
+
+    def quantize(self, x: np.ndarray) -> QuantizedVectors:
+        return QuantizedVectors(self.kind, np.asarray(x).astype(np.float16))
+
+    def dequantize(self, vectors: QuantizedVectors) -> np.ndarray:
+        return np.asarray(vectors.codes, dtype=np.float32)
+
+    def search(self, vectors: QuantizedVectors, queries: np.ndarray, top_k: int = 10,
+               chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        return top_k_search(vectors.codes, queries, top_k, chunk_rows)
+
+
+class Int8Quantizer:
+    """
+    int8 标量量化：每个向量按自身最大绝对值缩放到 [-127, 127]，每维 1 字节 + 每个向量 4 字节缩放系数
+
+    检索时按块计算 codes·q 再乘以缩放系数；余弦相似度与缩放无关，codes 可直接写入 byte 类型的向量字段
+    """
+
+    kind = "int8"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def bytes_per_vector(self) -> int:
+        return self.dim + 4
+
+    def train(self, x: np.ndarray) -> None:
+        """无需训练"""
+
+    def quantize(self, x: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> QuantizedVectors:
+        codes = np.empty((len(x), self.dim), dtype=np.int8)
+        scales = np.empty(len(x), dtype=np.float32)
+        for start in range(0, len(x), chunk_rows):
+            chunk = np.asarray(x[start:start + chunk_rows], dtype=np.float32)
+            scale = np.abs(chunk).max(axis=1) / 127
+            scale[scale == 0] = 1  # 全零向量
+            codes[start:start + len(chunk)] = np.rint(chunk / scale[:, None])
+            scales[start:start + len(chunk)] = scale
+        return QuantizedVectors(self.kind, codes, scales)
+
+    def dequantize(self, vectors: QuantizedVectors) -> np.ndarray:
+        return np.asarray(vectors.codes, dtype=np.float32) * np.asarray(vectors.scales)[:, None]
+
+    def search(self, vectors: QuantizedVectors, queries: np.ndarray, top_k: int = 10,
+               chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        return top_k_search(vectors.codes, queries, top_k, chunk_rows, scales=vectors.scales)
+
+
+class ProductQuantizer:
+    """
+    乘积量化（PQ）
+
+    向量切成 m 段，每段用 256 个中心的码本编码为 1 字节；
+    检索时对每个查询计算 (m, 256) 的内积查找表，按编码查表求和得到近似内积（ADC）
+    """
+
+    def __init__(self, dim: int, m: int = 8, seed: int = 0):
+        """
+        初始化量化器
+
+        Args:
+            dim: 向量维度，必须能被 m 整除
+            m: 分段数（每个向量编码为 m 字节）
+            seed: 随机种子
+        """
+        if dim % m:
+            raise ValueError(f"维度 {dim} 不能被分段数 {m} 整除")
+        self.dim = dim
+        self.m = m
+        self.ksub = 256
+        self.dsub = dim // m
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None  # (m, 256, dsub)
+
+    kind = "pq"
+
+    def bytes_per_vector(self) -> int:
+        return self.m
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    def train(self, x: np.ndarray, iterations: int = 10, max_samples: int = 16384) -> None:
+        """
+        训练每段的码本
+
+        Args:
+            x: 训练向量，shape 为 (n, dim)，n 至少为 256
+            iterations: k-means 迭代次数
+            max_samples: 最多使用的训练样本数
+        """
+        x = np.asarray(x, dtype=np.float32).reshape(len(x), self.m, self.dsub)
+        self.codebooks = np.stack([
+            kmeans(x[:, j], self.ksub, iterations, self.seed + j, max_samples) for j in range(self.m)
+        ])
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        """
+        编码向量
+
+        Args:
+            x: 向量，shape 为 (n, dim)
+
+        Returns:
+            编码，uint8，shape 为 (n, m)
+        """
+        x = np.asarray(x, dtype=np.float32).reshape(len(x), self.m, self.dsub)
+        codes = np.empty((len(x), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = assign(x[:, j], self.codebooks[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """
+        由编码重建向量
+
+        Args:
+            codes: 编码，shape 为 (n, m)
+
+        Returns:
+            重建向量，float32，shape 为 (n, dim)
+        """
+        return self.codebooks[np.arange(self.m), codes].reshape(len(codes), self.dim)
+
+    def lookup_table(self, queries: np.ndarray) -> np.ndarray:
+        """
+        计算查询与每段码本中心的内积
+
+        Args:
+            queries: 查询向量，shape 为 (n_queries, dim)
+
+        Returns:
+            查找表，float32，shape 为 (n_queries, m, 256)
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(len(queries), self.m, self.dsub)
+        return np.einsum('qjd,jkd->qjk', queries, self.codebooks)
+
+    def adc_scores(self, table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        用查找表计算单个查询与一组编码的近似内积
+
+        Args:
+            table: 单个查询的查找表，shape 为 (m, 256)
+            codes: 编码，shape 为 (n, m)
+
+        Returns:
+            近似内积，shape 为 (n,)
+        """
+        scores = np.zeros(len(codes), dtype=np.float32)
+        for j in range(self.m):
+            scores += table[j, codes[:, j]]
+        return scores
+
+    def quantize(self, x: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> QuantizedVectors:
+        """编码向量（需要先训练）"""
+        codes = np.empty((len(x), self.m), dtype=np.uint8)
+        for start in range(0, len(x), chunk_rows):
+            chunk = x[start:start + chunk_rows]
+            codes[start:start + len(chunk)] = self.encode(chunk)
+        return QuantizedVectors(self.kind, codes)
+
+    def dequantize(self, vectors: QuantizedVectors) -> np.ndarray:
+        return self.decode(np.asarray(vectors.codes))
+
+    def search(self, vectors: QuantizedVectors, queries: np.ndarray, top_k: int = 10,
+               chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        """按查找表分块计算近似内积（ADC）后取前 k 个"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        table = self.lookup_table(queries)
+
+        def score_chunk(start: int, end: int) -> np.ndarray:
+            codes = np.asarray(vectors.codes[start:end])
+            scores = np.zeros((len(queries), len(codes)), dtype=np.float32)
+            for j in range(self.m):
+                scores += table[:, j, codes[:, j]]
+            return scores
+
+        return chunked_top_k(len(vectors), score_chunk, len(queries), top_k, chunk_rows)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """保存码本"""
+        np.save(path, self.codebooks)
+
+    def load(self, path: Union[str, Path]) -> None:
+        """加载码本"""
+        self.codebooks = np.load(path)
+
+
+def get_quantizer(kind: str, dim: int, pq_m: Optional[int] = None, seed: int = 0):
+    """
+    按名称创建量化器
+
+    Args:
+        kind: float16、int8 或 pq
+        dim: 向量维度
+        pq_m: PQ 分段数，默认 dim // 8
+        seed: 随机种子
+
+    Returns:
+        量化器
+    """
+    if kind == "float16":
+        return Float16Quantizer(dim)
+    if kind == "int8":
+        return Int8Quantizer(dim)
+    if kind == "pq":
+        return ProductQuantizer(dim, pq_m or dim // 8, seed)
+    raise ValueError(f"未知的量化类型: {kind}")
+
+
+def es_vector_mapping(dims: int, kind: Optional[str] = None) -> dict:
+    """
+    Elasticsearch dense_vector 字段定义
+
+    int8 使用 element_type=byte（余弦相似度与每个向量的缩放系数无关）；float16 仍为 float 字段，只是写入时精度更低、JSON 更短
+
+    Args:
+        dims: 向量维度
+        kind: 量化类型，None 表示 float32
+
+    Returns:
+        字段定义
+    """
+    if kind == "pq":
+        raise ValueError("PQ 编码不能写入 dense_vector 字段")
+    mapping = {"type": "dense_vector", "dims": dims, "index": True, "similarity": "cosine"}
+    if kind == "int8":
+        mapping["element_type"] = "byte"
+    return mapping
+
+
+def to_es_vectors(vectors: QuantizedVectors) -> List[list]:
+    """
+    转为写入 Elasticsearch 的向量列表
+
+    float16 保留 5 位小数（超过 float16 的精度），JSON 长度约为 float64 的一半；int8 写整数
+
+    Args:
+        vectors: 量化后的向量
+
+    Returns:
+        每个向量一个列表
+    """
+    if vectors.kind == "float16":
+        return np.asarray(vectors.codes, dtype=np.float64).round(5).tolist()
+    if vectors.kind == "int8":
+        return np.asarray(vectors.codes).tolist()
+    raise ValueError(f"{vectors.kind} 编码不能写入 Elasticsearch")
+
+
+def to_es_query_vector(vector: np.ndarray, kind: Optional[str] = None) -> list:
+    """
+    转为 kNN 查询的 query_vector
+
+    byte 字段（int8 索引）不接受小数查询向量，查询向量按写入时的方式量化为整数；其他索引直接发送 float
+
+    Args:
+        vector: 查询向量，shape 为 (dim,)
+        kind: 索引的量化类型，None 表示 float32
+
+    Returns:
+        查询向量列表
+    """
+    vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+    if kind == "int8":
+        return Int8Quantizer(vector.shape[1]).quantize(vector).codes[0].tolist()
+    if kind == "pq":
+        raise ValueError("PQ 编码不能写入 dense_vector 字段")
+    return vector[0].tolist()
+
+
+def to_milvus_vectors(vectors: QuantizedVectors) -> List[np.ndarray]:
+    """
+    转为写入 Milvus 的向量（float16 对应 FLOAT16_VECTOR 字段，int8 对应 INT8_VECTOR 字段）
+
+    Args:
+        vectors: 量化后的向量
+
+    Returns:
+        每个向量一个 numpy 数组
+    """
+    if vectors.kind not in ("float16", "int8"):
+        raise ValueError(f"{vectors.kind} 编码不能写入 Milvus")
+    return list(np.asarray(vectors.codes))
+
+
+def main():
+    """量化召回率基准：与 float32 暴力检索对比"""
+    from .ann import generate_clustered_vectors
+
+    parser = argparse.ArgumentParser(description="Recall/memory benchmark of float16, int8 and PQ quantization")
+    parser.add_argument("--n", type=int, default=100_000, help="number of vectors")
+    parser.add_argument("--dim", type=int, default=768, help="vector dimension")
+    parser.add_argument("--queries", type=int, default=100, help="number of queries")
+    parser.add_argument("--k", type=int, default=10, help="top-k")
+    parser.add_argument("--pq-m", type=int, nargs="+", default=[96, 192], help="PQ sub-quantizer counts")
+    parser.add_argument("--noise", type=float, default=1.0, help="within-cluster noise of the synthetic data")
+    parser.add_argument("--project", type=int, default=10_000_000, help="corpus size for the memory projection")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"量化基准: n={args.n}, dim={args.dim}, k={args.k}")
+    print("=" * 60)
+
+    vectors = generate_clustered_vectors(args.n + args.queries, args.dim, noise=args.noise, seed=args.seed)
+    vectors, queries = vectors[:args.n], vectors[args.n:]
+
+    start = time.perf_counter()
+    truth, _ = top_k_search(vectors, queries, args.k)
+    exact_ms = (time.perf_counter() - start) / args.queries * 1000
+    json_float32 = len(json.dumps(vectors[:100].astype(np.float64).tolist())) / 100
+
+    print(f"\n{'kind':>10} {'bytes/vec':>9} {'MB':>8} {f'GB@{args.project:,}':>14} {'recall':>7} "
+          f"{'ms/query':>9} {'json/vec':>9} {'encode s':>9}")
+    print(f"{'float32':>10} {4 * args.dim:>9} {vectors.nbytes / 2 ** 20:>8.1f} "
+          f"{4 * args.dim * args.project / 2 ** 30:>14.2f} {1.0:>7.3f} {exact_ms:>9.3f} {json_float32:>9.0f} {'-':>9}")
+
+    quantizers = [Float16Quantizer(args.dim), Int8Quantizer(args.dim)]
+    quantizers += [ProductQuantizer(args.dim, m, args.seed) for m in args.pq_m if args.dim % m == 0]
+    for quantizer in quantizers:
+        start = time.perf_counter()
+        quantizer.train(vectors)
+        encoded = quantizer.quantize(vectors)
+        encode_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found, _ = quantizer.search(encoded, queries, args.k)
+        latency = (time.perf_counter() - start) / args.queries * 1000
+        recall = np.mean([len(set(a) & set(b)) for a, b in zip(found.tolist(), truth.tolist())]) / args.k
+
+        try:
+            json_size = f"{len(json.dumps(to_es_vectors(QuantizedVectors(encoded.kind, encoded.codes[:100])))) / 100:.0f}"
+        except ValueError:
+            json_size = "-"
+        name = f"pq{quantizer.m}" if quantizer.kind == "pq" else quantizer.kind
+        per_vector = quantizer.bytes_per_vector()
+        print(f"{name:>10} {per_vector:>9} {encoded.nbytes / 2 ** 20:>8.1f} "
+              f"{per_vector * args.project / 2 ** 30:>14.2f} {recall:>7.3f} {latency:>9.3f} {json_size:>9} "
+              f"{encode_time:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
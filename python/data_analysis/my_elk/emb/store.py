@@ -0,0 +1,144 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .embedding import DEFAULT_CHUNK_ROWS, MockEmbeddingModel, top_k_search
+
+
+class EmbeddingStore:
+    """
+    候选向量矩阵的磁盘存储
+
+    编码后的矩阵保存为 <root_dir>/<语料哈希>.npy，再次使用同一语料时以 memmap 方式打开，
+    不必重新编码；语料哈希包含模型维度、种子和存储类型
+    """
+
+    def __init__(self, root_dir: Union[str, Path], model: MockEmbeddingModel, dtype=np.float32):
+        """
+        初始化存储
+
+        Args:
+            root_dir: 存储目录
+            model: 用于编码的模型
+            dtype: 存储类型，float32 或 float16
+        """
+        self.root_dir = Path(root_dir)
+        self.model = model
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"不支持的存储类型: {self.dtype}")
+
+    def corpus_key(self, texts: Sequence[str]) -> str:
+        """
+        计算语料哈希
+
+        Args:
+            texts: 候选文本列表
+
+        Returns:
+            十六进制哈希字符串
+        """
+        digest = hashlib.sha1(f"{self.model.embedding_dim}:{self.model.seed}:{self.dtype.str}".encode())
+        for text in texts:
+            data = text.encode('utf-8')
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """语料哈希对应的文件路径"""
+        return self.root_dir / f"{key}.npy"
+
+    def open(self, key: str) -> np.memmap:
+        """
+        以只读 memmap 方式打开已保存的矩阵
+
+        Args:
+            key: 语料哈希
+
+        Returns:
+            shape 为 (n, dim) 的 memmap
+        """
+        return np.load(self.path_for(key), mmap_mode='r')
+
+    def get(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.memmap:
+        """
+        获取语料的向量矩阵，不存在时编码并保存
+
+        Args:
+            texts: 候选文本列表
+            batch_size: 每次编码的文本数
+
+        Returns:
+            shape 为 (n, dim) 的只读 memmap
+        """
+        key = self.corpus_key(texts)
+        if not self.path_for(key).exists():
+            self.build(key, texts, batch_size)
+        return self.open(key)
+
+    def build(self, key: str, texts: Sequence[str], batch_size: Optional[int] = None) -> Path:
+        """
+        编码语料并写入 .npy 文件（先写临时文件再原子替换）
+
+        Args:
+            key: 语料哈希
+            texts: 候选文本列表
+            batch_size: 每次编码的文本数
+
+        Returns:
+            文件路径
+        """
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        n, dim = len(texts), self.model.embedding_dim
+        if batch_size is None:
+            batch_size = DEFAULT_CHUNK_ROWS
+        try:
+            matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=self.dtype, shape=(n, dim))
+            for start in range(0, n, batch_size):
+                chunk = texts[start:start + batch_size]
+                if self.dtype == np.float32:
+                    self.model.encode_batch(chunk, out=matrix[start:start + len(chunk)])
+                else:
+                    matrix[start:start + len(chunk)] = self.model.encode_batch(chunk)
+            matrix.flush()
+            del matrix
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return path
+
+    def search(self, queries: Union[str, Sequence[str]], texts: Optional[Sequence[str]] = None,
+               key: Optional[str] = None, top_k: int = 5,
+               chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        在语料中检索与查询最相似的文本
+
+        大语料建议先用 get/build 保存一次，之后按语料哈希检索，避免每次查询都对全部文本计算哈希
+
+        Args:
+            queries: 单个查询或查询列表
+            texts: 候选文本列表
+            key: 已保存语料的哈希（与 texts 二选一）
+            top_k: 每个查询返回的结果数
+            chunk_rows: 每块的向量数
+
+        Returns:
+            (索引, 分数)，shape 均为 (n_queries, k)
+        """
+        if key is not None:
+            matrix = self.open(key)
+        elif texts is not None:
+            matrix = self.get(texts)
+        else:
+            raise ValueError("需要提供 texts 或 key")
+        if isinstance(queries, str):
+            queries = [queries]
+        query_embs = self.model.encode_batch(queries, normalize=True)
+        return top_k_search(matrix, query_embs, top_k, chunk_rows)
@@ -0,0 +1,206 @@
+"""
+Elasticsearch 桩服务
+
+实现批量导入用到的少量接口（_bulk、索引创建/删除、_settings、_refresh、_count），
+不保存向量，只统计请求；可按比例让 _bulk 中的条目返回 429，用于测试重试和错误统计。
+
+用法:
+    python es_stub.py --port 9017 --reject-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+@dataclass
+class StubStats:
+    """桩服务统计"""
+    bulk_requests: int = 0
+    bulk_items: int = 0
+    bulk_bytes: int = 0
+    rejected_items: int = 0
+    refreshes: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "ElasticsearchStub"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        # 8.x 客户端会校验该响应头
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _route(self) -> None:
+        parts = [p for p in urlsplit(self.path).path.split("/") if p]
+        body = self._read_body()
+        method = self.command
+        if not parts:
+            self._send(200, {"name": "stub", "version": {"number": "8.11.0", "build_flavor": "default"},
+                             "tagline": "You Know, for Search"})
+        elif parts[-1] == "_bulk":
+            self._send(200, self.server.handle_bulk(body, parts[0] if len(parts) > 1 else None))
+        elif parts[-1] == "_refresh":
+            self.server.stats.refreshes += 1
+            self._send(200, {"_shards": {"total": 1, "successful": 1, "failed": 0}})
+        elif len(parts) == 2 and parts[1] == "_settings":
+            self._settings(parts[0], method, body)
+        elif len(parts) == 2 and parts[1] == "_count":
+            index = self.server.indices.get(parts[0])
+            self._send(200 if index else 404, {"count": index["count"] if index else 0})
+        elif len(parts) == 1:
+            self._index(parts[0], method, body)
+        else:
+            self._send(400, {"error": f"unsupported path {self.path}", "status": 400})
+
+    def _index(self, name: str, method: str, body: bytes) -> None:
+        indices = self.server.indices
+        if method == "HEAD":
+            self._send(200 if name in indices else 404)
+        elif method == "PUT":
+            if name in indices:
+                self._send(400, {"error": {"type": "resource_already_exists_exception"}, "status": 400})
+                return
+            settings = json.loads(body or b"{}").get("settings", {})
+            indices[name] = {"count": 0, "settings": dict(settings.get("index", settings))}
+            self._send(200, {"acknowledged": True, "shards_acknowledged": True, "index": name})
+        elif method == "DELETE":
+            self._send(200 if indices.pop(name, None) else 404, {"acknowledged": True})
+        else:
+            self._send(405, {"error": "method not allowed", "status": 405})
+
+    def _settings(self, name: str, method: str, body: bytes) -> None:
+        index = self.server.indices.get(name)
+        if index is None:
+            self._send(404, {"error": {"type": "index_not_found_exception"}, "status": 404})
+        elif method == "PUT":
+            settings = json.loads(body or b"{}")
+            for key, value in settings.get("index", settings).items():
+                if value is None:
+                    index["settings"].pop(key, None)
+                else:
+                    index["settings"][key] = str(value)
+            self._send(200, {"acknowledged": True})
+        else:
+            self._send(200, {name: {"settings": {"index": dict(index["settings"])}}})
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _route
+
+
+class ElasticsearchStub(ThreadingHTTPServer):
+    """Elasticsearch 桩服务（后台线程运行）"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, reject_rate: float = 0.0,
+                 latency: float = 0.0, seed: Optional[int] = None):
+        """
+        初始化桩服务
+
+        Args:
+            host: 监听地址
+            port: 端口，0 表示随机端口
+            reject_rate: _bulk 条目返回 429 的比例
+            latency: 每个 _bulk 请求的额外延迟（秒）
+            seed: 随机种子
+        """
+        super().__init__((host, port), _Handler)
+        self.reject_rate = reject_rate
+        self.latency = latency
+        self.indices: dict = {}
+        self.stats = StubStats()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_bulk(self, body: bytes, default_index: Optional[str]) -> dict:
+        """处理 _bulk 请求（NDJSON：操作行 + 文档行，delete 没有文档行）"""
+        start = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        lines = [line for line in body.split(b"\n") if line.strip()]
+        items = []
+        i = 0
+        while i < len(lines):
+            action = json.loads(lines[i])
+            op, meta = next(iter(action.items()))
+            i += 1 if op == "delete" else 2
+            index = meta.get("_index", default_index)
+            with self._lock:
+                rejected = self._rng.random() < self.reject_rate
+                if rejected:
+                    self.stats.rejected_items += 1
+                elif op in ("index", "create"):
+                    self.indices.setdefault(index, {"count": 0, "settings": {}})["count"] += 1
+            if rejected:
+                items.append({op: {"_index": index, "_id": meta.get("_id"), "status": 429, "error": {
+                    "type": "es_rejected_execution_exception", "reason": "rejected by stub"}}})
+            else:
+                items.append({op: {"_index": index, "_id": meta.get("_id"), "status": 201, "result": "created"}})
+        with self._lock:
+            self.stats.bulk_requests += 1
+            self.stats.bulk_items += len(items)
+            self.stats.bulk_bytes += len(body)
+        return {
+            "took": int((time.perf_counter() - start) * 1000),
+            "errors": any("error" in next(iter(item.values())) for item in items),
+            "items": items,
+        }
+
+    def start(self) -> "ElasticsearchStub":
+        """在后台线程中启动"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务"""
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    """主函数入口"""
+    parser = argparse.ArgumentParser(description="Minimal Elasticsearch stub for bulk ingestion tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9017)
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fraction of bulk items answered with 429")
+    parser.add_argument("--latency", type=float, default=0.0, help="extra latency per bulk request in seconds")
+    args = parser.parse_args()
+
+    server = ElasticsearchStub(args.host, args.port, args.reject_rate, args.latency)
+    print(f"Elasticsearch 桩服务: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(asdict(server.stats), indent=2))
+
+
+if __name__ == '__main__':
+    main()
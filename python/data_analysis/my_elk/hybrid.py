@@ -0,0 +1,329 @@
+"""
+混合检索：BM25 + 向量检索，结果用倒数排名融合（RRF）或加权分数归一化融合
+
+- hybrid_search_es: 并发执行 Elasticsearch 的 match 查询和 kNN 查询，在客户端融合
+  （ES 自带的 rank.rrf 需要付费许可，客户端融合在任何版本都可用）
+- LocalHybridIndex: 内存倒排索引（BM25）+ IVFIndex，无需 Elasticsearch 的本地替代
+
+词法打分弥补了向量检索对精确词匹配的不足，因此 kNN 的 num_candidates 可以取得更小
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from elasticsearch import Elasticsearch
+
+from emb.ann import IVFIndex
+from emb.cache import encode_query
+from emb.embedding import MockEmbeddingModel
+from emb.quantization import to_es_query_vector
+
+# 英文/数字按词切分，中日韩字符单独成词
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[぀-ヿ㐀-䶿一-鿿가-힯]")
+_CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+
+# (文档 id, 分数) 列表，按分数降序
+Ranking = List[Tuple[Any, float]]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词：英文/数字按词切分，中文按单字，并加入相邻汉字组成的二元词以提高短语匹配的权重
+
+    Args:
+        text: 文本
+
+    Returns:
+        词列表
+    """
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    bigrams = [a + b for a, b in zip(tokens, tokens[1:]) if _CJK_PATTERN.match(a) and _CJK_PATTERN.match(b)]
+    return tokens + bigrams
+
+
+class BM25Index:
+    """内存倒排索引，BM25 打分"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        初始化索引
+
+        Args:
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Any, int]] = defaultdict(dict)  # 词 -> {文档 id: 词频}
+        self._lengths: Dict[Any, int] = {}
+        self._terms: Dict[Any, List[str]] = {}
+        self._categories: Dict[Any, Any] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, doc_id: Any, text: str, category: Any = None) -> None:
+        """添加文档（已存在时替换）"""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self._postings[term][doc_id] = tf
+        length = sum(counts.values())
+        self._lengths[doc_id] = length
+        self._terms[doc_id] = list(counts)
+        self._categories[doc_id] = category
+        self._total_length += length
+
+    def remove(self, doc_id: Any) -> bool:
+        """删除文档，返回是否存在"""
+        if doc_id not in self._lengths:
+            return False
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        self._categories.pop(doc_id, None)
+        return True
+
+    def search(self, query: str, top_k: int = 10, category: Any = None) -> Ranking:
+        """
+        BM25 检索
+
+        Args:
+            query: 查询文本
+            top_k: 返回结果数
+            category: 只返回该分类的文档
+
+        Returns:
+            [(文档 id, 分数), ...]，按分数降序
+        """
+        n = len(self._lengths)
+        if not n:
+            return []
+        avg_length = self._total_length / n
+        scores: Dict[Any, float] = defaultdict(float)
+        for term, query_tf in Counter(tokenize(query)).items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if category is not None and self._categories[doc_id] != category:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] += query_tf * idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Ranking], k: int = 60,
+                           weights: Optional[Sequence[float]] = None) -> Ranking:
+    """
+    倒数排名融合：score(d) = Σ w_i / (k + rank_i(d))，只看名次，不受各路分数尺度影响
+
+    Args:
+        rankings: 各路检索结果
+        k: 平滑常数
+        weights: 各路权重，默认都为 1
+
+    Returns:
+        融合后的 [(文档 id, 分数), ...]
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[Any, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, (doc_id, _) in enumerate(ranking, 1):
+            fused[doc_id] += weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def weighted_score_fusion(rankings: Sequence[Ranking], weights: Optional[Sequence[float]] = None) -> Ranking:
+    """
+    加权分数融合：各路分数先做 min-max 归一化到 [0, 1] 再加权求和
+
+    Args:
+        rankings: 各路检索结果
+        weights: 各路权重，默认都为 1
+
+    Returns:
+        融合后的 [(文档 id, 分数), ...]
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[Any, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        if not ranking:
+            continue
+        scores = [score for _, score in ranking]
+        low, high = min(scores), max(scores)
+        for doc_id, score in ranking:
+            fused[doc_id] += weight * ((score - low) / (high - low) if high > low else 1.0)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def fuse(rankings: Sequence[Ranking], fusion: str = "rrf", weights: Optional[Sequence[float]] = None) -> Ranking:
+    """按名称选择融合方法（rrf 或 weighted）"""
+    if fusion == "rrf":
+        return reciprocal_rank_fusion(rankings, weights=weights)
+    if fusion == "weighted":
+        return weighted_score_fusion(rankings, weights)
+    raise ValueError(f"未知的融合方法: {fusion}")
+
+
+def hybrid_search_es(es: Elasticsearch, index_name: str, embedding_model: MockEmbeddingModel, query_text: str,
+                     category_filter: Optional[str] = None, k: int = 5, num_candidates: int = 20,
+                     fusion: str = "rrf", weights: Optional[Sequence[float]] = None,
+                     window: Optional[int] = None, quantization: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Elasticsearch 混合检索：BM25 查询和 kNN 查询并发执行后融合
+
+    Args:
+        es: Elasticsearch 客户端
+        index_name: 索引名
+        embedding_model: Embedding 模型
+        query_text: 查询文本
+        category_filter: 分类过滤
+        k: 返回结果数
+        num_candidates: kNN 每个分片的候选数
+        fusion: 融合方法，rrf 或 weighted
+        weights: (BM25, 向量) 权重
+        window: 每路取回的结果数，默认 max(k * 2, 10)
+        quantization: 索引的向量量化方式（与 create_vector_index 一致），int8 时发送整数查询向量
+
+    Returns:
+        [{"rank", "score", "text", "category"}, ...]
+    """
+    window = window or max(k * 2, 10)
+    filters = [{"term": {"category": category_filter}}] if category_filter else []
+    query_vector = to_es_query_vector(encode_query(embedding_model, query_text), quantization)
+
+    def lexical():
+        return es.search(index=index_name, size=window, source_excludes=["embedding"],
+                         query={"bool": {"must": [{"match": {"text": query_text}}], "filter": filters}})
+
+    def semantic():
+        knn = {"field": "embedding", "query_vector": query_vector, "k": window,
+               "num_candidates": max(num_candidates, window)}
+        if filters:
+            knn["filter"] = filters
+        return es.search(index=index_name, size=window, source_excludes=["embedding"], knn=knn)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lexical_future, semantic_future = executor.submit(lexical), executor.submit(semantic)
+        responses = [lexical_future.result(), semantic_future.result()]
+
+    sources: Dict[Any, Dict[str, Any]] = {}
+    rankings = []
+    for response in responses:
+        ranking = []
+        for hit in response['hits']['hits']:
+            sources[hit['_id']] = hit['_source']
+            ranking.append((hit['_id'], hit['_score']))
+        rankings.append(ranking)
+
+    return [
+        {"rank": rank, "score": score, "text": sources[doc_id]['text'], "category": sources[doc_id]['category']}
+        for rank, (doc_id, score) in enumerate(fuse(rankings, fusion, weights)[:k], 1)
+    ]
+
+
+class LocalHybridIndex:
+    """
+    本地混合检索：BM25Index + IVFIndex，接口与 hybrid_search_es 的结果格式一致
+
+    文档 id 可以是任意可哈希的值（如 Elasticsearch 的字符串 _id），
+    IVFIndex 中使用映射后的整数 id
+    """
+
+    def __init__(self, embedding_model: MockEmbeddingModel, nlist: int = 1024, nprobe: int = 16):
+        """
+        初始化索引
+
+        Args:
+            embedding_model: Embedding 模型
+            nlist: IVF 倒排列表数（文档少于 nlist 时暴力检索，达到后自动训练）
+            nprobe: IVF 检索时扫描的列表数
+        """
+        self.embedding_model = embedding_model
+        self.lexical = BM25Index()
+        self.vectors = IVFIndex(embedding_model.embedding_dim, nlist=nlist, nprobe=nprobe)
+        self._vector_ids: Dict[Any, int] = {}  # 文档 id -> IVFIndex 中的 id
+        self._doc_ids: Dict[int, Any] = {}  # IVFIndex 中的 id -> 文档 id
+        self._next_vector_id = 0
+
+    def _vector_id(self, doc_id: Any) -> int:
+        vector_id = self._vector_ids.get(doc_id)
+        if vector_id is None:
+            vector_id = self._vector_ids[doc_id] = self._next_vector_id
+            self._doc_ids[vector_id] = doc_id
+            self._next_vector_id += 1
+        return vector_id
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """
+        添加文档
+
+        Args:
+            documents: 包含 id、text、category 的文档
+        """
+        documents = list(documents)
+        embeddings = self.embedding_model.encode_batch([doc["text"] for doc in documents], normalize=True)
+        # 先写向量索引：失败时 BM25 中不会留下没有向量记录的文档
+        self.vectors.batch_insert([self._vector_id(doc["id"]) for doc in documents], embeddings,
+                                  [{"text": doc["text"], "category": doc.get("category")} for doc in documents])
+        for doc in documents:
+            self.lexical.add(doc["id"], doc["text"], doc.get("category"))
+
+    def delete(self, doc_ids: Sequence[Any]) -> None:
+        """删除文档"""
+        vector_ids = []
+        for doc_id in doc_ids:
+            self.lexical.remove(doc_id)
+            vector_id = self._vector_ids.pop(doc_id, None)
+            if vector_id is not None:
+                del self._doc_ids[vector_id]
+                vector_ids.append(vector_id)
+        self.vectors.delete(vector_ids)
+
+    def search(self, query_text: str, category_filter: Optional[str] = None, k: int = 5,
+               fusion: str = "rrf", weights: Optional[Sequence[float]] = None,
+               window: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        混合检索
+
+        Args:
+            query_text: 查询文本
+            category_filter: 分类过滤
+            k: 返回结果数
+            fusion: 融合方法，rrf 或 weighted
+            weights: (BM25, 向量) 权重
+            window: 每路取回的结果数，默认 max(k * 2, 10)
+
+        Returns:
+            [{"rank", "score", "text", "category"}, ...]
+        """
+        window = window or max(k * 2, 10)
+        lexical = self.lexical.search(query_text, window, category_filter)
+        query_vector = encode_query(self.embedding_model, query_text)
+        # 与 BM25 一致：只有 None 表示不过滤，未出现过的分类不匹配任何文档
+        filter = {"category": category_filter} if category_filter is not None else None
+        hits = self.vectors.search(query_vector, window, filter)[0]
+        semantic = [(self._doc_ids[hit.id], hit.score) for hit in hits]
+
+        results = []
+        for doc_id, score in fuse([lexical, semantic], fusion, weights):
+            vector_id = self._vector_ids.get(doc_id)
+            fields = self.vectors.get(vector_id) if vector_id is not None else None
+            if fields is None:
+                # 只在 BM25 中存在的文档（如向量写入失败）
+                continue
+            results.append({"rank": len(results) + 1, "score": score, "text": fields["text"],
+                            "category": fields["category"]})
+            if len(results) >= k:
+                break
+        return results
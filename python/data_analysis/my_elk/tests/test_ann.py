@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from emb.ann import IVFIndex, generate_clustered_vectors
+
+
+def test_retrain_keeps_records():
+    vectors = generate_clustered_vectors(2000, 16, n_clusters=20, seed=1)
+    index = IVFIndex(16, nlist=16, nprobe=16)
+    index.batch_insert(np.arange(2000), vectors, [{"category": f"c{i % 3}"} for i in range(2000)])
+    assert index.is_trained
+
+    index.train(vectors[:500])
+
+    assert len(index) == 2000
+    assert sum(inv_list.size for inv_list in index._lists) == 2000
+    assert index.search(vectors[7], 1)[0][0].id == 7
+    assert index.get(7) == {"category": "c1"}
+    assert index.delete(filter={"category": "c0"}) == 667
+    assert index.delete([7]) == 1
+    assert len(index) == 1332
+    assert all(hit.fields["category"] != "c0" for hit in index.search(vectors[9], 10)[0])
+
+
+def test_retrain_pq_with_records_raises():
+    vectors = generate_clustered_vectors(600, 16, n_clusters=20, seed=1)
+    index = IVFIndex(16, nlist=8, pq_m=4)
+    index.batch_insert(np.arange(600), vectors)
+    with pytest.raises(ValueError):
+        index.train(vectors)
+    assert len(index) == 600
+    assert len(index.search(vectors[0], 5)[0]) == 5
@@ -0,0 +1,15 @@
+from hybrid import LocalHybridIndex, MockEmbeddingModel
+
+
+def test_string_ids():
+    index = LocalHybridIndex(MockEmbeddingModel(), nlist=4)
+    index.add_documents([
+        {"id": "s1", "text": "machine learning model", "category": "AI"},
+        {"id": 2, "text": "roman history", "category": "history"},
+        {"id": "s3", "text": "deep learning network", "category": "AI"},
+    ])
+    assert {hit["text"] for hit in index.search("learning", "AI", k=3)} == {
+        "machine learning model", "deep learning network"}
+
+    index.delete(["s1"])
+    assert [hit["text"] for hit in index.search("learning", "AI", k=3)] == ["deep learning network"]
@@ -0,0 +1,60 @@
+import argparse
+import os
+import random
+import time
+os.environ['http_proxy'] = ''
+os.environ['https_proxy'] = ''
+
+from agent_heaven.utils.sql_executor import SQLExecutor
+
+TABLE = "bulk_load_demo"
+
+
+def generate_rows(count: int, seed: int = 0):
+    """生成合成订单数据：(id, user_id, amount, status, note)"""
+    rng = random.Random(seed)
+    statuses = ["paid", "shipped", "refunded", "cancelled"]
+    for i in range(count):
+        yield (i, rng.randrange(100000), round(rng.uniform(1, 1000), 2), rng.choice(statuses),
+               None if i % 10 else f"备注\t{i}")
+
+
+def reset_table(executor: SQLExecutor):
+    executor.execute_query(f"DROP TABLE IF EXISTS {TABLE}")
+    executor.execute_query(
+        f"CREATE UNLOGGED TABLE {TABLE} (id bigint, user_id int, amount numeric(10, 2), status text, note text)"
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare row-by-row INSERT, execute_values and COPY throughput")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows loaded with COPY")
+    parser.add_argument("--insert-rows", type=int, default=5_000, help="rows loaded with single-row INSERTs")
+    parser.add_argument("--values-rows", type=int, default=200_000, help="rows loaded with execute_values")
+    args = parser.parse_args()
+
+    executor = SQLExecutor()
+    results = []
+
+    reset_table(executor)
+    start = time.perf_counter()
+    for row in generate_rows(args.insert_rows):
+        executor.execute_query(f"INSERT INTO {TABLE} VALUES (%s, %s, %s, %s, %s)", row)
+    elapsed = time.perf_counter() - start
+    results.append(("INSERT", args.insert_rows, elapsed))
+
+    reset_table(executor)
+    stats = executor.execute_many(f"INSERT INTO {TABLE} VALUES %s", generate_rows(args.values_rows))
+    results.append((stats.method, stats.rows, stats.elapsed))
+
+    reset_table(executor)
+    stats = executor.copy_from(TABLE, generate_rows(args.rows))
+    results.append((stats.method, stats.rows, stats.elapsed))
+
+    print(f"\n{'方式':<16}{'行数':>12}{'耗时(s)':>10}{'行/s':>12}")
+    for method, rows, elapsed in results:
+        print(f"{method:<16}{rows:>12}{elapsed:>10.2f}{rows / elapsed:>12.0f}")
+    print(f"\n表中行数: {executor.execute_query(f'SELECT count(*) AS n FROM {TABLE}')[0]['n']}")
+
+    executor.execute_query(f"DROP TABLE {TABLE}")
+    executor.close_connection()
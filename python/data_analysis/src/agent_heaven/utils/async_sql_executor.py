@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from typing import List, Dict, Any, AsyncIterator, Optional, Sequence, Union
+
+import asyncpg
+
+from agent_heaven.common.config.constants import DB_CONFIG
+from agent_heaven.utils.logger import logger
+from agent_heaven.utils.query_cache import QueryCacheStats, QueryResultCache, extract_tables, written_tables
+from agent_heaven.utils.sql_executor import DEFAULT_FETCH_SIZE, Params, rows_to_columns, to_positional
+
+
+class AsyncSQLExecutor:
+    """异步SQL执行器（asyncpg），使用独立的连接池，不阻塞事件循环
+
+    连接池绑定创建它的事件循环，因此不做成单例；每个事件循环创建自己的执行器。
+    asyncpg 对每个连接缓存预备语句，带参数的查询只在第一次执行时解析和规划
+    """
+
+    def __init__(self, min_size: int = 5, max_size: int = 20, **db_config):
+        """
+        初始化执行器
+
+        Args:
+            min_size: 连接池最小连接数
+            max_size: 连接池最大连接数
+            db_config: 数据库配置，默认使用 DB_CONFIG
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.db_config = db_config or DB_CONFIG
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock = asyncio.Lock()
+        self._result_cache = QueryResultCache()
+
+    async def __aenter__(self) -> "AsyncSQLExecutor":
+        await self._get_pool()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """获取连接池（首次调用时创建）"""
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    try:
+                        self._pool = await asyncpg.create_pool(
+                            min_size=self.min_size,
+                            max_size=self.max_size,
+                            **self.db_config
+                        )
+                        logger.info("异步数据库连接池已创建")
+                    except (asyncpg.PostgresError, OSError) as e:
+                        logger.error(f"创建异步数据库连接池失败: {e}")
+                        raise
+        return self._pool
+
+    async def execute_query(self, sql: str, params: Params = None, columnar: bool = False,
+                            cache: bool = False, cache_ttl: Optional[float] = None,
+                            tables: Optional[Sequence[str]] = None
+                            ) -> Optional[Union[List[Dict[str, Any]], Dict[str, List[Any]]]]:
+        """
+        执行SQL查询并返回结果数据
+
+        Args:
+            sql: SQL语句，参数使用 %s 或 %(name)s 占位符（与 SQLExecutor 相同）
+            params: 查询参数
+            columnar: 为 True 时按列返回 {列名: 值列表}，否则返回每行一个字典的列表
+            cache: 是否使用结果缓存
+            cache_ttl: 缓存过期时间（秒），默认使用结果缓存的 ttl
+            tables: 结果依赖的表（缓存失效标签），默认从 SQL 的 FROM/JOIN 中提取
+
+        Returns:
+            查询结果，出错时返回 None
+        """
+        # 参数不可哈希时 key 为 None，不使用缓存
+        key = QueryResultCache.make_key(sql, params, columnar) if cache else None
+        if key is not None:
+            hit, result = self._result_cache.get(key)
+            if hit:
+                return result
+            generation = self._result_cache.generation
+
+        try:
+            text, values = to_positional(sql, params)
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(text, *values)
+                if columnar:
+                    if rows:
+                        column_names = list(rows[0].keys())
+                    else:
+                        # 空结果从语句描述中取列名
+                        statement = await conn.prepare(text)
+                        column_names = [attr.name for attr in statement.get_attributes()]
+                    result = rows_to_columns(column_names, rows)
+                else:
+                    result = [dict(row) for row in rows]
+
+        except asyncpg.PostgresError as e:
+            logger.error(f"SQL执行错误: {e}, SQL: {sql}")
+            return None
+        except Exception as e:
+            logger.error(f"执行SQL时发生未知错误: {e}, SQL: {sql}")
+            return None
+
+        changed = written_tables(sql)
+        if changed:
+            self._result_cache.invalidate(changed)
+        if key is not None:
+            self._result_cache.put(key, result, tables if tables is not None else extract_tables(sql), cache_ttl,
+                                   generation)
+        return result
+
+    def invalidate_cache(self, tables: Optional[Sequence[str]] = None) -> int:
+        """使依赖指定表的缓存结果失效，tables 为 None 时清空全部，返回删除的结果数"""
+        return self._result_cache.invalidate(tables)
+
+    @property
+    def cache_stats(self) -> QueryCacheStats:
+        """结果缓存统计"""
+        return self._result_cache.stats
+
+    async def execute_stream(self, sql: str, params: Params = None, batch_size: int = DEFAULT_FETCH_SIZE,
+                             columnar: bool = False) -> AsyncIterator[Union[Dict[str, Any], Dict[str, List[Any]]]]:
+        """
+        用服务端游标流式执行查询，每次读取一批，内存占用与结果总行数无关
+
+        迭代结束前会一直占用一个连接；出错时记录日志并抛出异常
+
+        Args:
+            sql: 查询语句
+            params: 查询参数
+            batch_size: 每批从服务端读取的行数
+            columnar: 为 True 时每批生成一个 {列名: 值列表}，否则逐行生成字典
+
+        Returns:
+            行字典或按列组织的批次的异步迭代器
+        """
+        text, values = to_positional(sql, params)
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            try:
+                # 游标只能在事务中使用
+                async with conn.transaction():
+                    cursor = await conn.cursor(text, *values)
+                    while True:
+                        rows = await cursor.fetch(batch_size)
+                        if not rows:
+                            break
+                        if columnar:
+                            yield rows_to_columns(list(rows[0].keys()), rows)
+                        else:
+                            for row in rows:
+                                yield dict(row)
+            except asyncpg.PostgresError as e:
+                logger.error(f"流式SQL执行错误: {e}, SQL: {sql}")
+                raise
+
+    async def close(self):
+        """关闭连接池"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+            logger.info("异步数据库连接池已关闭")
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# COPY 文本格式中需要转义的字符
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+# DataFrame / ndarray 每次转换的行数
+DEFAULT_CHUNK_ROWS = 100000
+# 每次交给 COPY 的文本大小
+COPY_BUFFER_SIZE = 1 << 20
+
+
+@dataclass
+class BulkLoadStats:
+    """批量写入统计"""
+    table: str
+    method: str
+    rows: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.method} {self.table}: {self.rows} 行, 耗时 {self.elapsed:.2f}s, "
+                f"吞吐量 {self.rows_per_second:.0f} 行/s")
+
+
+def copy_value(value: Any) -> str:
+    """把一个值转换为 COPY 文本格式（None 为 \\N，字符串转义反斜杠、制表符和换行）"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_lines(rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    """逐行生成 COPY 文本"""
+    for row in rows:
+        yield "\t".join([copy_value(value) for value in row]) + "\n"
+
+
+class CopyReader(io.TextIOBase):
+    """把逐行生成的 COPY 文本包装成 copy_expert 读取的文件对象，只在内存中保留一个缓冲区"""
+
+    def __init__(self, lines: Iterator[str], buffer_size: int = COPY_BUFFER_SIZE):
+        self._lines = lines
+        self._buffer_size = buffer_size
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        # 可以返回多于 size 的内容，copy_expert 会完整发送
+        limit = self._buffer_size if size is None or size < 0 else max(size, self._buffer_size)
+        parts: List[str] = []
+        length = 0
+        for line in self._lines:
+            parts.append(line)
+            length += len(line)
+            if length >= limit:
+                break
+        return "".join(parts)
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        return next(self._lines, "")
+
+
+def _frame_rows(frame, chunk_rows: int) -> Iterator[Tuple[Any, ...]]:
+    """pandas DataFrame 按块转为行，缺失值（NaN/NaT/None）写为 NULL"""
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows]
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def _array_rows(array, chunk_rows: int) -> Iterator[Sequence[Any]]:
+    """NumPy 数组按块转为行（一维普通数组视为单列），NaN 保持为 NaN"""
+    single_column = array.ndim == 1 and array.dtype.names is None
+    for start in range(0, len(array), chunk_rows):
+        values = array[start:start + chunk_rows].tolist()
+        yield from ([(value,) for value in values] if single_column else values)
+
+
+def source_rows(source: Any,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[Iterable[Sequence[Any]], Optional[List[str]]]:
+    """
+    把数据源统一为行迭代器
+
+    Args:
+        source: 行迭代器、pandas DataFrame 或 NumPy 数组（结构化数组或二维数组）
+        chunk_rows: DataFrame / ndarray 每次转换的行数
+
+    Returns:
+        (行迭代器, 数据源自带的列名)
+    """
+    if hasattr(source, "itertuples") and hasattr(source, "columns"):
+        return _frame_rows(source, chunk_rows), [str(column) for column in source.columns]
+    if hasattr(source, "ndim") and hasattr(source, "tolist"):
+        names = list(source.dtype.names) if source.dtype.names else None
+        return _array_rows(source, chunk_rows), names
+    return source, None
+
+
+def is_csv_source(source: Any) -> bool:
+    """是否为 CSV 文件路径或文件对象"""
+    return isinstance(source, (str, Path)) or hasattr(source, "read")
+
+
+def counted(rows: Iterable[Any], stats: BulkLoadStats) -> Iterator[Any]:
+    """迭代时累计行数"""
+    for row in rows:
+        stats.rows += 1
+        yield row
+
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Sequence, Tuple, Union
+
+# 字符串/引号标识符，或连续空白
+_SQL_TOKEN_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+")
+# 查询读取的表
+_READ_TABLE_PATTERN = re.compile(r"\b(?:from|join)\s+((?:\"[^\"]+\"|\w+)(?:\.(?:\"[^\"]+\"|\w+))?)", re.IGNORECASE)
+# 写语句修改的表
+_WRITE_TABLE_PATTERN = re.compile(
+    r"\b(?:insert\s+into|update|delete\s+from|truncate(?:\s+table)?|alter\s+table|drop\s+table(?:\s+if\s+exists)?"
+    r"|copy)\s+(?:only\s+)?((?:\"[^\"]+\"|\w+)(?:\.(?:\"[^\"]+\"|\w+))?)",
+    re.IGNORECASE
+)
+_WRITE_PATTERN = re.compile(r"^\s*(?:with\b.*?\)\s*)?(insert|update|delete|truncate|alter|drop|copy)\b",
+                            re.IGNORECASE | re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """规范化SQL：合并字符串以外的连续空白，去掉末尾分号"""
+    normalized = _SQL_TOKEN_PATTERN.sub(lambda m: " " if m.group().isspace() else m.group(), sql)
+    return normalized.strip().rstrip(";").strip()
+
+
+def _table_name(name: str) -> str:
+    """表名统一为小写、去掉 schema 和引号，便于匹配"""
+    return name.split(".")[-1].strip('"').lower()
+
+
+def extract_tables(sql: str) -> FrozenSet[str]:
+    """从查询中提取 FROM/JOIN 的表名（不含 schema），用作缓存标签"""
+    return frozenset(_table_name(name) for name in _READ_TABLE_PATTERN.findall(sql))
+
+
+def written_tables(sql: str) -> FrozenSet[str]:
+    """写语句（INSERT/UPDATE/DELETE/TRUNCATE/ALTER/DROP/COPY）修改的表名，非写语句返回空集合"""
+    if not _WRITE_PATTERN.match(sql):
+        return frozenset()
+    return frozenset(_table_name(name) for name in _WRITE_TABLE_PATTERN.findall(sql))
+
+
+def _copy_result(result: Any) -> Any:
+    """复制查询结果的外层容器（行字典或列列表），各个值本身不复制"""
+    if isinstance(result, list):
+        return [dict(row) if isinstance(row, dict) else row for row in result]
+    if isinstance(result, dict):
+        return {name: list(values) for name, values in result.items()}
+    return result
+
+
+def _freeze_param(value: Any) -> Hashable:
+    """
+    把参数转为可哈希的值，生成的SQL不同的参数不能相等
+
+    列表（ARRAY）与元组（IN 列表）、1 / True / 1.0 这样相等但字面量不同的标量都加上类型标记
+    """
+    if isinstance(value, list):
+        return (list,) + tuple(_freeze_param(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(_freeze_param(item) for item in value)
+    if isinstance(value, dict):
+        return (dict,) + tuple(sorted((key, _freeze_param(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze_param(item) for item in value)
+    if isinstance(value, Decimal):
+        # 相等的 Decimal 精度可能不同（1 与 1.00），字面量也不同
+        return Decimal, str(value)
+    return type(value), value
+
+
+@dataclass
+class QueryCacheStats:
+    """查询结果缓存统计"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class QueryResultCache:
+    """查询结果缓存：LRU + TTL，按表名标签失效
+
+    键为 (规范化SQL, 参数, 其他选项)；每条结果带有所读取表的标签，
+    invalidate 删除带有指定表标签的所有结果；读写时复制行字典/列列表，调用方修改结果不会影响缓存
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最多缓存的结果数
+            ttl: 默认过期时间（秒），None 表示不过期
+            clock: 时钟函数
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, FrozenSet[str], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = QueryCacheStats()
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> QueryCacheStats:
+        """统计快照"""
+        with self._lock:
+            return QueryCacheStats(**asdict(self._stats))
+
+    @property
+    def generation(self) -> int:
+        """失效计数：查询前记录，写入时传给 put，避免查询期间发生的失效被旧结果覆盖"""
+        return self._generation
+
+    @staticmethod
+    def make_key(sql: str, params: Optional[Union[Sequence[Any], Dict[str, Any]]] = None,
+                 *options) -> Optional[Hashable]:
+        """生成缓存键，参数无法转为可哈希的值时返回 None（该查询不缓存）"""
+        try:
+            if isinstance(params, dict):
+                params = tuple(sorted((name, _freeze_param(value)) for name, value in params.items()))
+            elif params is not None:
+                params = tuple(_freeze_param(value) for value in params)
+            key = (normalize_sql(sql), params) + options
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        读取缓存
+
+        Returns:
+            (是否命中, 结果的拷贝)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= self._clock():
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return True, _copy_result(entry[2])
+                del self._entries[key]
+                self._stats.expirations += 1
+            self._stats.misses += 1
+        return False, None
+
+    def put(self, key: Hashable, value: Any, tables: Iterable[str], ttl: Optional[float] = None,
+            generation: Optional[int] = None) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 查询结果
+            tables: 结果依赖的表（失效标签）
+            ttl: 过期时间（秒），默认使用初始化时的 ttl
+            generation: 查询开始前的 generation，之后发生过失效时不写入
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + ttl if ttl is not None else float("inf")
+        entry = (expires_at, frozenset(_table_name(table) for table in tables), _copy_result(value))
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, tables: Optional[Iterable[str]] = None) -> int:
+        """
+        使缓存失效
+
+        Args:
+            tables: 表名，删除依赖这些表的结果；None 表示清空全部
+
+        Returns:
+            删除的结果数
+        """
+        with self._lock:
+            if tables is None:
+                removed = list(self._entries)
+            else:
+                tags = {_table_name(table) for table in tables}
+                removed = [key for key, (_, entry_tags, _) in self._entries.items() if entry_tags & tags]
+            for key in removed:
+                del self._entries[key]
+            self._generation += 1
+            self._stats.invalidations += len(removed)
+            return len(removed)
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._stats = QueryCacheStats()
+
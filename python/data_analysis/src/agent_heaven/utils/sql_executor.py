@@ -1,13 +1,78 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import re
 import threading
-from contextlib import contextmanager
-from typing import List, Dict, Any, Optional
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
 
 import psycopg2
+import psycopg2.extras
 from psycopg2 import pool
+from psycopg2 import sql as pgsql
 
 from agent_heaven.common.config.constants import DB_CONFIG
+from agent_heaven.utils.bulk_load import (
+    COPY_BUFFER_SIZE, DEFAULT_CHUNK_ROWS, BulkLoadStats, CopyReader, copy_lines, counted, is_csv_source, source_rows
+)
 from agent_heaven.utils.logger import logger
+from agent_heaven.utils.query_cache import QueryCacheStats, QueryResultCache, extract_tables, written_tables
+
+# 流式查询每批读取的行数
+DEFAULT_FETCH_SIZE = 10000
+# 每个连接最多保留的预备语句数，超过后 DEALLOCATE 最久未使用的
+MAX_PREPARED_STATEMENTS = 256
+
+# 查询参数：序列对应 %s 占位符，字典对应 %(name)s 占位符
+Params = Optional[Union[Sequence[Any], Dict[str, Any]]]
+
+
+def rows_to_columns(column_names: Sequence[str], rows: Sequence[Sequence[Any]]) -> Dict[str, List[Any]]:
+    """按列组织结果：{列名: 该列所有值}，不为每一行创建字典"""
+    columns = zip(*rows) if rows else [()] * len(column_names)
+    return {name: list(values) for name, values in zip(column_names, columns)}
+
+
+def to_positional(sql: str, params: Params = None) -> Tuple[str, List[Any]]:
+    """
+    把 psycopg2 风格的占位符（%s 或 %(name)s）转换为 PostgreSQL 服务端的 $1, $2 ...
+
+    Args:
+        sql: 使用 %s / %(name)s 占位符的SQL，%% 表示百分号
+        params: 参数序列或字典，None 时与 psycopg2 一样不做替换
+
+    Returns:
+        (使用 $n 占位符的SQL, 按位置排列的参数)
+    """
+    if params is None:
+        return sql, []
+    values: List[Any] = []
+    names: Dict[str, int] = {}
+    sequence = None if isinstance(params, dict) else list(params)
+
+    def replace(match: "re.Match") -> str:
+        if match.group() == "%%":
+            return "%"
+        name = match.group(1)
+        if name is None:
+            if sequence is None:
+                raise ValueError("%s 占位符需要序列参数")
+            if len(values) >= len(sequence):
+                raise ValueError("参数个数少于 %s 占位符个数")
+            values.append(sequence[len(values)])
+            return f"${len(values)}"
+        if not isinstance(params, dict):
+            raise ValueError(f"%({name})s 占位符需要字典参数")
+        if name not in names:
+            values.append(params[name])
+            names[name] = len(values)
+        return f"${names[name]}"
+
+    return re.sub(r"%%|%s|%\((\w+)\)s", replace, sql), values
 
 
 class SQLExecutor:
@@ -28,6 +93,10 @@ class SQLExecutor:
         if not hasattr(self, '_initialized'):
             self._connection_pool = None
             self._pool_lock = threading.Lock()
+            # 连接 -> {SQL文本: 预备语句名}，连接被关闭回收后自动移除
+            self._prepared = weakref.WeakKeyDictionary()
+            self._prepared_lock = threading.Lock()
+            self._result_cache = QueryResultCache()
             self._initialized = True
 
     def _get_connection_pool(self):
@@ -65,22 +134,74 @@ class SQLExecutor:
             if conn:
                 connection_pool.putconn(conn)
 
-    def execute_query(self, sql: str) -> Optional[List[Dict[str, Any]]]:
-        """执行SQL查询并返回结果数据 - 线程安全版本"""
+    def _execute_prepared(self, conn, cursor, sql: str, params: Params) -> None:
+        """用服务端预备语句执行：每个连接对同一SQL只 PREPARE 一次，之后只 EXECUTE（跳过解析和规划）"""
+        with self._prepared_lock:
+            statements = self._prepared.setdefault(conn, OrderedDict())
+        text, values = to_positional(sql, params)
+        name = statements.get(text)
+        if name is None:
+            name = f"ah_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]}"
+            # 预备语句属于会话，不受事务回滚影响，因此 PREPARE 成功后即可记录
+            cursor.execute(f"PREPARE {name} AS {text}")
+            statements[text] = name
+            while len(statements) > MAX_PREPARED_STATEMENTS:
+                _, evicted = statements.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+        else:
+            statements.move_to_end(text)
+        if values:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(values))})", values)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    def execute_query(self, sql: str, params: Params = None, columnar: bool = False,
+                      prepare: bool = False, cache: bool = False, cache_ttl: Optional[float] = None,
+                      tables: Optional[Sequence[str]] = None
+                      ) -> Optional[Union[List[Dict[str, Any]], Dict[str, List[Any]]]]:
+        """
+        执行SQL查询并返回结果数据 - 线程安全版本
+
+        写语句（INSERT/UPDATE/DELETE 等）成功后会使依赖被修改表的缓存结果失效
+
+        Args:
+            sql: SQL语句，参数使用 %s 或 %(name)s 占位符
+            params: 查询参数
+            columnar: 为 True 时按列返回 {列名: 值列表}，否则返回每行一个字典的列表
+            prepare: 是否使用服务端预备语句（每个连接缓存），适合反复执行的参数化查询；
+                需要 psycopg2 在客户端展开的参数（如 IN %s 的元组）或无法 PREPARE 的语句不要使用
+            cache: 是否使用结果缓存
+            cache_ttl: 缓存过期时间（秒），默认使用结果缓存的 ttl
+            tables: 结果依赖的表（缓存失效标签），默认从 SQL 的 FROM/JOIN 中提取
+
+        Returns:
+            查询结果，出错时返回 None
+        """
+        # 参数不可哈希时 key 为 None，不使用缓存
+        key = QueryResultCache.make_key(sql, params, columnar) if cache else None
+        if key is not None:
+            hit, result = self._result_cache.get(key)
+            if hit:
+                return result
+            generation = self._result_cache.generation
+
         try:
             with self._get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(sql)
+                    if prepare:
+                        self._execute_prepared(conn, cursor, sql, params)
+                    else:
+                        cursor.execute(sql, params)
                     column_names = [desc[0] for desc in cursor.description] if cursor.description else []
-                    rows = cursor.fetchall()
+                    # 没有结果集的语句（写语句、DDL）返回空列表
+                    rows = cursor.fetchall() if cursor.description else []
 
-                    result = []
-                    for row in rows:
-                        row_dict = dict(zip(column_names, row))
-                        result.append(row_dict)
+                    if columnar:
+                        result = rows_to_columns(column_names, rows)
+                    else:
+                        result = [dict(zip(column_names, row)) for row in rows]
 
                     conn.commit()
-                    return result
 
         except psycopg2.Error as e:
             logger.error(f"SQL执行错误: {e}, SQL: {sql}")
@@ -89,11 +210,161 @@ class SQLExecutor:
             logger.error(f"执行SQL时发生未知错误: {e}, SQL: {sql}")
             return None
 
+        changed = written_tables(sql)
+        if changed:
+            self._result_cache.invalidate(changed)
+        if key is not None:
+            self._result_cache.put(key, result, tables if tables is not None else extract_tables(sql), cache_ttl,
+                                   generation)
+        return result
+
+    def invalidate_cache(self, tables: Optional[Sequence[str]] = None) -> int:
+        """使依赖指定表的缓存结果失效，tables 为 None 时清空全部，返回删除的结果数"""
+        return self._result_cache.invalidate(tables)
+
+    @property
+    def cache_stats(self) -> QueryCacheStats:
+        """结果缓存统计"""
+        return self._result_cache.stats
+
+    def execute_stream(self, sql: str, params: Params = None, batch_size: int = DEFAULT_FETCH_SIZE,
+                       columnar: bool = False) -> Iterator[Union[Dict[str, Any], Dict[str, List[Any]]]]:
+        """
+        用服务端命名游标流式执行查询，每次 fetchmany 一批，内存占用与结果总行数无关
+
+        迭代结束（或提前关闭生成器）前会一直占用一个连接池中的连接；
+        出错时记录日志并抛出异常，流式结果无法像 execute_query 那样用 None 表示失败
+
+        Args:
+            sql: 查询语句（只能是 SELECT 等可以声明为游标的语句）
+            params: 查询参数
+            batch_size: 每批从服务端读取的行数
+            columnar: 为 True 时每批生成一个 {列名: 值列表}，否则逐行生成字典
+
+        Returns:
+            行字典或按列组织的批次的迭代器
+        """
+        with self._get_connection() as conn:
+            try:
+                with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                    cursor.itersize = batch_size
+                    cursor.execute(sql, params)
+                    column_names = None
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if column_names is None:
+                            # 命名游标在第一次读取后才有 description
+                            column_names = [desc[0] for desc in cursor.description]
+                        if not rows:
+                            break
+                        if columnar:
+                            yield rows_to_columns(column_names, rows)
+                        else:
+                            for row in rows:
+                                yield dict(zip(column_names, row))
+                conn.commit()
+            except psycopg2.Error as e:
+                logger.error(f"流式SQL执行错误: {e}, SQL: {sql}")
+                raise
+            except BaseException:
+                # 调用方提前关闭生成器等情况，回滚后连接才能放回连接池
+                conn.rollback()
+                raise
+
+    def execute_many(self, sql: str, rows: Iterable[Sequence[Any]], page_size: int = 1000,
+                     template: Optional[str] = None) -> BulkLoadStats:
+        """
+        用 execute_values 批量执行写语句：每 page_size 行合并成一条多值语句，全部在一个事务中提交
+
+        Args:
+            sql: 包含一个 VALUES %s 占位符的语句，如 INSERT INTO t (a, b) VALUES %s
+            rows: 行的迭代器，按页消费，不会一次性读入内存
+            page_size: 每条语句包含的行数
+            template: 每行的模板，如 (%s, %s::jsonb)，默认全部为 %s
+
+        Returns:
+            BulkLoadStats 统计，出错时回滚并抛出异常
+        """
+        tables = written_tables(sql)
+        stats = BulkLoadStats(", ".join(sorted(tables)), "execute_values")
+        start = time.perf_counter()
+        with self._get_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    psycopg2.extras.execute_values(cursor, sql, counted(rows, stats), template, page_size)
+                conn.commit()
+            except psycopg2.Error as e:
+                logger.error(f"批量执行错误: {e}, SQL: {sql}")
+                raise
+            except BaseException:
+                # 行迭代器抛出的异常，回滚后连接才能放回连接池
+                conn.rollback()
+                raise
+        stats.elapsed = time.perf_counter() - start
+        if tables:
+            self._result_cache.invalidate(tables)
+        logger.info(str(stats))
+        return stats
+
+    def copy_from(self, table: str, source: Any, columns: Optional[Sequence[str]] = None, header: bool = True,
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS) -> BulkLoadStats:
+        """
+        用 COPY FROM STDIN 流式写入表，数据边生成边发送，内存占用与行数无关
+
+        Args:
+            table: 表名，可带 schema，如 public.orders
+            source: CSV 文件路径或文件对象（FORMAT csv）；行的迭代器、pandas DataFrame 或 NumPy 数组（FORMAT text）
+            columns: 目标列，默认使用 DataFrame 的列名或结构化数组的字段名，否则为表的全部列
+            header: CSV 是否包含表头
+            chunk_rows: DataFrame / NumPy 数组每次转换的行数
+
+        Returns:
+            BulkLoadStats 统计，出错时回滚并抛出异常
+        """
+        if is_csv_source(source):
+            rows = None
+            options = pgsql.SQL(" WITH (FORMAT csv, HEADER {})").format(pgsql.SQL("true" if header else "false"))
+        else:
+            rows, source_columns = source_rows(source, chunk_rows)
+            columns = columns or source_columns
+            options = pgsql.SQL("")
+        statement = pgsql.SQL("COPY {}{} FROM STDIN{}").format(
+            pgsql.Identifier(*table.split(".")),
+            pgsql.SQL(" ({})").format(pgsql.SQL(", ").join(map(pgsql.Identifier, columns))) if columns
+            else pgsql.SQL(""),
+            options,
+        )
+
+        stats = BulkLoadStats(table, "COPY")
+        start = time.perf_counter()
+        with self._get_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    if rows is None:
+                        is_path = isinstance(source, (str, Path))
+                        with open(source, encoding="utf-8", newline="") if is_path else nullcontext(source) as file:
+                            cursor.copy_expert(statement, file, COPY_BUFFER_SIZE)
+                    else:
+                        cursor.copy_expert(statement, CopyReader(copy_lines(rows)), COPY_BUFFER_SIZE)
+                    stats.rows = cursor.rowcount
+                conn.commit()
+            except psycopg2.Error as e:
+                logger.error(f"COPY 错误: {e}, 表: {table}")
+                raise
+            except BaseException:
+                conn.rollback()
+                raise
+        stats.elapsed = time.perf_counter() - start
+        self._result_cache.invalidate([table])
+        logger.info(str(stats))
+        return stats
+
     def close_connection(self):
         """关闭数据库连接池"""
         if self._connection_pool:
             self._connection_pool.closeall()
             self._connection_pool = None
+            self._prepared.clear()
             logger.info("数据库连接池已关闭")
 
     def __del__(self):
@@ -105,9 +376,31 @@ class SQLExecutor:
 _executor = SQLExecutor()
 
 
-def execute_sql(sql: str) -> Optional[List[Dict[str, Any]]]:
+def execute_sql(sql: str, params: Params = None, columnar: bool = False,
+                cache: bool = False) -> Optional[Union[List[Dict[str, Any]], Dict[str, List[Any]]]]:
     """执行SQL查询的便捷函数"""
-    return _executor.execute_query(sql)
+    return _executor.execute_query(sql, params, columnar, cache=cache)
+
+
+def stream_sql(sql: str, params: Params = None, batch_size: int = DEFAULT_FETCH_SIZE,
+               columnar: bool = False) -> Iterator[Union[Dict[str, Any], Dict[str, List[Any]]]]:
+    """流式执行SQL查询的便捷函数"""
+    return _executor.execute_stream(sql, params, batch_size, columnar)
+
+
+def invalidate_sql_cache(tables: Optional[Sequence[str]] = None) -> int:
+    """使SQL结果缓存失效的便捷函数"""
+    return _executor.invalidate_cache(tables)
+
+
+def execute_many_sql(sql: str, rows: Iterable[Sequence[Any]], page_size: int = 1000) -> BulkLoadStats:
+    """批量执行写语句的便捷函数"""
+    return _executor.execute_many(sql, rows, page_size)
+
+
+def copy_sql(table: str, source: Any, columns: Optional[Sequence[str]] = None) -> BulkLoadStats:
+    """COPY 批量写入的便捷函数"""
+    return _executor.copy_from(table, source, columns)
 
 
 def close_sql_connection():
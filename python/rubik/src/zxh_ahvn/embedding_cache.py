@@ -0,0 +1,129 @@
+"""
+查询嵌入缓存
+
+VectorDatabase.q_encode_embed 每次都会调用 embedder；热门查询反复出现时，
+用 CachedEmbedder 包装 embedder 即可复用结果：
+- LRU 淘汰 + TTL 过期，键为 (模型名, 文本)
+- single-flight：并发的相同文本只调用一次 embedder，其余线程等待同一结果
+- 统计命中、合并、未命中次数和命中率
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """缓存统计"""
+    hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.coalesced + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """未调用 embedder 的请求比例（直接命中 + 合并）"""
+        return (self.hits + self.coalesced) / self.requests if self.requests else 0.0
+
+
+class _Pending:
+    """正在计算的嵌入"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.vector: Optional[Tuple[float, ...]] = None
+        self.error: Optional[BaseException] = None
+
+
+class CachedEmbedder:
+    """
+    带缓存的 embedder，可直接作为 VectorDatabase 的 embedder 参数
+
+    缓存中保存不可变的 tuple，每次返回新的 list，调用方修改结果不会影响缓存
+    """
+
+    def __init__(self, embedder: Callable[[str], List[float]], model: str = "default",
+                 maxsize: int = 10000, ttl: Optional[float] = 3600.0):
+        """
+        初始化
+
+        Args:
+            embedder: 原始 embedder，文本 -> 向量
+            model: 模型名，作为缓存键的一部分（更换模型后不会读到旧向量）
+            maxsize: 最多缓存的文本数
+            ttl: 过期时间（秒），None 表示不过期
+        """
+        self.embedder = embedder
+        self.model = model
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Tuple[float, ...]]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], _Pending] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __call__(self, text: str) -> List[float]:
+        return list(self._get(text))
+
+    @property
+    def stats(self) -> CacheStats:
+        """统计快照"""
+        with self._lock:
+            return CacheStats(**asdict(self._stats))
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._entries.clear()
+            self._stats = CacheStats()
+
+    def _get(self, text: str) -> Tuple[float, ...]:
+        key = (self.model, text)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats.expirations += 1
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+                self._stats.misses += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.vector
+
+        try:
+            pending.vector = tuple(self.embedder(text))
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                if pending.error is None:
+                    expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+                    self._entries[key] = (expires_at, pending.vector)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+                        self._stats.evictions += 1
+                del self._pending[key]
+            pending.done.set()
+        return pending.vector
@@ -18,6 +18,8 @@ from ahvn.utils.basic.hash_utils import md5hash
 from ahvn.utils.basic.rnd_utils import stable_rnd_vector
 from ahvn.utils.vdb.base import VectorDatabase
 
+from zxh_ahvn.embedding_cache import CachedEmbedder
+
 
 # ============================================================================
 # Mock Encoder 和 Embedder 实现
@@ -62,12 +64,13 @@ def mock_embedder(text: str, dim: int = 128) -> List[float]:
     return stable_rnd_vector(seed, dim=dim)
 
 
-def create_mock_encoder_embedder(dim: int = 128):
+def create_mock_encoder_embedder(dim: int = 128, cache: bool = True):
     """
     创建用于测试的 (encoder, embedder) 元组。
 
     Args:
         dim: 嵌入维度
+        cache: 是否缓存嵌入结果（重复的查询不再调用 embedder）
 
     Returns:
         (encoder_func, embedder_func) 元组
@@ -77,6 +80,8 @@ def create_mock_encoder_embedder(dim: int = 128):
     def embedder(text: str) -> List[float]:
         return mock_embedder(text, dim=dim)
 
+    if cache:
+        return encoder, CachedEmbedder(embedder, model=f"mock-{dim}")
     return encoder, embedder
 
 
@@ -370,6 +375,10 @@ def main():
         demo_search_with_query_text(vdb)
         demo_clear(vdb)
 
+        if isinstance(embedder, CachedEmbedder):
+            stats = embedder.stats
+            print(f"\n嵌入缓存: {stats.requests} 次请求, 命中率 {stats.hit_rate:.1%}")
+
         print("\n" + "=" * 60)
         print("所有演示完成！")
         print("=" * 60)